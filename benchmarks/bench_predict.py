@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict, ModelRegistry
+
+
+MODELS = [
+    ("sa", False),
+    ("sa", True),
+    ("sa_avg", False),
+    ("sa_avg", True),
+]
+
+BATCH_SIZE = 10_000
+
+
+def batch_inputs(size, collapse):
+    rng = np.random.default_rng(0)
+    inputs = {
+        "period": rng.uniform(0.01, 3.0, size),
+        "damping": rng.uniform(0.02, 0.2, size),
+        "hardening_ratio": rng.uniform(0.02, 0.07, size),
+        "ductility": rng.uniform(2.0, 8.0, size),
+    }
+    if not collapse:
+        inputs["dynamic_ductility"] = rng.uniform(0.5, 8.0, size)
+    return inputs
+
+
+@pytest.mark.parametrize("im_type, collapse", MODELS)
+class ColdStartTest:
+    def test_first_prediction(self, benchmark, im_type, collapse):
+        # Model loading and the first call, with an empty registry
+        def setup():
+            model = XGBPredict(im_type, collapse, registry=ModelRegistry())
+            return (model,), {}
+
+        def run(model):
+            return model.make_prediction(1.0, 0.05, 0.02, 4, 3.0)
+
+        benchmark.pedantic(run, setup=setup, rounds=5)
+
+
+@pytest.mark.parametrize("engine", XGBPredict.engines)
+@pytest.mark.parametrize("im_type, collapse", MODELS)
+class LatencyTest:
+    def test_make_prediction(self, benchmark, peak_memory, im_type,
+                             collapse, engine):
+        model = XGBPredict(im_type, collapse, engine=engine)
+        args = (1.0, 0.05, 0.02, 4, 3.0)
+        model.make_prediction(*args)
+
+        peak_memory(model.make_prediction, *args)
+        benchmark(model.make_prediction, *args)
+
+
+# The NumPy engine is meant for environments without xgboost, not for
+# batches, it is only benchmarked on single predictions
+@pytest.mark.parametrize("im_type, collapse", MODELS)
+class ThroughputTest:
+    def test_predict_batch(self, benchmark, peak_memory, im_type, collapse):
+        model = XGBPredict(im_type, collapse)
+        inputs = batch_inputs(BATCH_SIZE, collapse)
+        model.predict_batch(**inputs)
+
+        benchmark.extra_info["rows"] = BATCH_SIZE
+        peak_memory(model.predict_batch, **inputs)
+        benchmark(model.predict_batch, **inputs)
+
+
+@pytest.mark.parametrize("im_type", ["sa", "sa_avg"])
+class InverseTest:
+    def test_make_prediction(self, benchmark, peak_memory, im_type):
+        model = XGBPredict(im_type, False)
+        kwargs = {"strength_ratio": 2.0}
+        model.make_prediction(1.0, 0.05, 0.02, 4, **kwargs)
+
+        peak_memory(model.make_prediction, 1.0, 0.05, 0.02, 4, **kwargs)
+        benchmark(model.make_prediction, 1.0, 0.05, 0.02, 4, **kwargs)
+
+    def test_predict_batch(self, benchmark, peak_memory, im_type):
+        model = XGBPredict(im_type, False)
+        inputs = batch_inputs(1_000, True)
+        inputs["strength_ratio"] = np.linspace(1.0, 5.0, 1_000)
+        model.predict_batch(**inputs)
+
+        benchmark.extra_info["rows"] = 1_000
+        peak_memory(model.predict_batch, **inputs)
+        benchmark(model.predict_batch, **inputs)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from xgbrhomut.comparison import compare
+from xgbrhomut.r_mu_t import (ec8, guerrini, krawinkler_nassar, miranda,
+                              newmark_hall, vidic)
+
+
+SIZE = 100_000
+
+rng = np.random.default_rng(0)
+MU = rng.uniform(1.0, 8.0, SIZE)
+PERIOD = rng.uniform(0.05, 3.0, SIZE)
+
+
+class ScalarTest:
+    def test_ec8(self, benchmark):
+        benchmark(ec8.strength_ratio, 3, 1, 0.5)
+
+    def test_guerrini_inverse(self, benchmark):
+        benchmark(guerrini.strength_ratio, 3.0, 0.3, "fd", 0.5)
+
+
+class VectorizedTest:
+    @pytest.mark.parametrize("relationship, args", [
+        (ec8.strength_ratio, (MU, PERIOD, 0.5)),
+        (vidic.strength_ratio, (MU, PERIOD, 0.5)),
+        (newmark_hall.strength_ratio, (MU, PERIOD, 0.3, 0.5)),
+        (miranda.strength_ratio, (MU, PERIOD, "alluvium", 1.0)),
+        (krawinkler_nassar.strength_ratio, (MU, PERIOD, 2)),
+        (guerrini.strength_ratio, (MU, PERIOD, "fd", 0.5)),
+    ], ids=["ec8", "vidic", "newmark_hall", "miranda", "krawinkler_nassar",
+            "guerrini"])
+    def test_relationship(self, benchmark, relationship, args):
+        benchmark.extra_info["rows"] = SIZE
+        benchmark(relationship, *args)
+
+
+class ComparisonTest:
+    def test_grid(self, benchmark):
+        periods = np.linspace(0.05, 3.0, 1000)[:, None]
+        ductilities = np.linspace(1.0, 8.0, 100)
+        benchmark.extra_info["rows"] = periods.size * ductilities.size
+        benchmark.pedantic(compare, (periods, ductilities), rounds=3)
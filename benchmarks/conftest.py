@@ -0,0 +1,28 @@
+import tracemalloc
+import warnings
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    # Out-of-range warnings would dominate the timings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+@pytest.fixture
+def peak_memory(benchmark):
+    """Records the peak memory allocated by a call in the benchmark JSON"""
+    def measure(function, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            function(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        benchmark.extra_info["peak_memory_bytes"] = peak
+
+    return measure
@@ -3,5 +3,6 @@ setup(
     package_data={'xgbrhomut': [
         'models/*.sav',
         'models/*.json',
+        'models/bundle/*/*',
     ]},
 )
@@ -0,0 +1,111 @@
+import gc
+import tracemalloc
+import warnings
+
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+
+
+def systems(n, dtype=np.float64, seed=0):
+    rng = np.random.default_rng(seed)
+    return tuple(
+        rng.uniform(low, high, n).astype(dtype) for low, high in (
+            (0.01, 3.0), (0.02, 0.2), (0.02, 0.07), (2.0, 8.0), (0.5, 8.0)))
+
+
+@pytest.mark.buffers
+class BuffersTest:
+    def test_float32_inputs(self):
+        model = XGBPredict("sa", False)
+        expected = model.predict_batch(*systems(1000))
+        prediction = model.predict_batch(
+            *systems(1000, np.float32), dtype=np.float32)
+
+        # Inputs rounded to single precision
+        assert prediction["median"].dtype == np.float32
+        np.testing.assert_allclose(
+            prediction["median"], expected["median"], rtol=1e-5)
+        np.testing.assert_allclose(
+            prediction["dispersion"], expected["dispersion"], rtol=1e-5)
+
+    def test_float32_limits(self):
+        # float32(0.02) is below 0.02, limits are compared in float32
+        model = XGBPredict("sa", True)
+        model.predict_batch(1.0, 0.05, 0.02, 4)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            model.predict_batch(np.float32([0.01, 3.0]), np.float32(0.02),
+                                np.float32(0.07), np.float32(2.0))
+
+    def test_out(self):
+        model = XGBPredict("sa_avg", False)
+        inputs = systems(100)
+        median = np.full(100, np.nan)
+        dispersion = np.full(100, np.nan, dtype=np.float32)
+
+        prediction = model.predict_batch(
+            *inputs, out_median=median, out_dispersion=dispersion)
+        assert prediction["median"] is median
+        assert prediction["dispersion"] is dispersion
+
+        expected = model.predict_batch(*inputs)
+        np.testing.assert_array_equal(median, expected["median"])
+        np.testing.assert_allclose(
+            dispersion, expected["dispersion"], rtol=1e-6)
+
+        # Elastic systems of R
+        model = XGBPredict("sa", False)
+        median = np.full(3, np.nan)
+        dispersion = np.full(3, np.nan)
+        model.predict_batch(1.0, 0.05, 0.02, 4, [0.5, 2.0, 0.8],
+                            out_median=median, out_dispersion=dispersion)
+        assert list(median[[0, 2]]) == [0.5, 0.8]
+        assert list(dispersion[[0, 2]]) == [0.0, 0.0]
+
+        with pytest.raises(ValueError):
+            model.predict_batch(*inputs, out_median=np.empty(99))
+        with pytest.raises(ValueError):
+            model.predict_batch(
+                *inputs, out_median=np.empty(200)[::2])
+
+    def test_flat_memory(self):
+        n_rows = 2_000_000
+        chunk_size = 100_000
+        inputs = systems(n_rows, np.float32)
+        median = np.empty(n_rows, dtype=np.float32)
+        dispersion = np.empty(n_rows, dtype=np.float32)
+
+        model = XGBPredict("sa", False)
+
+        def predict(start):
+            rows = slice(start, start + chunk_size)
+            model.predict_batch(
+                *(value[rows] for value in inputs), out_median=median[rows],
+                out_dispersion=dispersion[rows])
+
+        predict(0)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            predict(0)
+            first = tracemalloc.get_traced_memory()[1] - before
+
+            tracemalloc.reset_peak()
+            for start in range(0, n_rows, chunk_size):
+                predict(start)
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Temporaries of a single chunk only, nothing retained
+        assert peak - before < 1.1 * first
+        assert first < 16 * n_rows
+        assert current - before < 64 * 1024
+
+        expected = model.predict_batch(
+            *(value[-10:] for value in inputs), dtype=np.float32)
+        np.testing.assert_array_equal(median[-10:], expected["median"])
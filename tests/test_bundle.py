@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict, ModelRegistry
+from xgbrhomut.bundle import bundle_matches, export_bundle, has_bundle
+
+
+@pytest.fixture(scope="module")
+def bundle_dir(tmp_path_factory):
+    return export_bundle(tmp_path_factory.mktemp("bundle"))
+
+
+@pytest.mark.bundle
+class BundleTest:
+    @pytest.mark.parametrize("im_type, collapse", [
+        ("sa", False),
+        ("sa", True),
+        ("sa_avg", False),
+        ("sa_avg", True),
+    ])
+    def test_predictions_match(self, bundle_dir, im_type, collapse):
+        source = XGBPredict(
+            im_type, collapse, registry=ModelRegistry(use_bundle=False))
+        bundled = XGBPredict(
+            im_type, collapse, registry=ModelRegistry(bundle_dir=bundle_dir))
+
+        inputs = ([0.3, 1.0, 2.2], [0.05, 0.1, 0.15], [0.02, 0.05, 0.07],
+                  [3, 5, 7], [1.5, 3.0, 6.0])
+        expected = source.predict_batch(*inputs)
+        prediction = bundled.predict_batch(*inputs)
+
+        assert prediction["median"] == pytest.approx(expected["median"])
+        assert prediction["dispersion"] == pytest.approx(
+            expected["dispersion"])
+
+    def test_memory_mapped(self, bundle_dir):
+        registry = ModelRegistry(bundle_dir=bundle_dir)
+        entry = registry.get("R", False)
+
+        assert has_bundle(bundle_dir, "R", False)
+        assert isinstance(entry.dispersions.values, np.memmap)
+
+    def test_fallback(self, tmp_path):
+        registry = ModelRegistry(bundle_dir=tmp_path)
+        entry = registry.get("ro_3", True)
+
+        assert not has_bundle(tmp_path, "ro_3", True)
+        assert not isinstance(entry.dispersions.values, np.memmap)
+
+    def test_numpy_engine_skips_booster(self, bundle_dir):
+        registry = ModelRegistry(bundle_dir=bundle_dir)
+        model = XGBPredict("sa", True, registry=registry, engine="numpy")
+        model.make_prediction(1.0, 0.05, 0.02, 4)
+
+        assert registry.get("R", True)._model is None
+
+    def test_surrogate(self, bundle_dir):
+        registry = ModelRegistry(bundle_dir=bundle_dir)
+        entry = registry.get("ro_2", False)
+
+        assert entry._surrogate is not None
+        assert entry.surrogate.evaluate(1.0, 0.05, 0.02, 4, 3.0) == \
+            pytest.approx(ModelRegistry(use_bundle=False).get(
+                "ro_2", False).surrogate.evaluate(1.0, 0.05, 0.02, 4, 3.0))
+
+    @pytest.mark.parametrize("field", ["version", "models"])
+    def test_stale_bundle(self, tmp_path, field):
+        bundle_dir = export_bundle(tmp_path)
+        manifest = json.loads((bundle_dir / "manifest.json").read_text())
+        if field == "version":
+            manifest["version"] = "0.0.0"
+        else:
+            manifest["models"]["R_xgb"] = "0" * 64
+        (bundle_dir / "manifest.json").write_text(json.dumps(manifest))
+
+        registry = ModelRegistry(bundle_dir=bundle_dir)
+        with pytest.warns(UserWarning, match="source models"):
+            entry = registry.get("R", False)
+
+        assert not bundle_matches(tmp_path, registry.models_dir, "R", False)
+        assert not isinstance(entry.dispersions.values, np.memmap)
+
+    def test_missing_manifest(self, tmp_path):
+        bundle_dir = export_bundle(tmp_path)
+        (bundle_dir / "manifest.json").unlink()
+
+        with pytest.warns(UserWarning):
+            entry = ModelRegistry(bundle_dir=bundle_dir).get("ro_3", True)
+
+        assert not isinstance(entry.dispersions.values, np.memmap)
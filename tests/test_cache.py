@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict, PredictionCache
+from xgbrhomut.curves import CurveGrid
+
+
+@pytest.mark.cache
+class CacheTest:
+    def test_hits_and_misses(self):
+        cache = PredictionCache()
+        model = XGBPredict("sa", False, cache=cache)
+
+        first = model.make_prediction(1.0, 0.05, 0.02, 4, 3.0)
+        second = model.make_prediction(1.0, 0.05, 0.02, 4, 3.0)
+
+        assert first == second
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_quantized_inputs_share_entries(self):
+        cache = PredictionCache(decimals=3)
+        model = XGBPredict("sa_avg", False, cache=cache)
+
+        first = model.make_prediction(1.0, 0.05, 0.02, 4, 3.0)
+        second = model.make_prediction(1.0001, 0.05, 0.02, 4, 3.0)
+
+        assert first == second
+        assert len(cache) == 1
+
+    def test_key_includes_model(self):
+        cache = PredictionCache()
+        XGBPredict("sa", False, cache=cache).make_prediction(
+            1.0, 0.05, 0.02, 4, 3.0)
+        XGBPredict("sa_avg", False, cache=cache).make_prediction(
+            1.0, 0.05, 0.02, 4, 3.0)
+
+        assert cache.stats()["misses"] == 2
+
+    def test_key_includes_dispersion_mode(self, tmp_path):
+        cache = PredictionCache(persist_path=tmp_path / "cache.sqlite")
+        nearest = XGBPredict("sa", False, cache=cache).make_prediction(
+            1.1, 0.06, 0.03, 4.5, 3.3)
+        continuous = XGBPredict(
+            "sa", False, cache=cache, dispersion_mode="continuous"
+        ).make_prediction(1.1, 0.06, 0.03, 4.5, 3.3)
+
+        assert cache.stats()["misses"] == 2
+        assert continuous["dispersion"] != nearest["dispersion"]
+        assert continuous == XGBPredict(
+            "sa", False, dispersion_mode="continuous").make_prediction(
+            1.1, 0.06, 0.03, 4.5, 3.3)
+
+        # Neither does the SQLite tier mix the modes
+        cache.clear()
+        assert XGBPredict("sa", False, cache=cache).make_prediction(
+            1.1, 0.06, 0.03, 4.5, 3.3) == nearest
+        cache.close()
+
+    def test_key_includes_curve_grid(self, tmp_path):
+        cache = PredictionCache(persist_path=tmp_path / "cache.sqlite")
+        args = (1.1, 0.06, 0.03, 4.5)
+        booster = XGBPredict("sa", False)
+        grid = CurveGrid.build(booster, axes=(
+            np.linspace(0.5, 1.5, 3), [0.05, 0.1], [0.02, 0.05], [4, 6]))
+
+        interpolated = XGBPredict("sa", False)
+        interpolated.curve_grid = grid
+        expected = interpolated.make_prediction(*args, strength_ratio=2.0)
+
+        cached = XGBPredict("sa", False, cache=cache)
+        assert cached.make_prediction(*args, strength_ratio=2.0) == \
+            booster.make_prediction(*args, strength_ratio=2.0)
+        cached.curve_grid = grid
+        assert cached.make_prediction(*args, strength_ratio=2.0) == expected
+        assert cache.stats()["misses"] == 2
+
+        # Grids with other curves get their own entries
+        other = CurveGrid.build(booster, axes=(
+            np.linspace(0.5, 1.5, 5), [0.05, 0.1], [0.02, 0.05], [4, 6]))
+        assert other.fingerprint != grid.fingerprint
+        cached.curve_grid = other
+        cached.make_prediction(*args, strength_ratio=2.0)
+        assert cache.stats()["misses"] == 3
+        cache.close()
+
+    def test_key_includes_model_source(self, tmp_path):
+        filename = tmp_path / "cache.sqlite"
+        cache = PredictionCache(persist_path=filename)
+        model = XGBPredict("sa", True, cache=cache)
+        model.make_prediction(1.0, 0.05, 0.02, 4)
+        key = cache.key(
+            "R", True, 1.0, 0.05, 0.02, 4, None, None,
+            source=model.registry.source_hash("R", True))
+        cache.close()
+
+        # Entries of updated models are not served from the SQLite file
+        cache = PredictionCache(persist_path=filename)
+        assert cache.get(key) is not None
+        assert cache.get(key[:-1] + ("0" * 64,)) is None
+        cache.close()
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(maxsize=2)
+        cache.put(cache.key("R", False, 1), {"median": 1, "dispersion": 0})
+        cache.put(cache.key("R", False, 2), {"median": 2, "dispersion": 0})
+        cache.get(cache.key("R", False, 1))
+        cache.put(cache.key("R", False, 3), {"median": 3, "dispersion": 0})
+
+        assert cache.get(cache.key("R", False, 2)) is None
+        assert cache.get(cache.key("R", False, 1))["median"] == 1
+        assert len(cache) == 2
+
+    def test_persistent_tier(self, tmp_path):
+        filename = tmp_path / "predictions.sqlite"
+        cache = PredictionCache(persist_path=filename)
+        model = XGBPredict("sa", False, cache=cache)
+        expected = model.make_prediction(
+            1.0, 0.05, 0.02, 4, strength_ratio=2.0)
+        cache.close()
+
+        cache = PredictionCache(persist_path=filename)
+        model = XGBPredict("sa", False, cache=cache)
+        prediction = model.make_prediction(
+            1.0, 0.05, 0.02, 4, strength_ratio=2.0)
+
+        assert prediction == expected
+        assert cache.stats()["disk_hits"] == 1
+        assert cache.stats()["misses"] == 0
+        cache.close()
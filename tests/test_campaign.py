@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.campaign import make_grid, run_campaign
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return make_grid(
+        [0.2, 1.0, 2.0], [0.05, 0.1], 0.02, [3, 6], [1.5, 3.0, 5.0])
+
+
+@pytest.mark.campaign
+class CampaignTest:
+    def test_make_grid(self, grid):
+        assert len(grid["period"]) == 36
+        assert list(grid["dynamic_ductility"][:3]) == [1.5, 3.0, 5.0]
+        assert grid["period"][0] == 0.2 and grid["period"][-1] == 2.0
+
+    def test_in_order(self, grid):
+        models = [("sa", False), ("sa_avg", True)]
+        results = run_campaign(
+            grid, models=models, chunk_size=5, n_workers=2, nthread=1)
+
+        for im_type, collapse in models:
+            expected = XGBPredict(im_type, collapse).predict_batch(**grid)
+            result = results[(im_type, collapse)]
+            np.testing.assert_allclose(result["median"], expected["median"])
+            np.testing.assert_allclose(
+                result["dispersion"], expected["dispersion"])
+
+    def test_resume(self, grid, tmp_path):
+        calls = []
+        first = run_campaign(
+            grid, models=[("sa_avg", False)], chunk_size=10, n_workers=0,
+            checkpoint_dir=tmp_path,
+            progress=lambda done, total: calls.append((done, total)))
+        assert calls[-1] == (4, 4)
+        assert len(list(tmp_path.glob("*.npz"))) == 4
+
+        # Remove a chunk, only that one is recomputed
+        sorted(tmp_path.glob("*.npz"))[1].unlink()
+        calls.clear()
+        second = run_campaign(
+            grid, models=[("sa_avg", False)], chunk_size=10, n_workers=0,
+            checkpoint_dir=tmp_path,
+            progress=lambda done, total: calls.append((done, total)))
+        assert calls == [(3, 4), (4, 4)]
+
+        np.testing.assert_array_equal(
+            first[("sa_avg", False)]["median"],
+            second[("sa_avg", False)]["median"])
+
+    def test_checkpoint_mismatch(self, grid, tmp_path):
+        run_campaign(grid, models=[("sa", True)], chunk_size=10,
+                     n_workers=0, checkpoint_dir=tmp_path)
+        with pytest.raises(ValueError):
+            run_campaign(grid, models=[("sa", True)], chunk_size=20,
+                         n_workers=0, checkpoint_dir=tmp_path)
+
+    def test_checkpoint_inputs_mismatch(self, grid, tmp_path):
+        run_campaign(grid, models=[("sa", True)], chunk_size=10,
+                     n_workers=0, checkpoint_dir=tmp_path)
+
+        # Same length, different values
+        other = dict(grid, period=grid["period"][::-1].copy())
+        with pytest.raises(ValueError):
+            run_campaign(other, models=[("sa", True)], chunk_size=10,
+                         n_workers=0, checkpoint_dir=tmp_path)
+        with pytest.raises(ValueError):
+            run_campaign(grid, models=[("sa", True)], chunk_size=10,
+                         n_workers=0, checkpoint_dir=tmp_path,
+                         engine="numpy")
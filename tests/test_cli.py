@@ -0,0 +1,91 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.cli import main
+
+
+@pytest.fixture(scope="module")
+def systems():
+    rng = np.random.default_rng(0)
+    n = 250
+    return pd.DataFrame({
+        "period": rng.uniform(0.1, 3.0, n),
+        "damping": rng.uniform(0.02, 0.2, n),
+        "hardening_ratio": rng.uniform(0.02, 0.07, n),
+        "ductility": rng.uniform(2, 8, n),
+        "dynamic_ductility": rng.uniform(1, 6, n),
+        "strength_ratio": rng.uniform(1, 6, n),
+    })
+
+
+@pytest.mark.cli
+class CliTest:
+    def test_forward_csv(self, systems, tmp_path, capsys):
+        systems.to_csv(tmp_path / "systems.csv", index=False)
+
+        main([str(tmp_path / "systems.csv"), str(tmp_path / "out.csv"),
+              "--im-type", "sa", "--chunk-size", "100"])
+
+        output = pd.read_csv(tmp_path / "out.csv")
+        expected = XGBPredict("sa", False).predict_batch(
+            systems.drop(columns="strength_ratio"))
+
+        assert len(output) == len(systems)
+        np.testing.assert_allclose(output["median"], expected["median"])
+        assert "rows/s" in capsys.readouterr().err
+
+    def test_inverse_parquet(self, systems, tmp_path):
+        pytest.importorskip("pyarrow")
+        systems.to_parquet(tmp_path / "systems.parquet")
+
+        main([str(tmp_path / "systems.parquet"),
+              str(tmp_path / "out.parquet"), "--im-type", "sa_avg",
+              "--mode", "inverse", "--chunk-size", "64"])
+
+        output = pd.read_parquet(tmp_path / "out.parquet")
+        expected = XGBPredict("sa_avg", False).predict_batch(
+            systems.drop(columns="dynamic_ductility"))
+
+        assert "dynamic_ductility" not in output.columns
+        np.testing.assert_allclose(output["median"], expected["median"])
+
+    def test_wrong_im_type(self, systems, tmp_path, capsys):
+        systems.to_csv(tmp_path / "systems.csv", index=False)
+
+        with pytest.raises(SystemExit) as error:
+            main([str(tmp_path / "systems.csv"), str(tmp_path / "out.csv"),
+                  "--im-type", "pga"])
+
+        assert error.value.code == 2
+        assert "invalid choice: 'pga'" in capsys.readouterr().err
+        assert not (tmp_path / "out.csv").exists()
+
+    def test_inverse_memory(self, tmp_path, monkeypatch):
+        # Curves of 50 systems per model call
+        monkeypatch.setattr(XGBPredict, "curve_chunk_size", 50)
+        rng = np.random.default_rng(1)
+
+        peaks = []
+        for n in (400, 1600):
+            pd.DataFrame({
+                "period": rng.uniform(0.1, 3.0, n),
+                "damping": 0.05,
+                "hardening_ratio": 0.02,
+                "ductility": rng.uniform(2, 8, n),
+                "strength_ratio": rng.uniform(1, 6, n),
+            }).to_csv(tmp_path / "systems.csv", index=False)
+
+            tracemalloc.start()
+            try:
+                main([str(tmp_path / "systems.csv"),
+                      str(tmp_path / "out.csv"), "--mode", "inverse"])
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+
+        # Bounded by the curve chunks, not by the rows of a file chunk
+        assert peaks[1] < 1.5 * peaks[0]
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.comparison import band_metrics, compare, evaluate
+from xgbrhomut.r_mu_t import ec8, krawinkler_nassar, miranda, newmark_hall, \
+    vidic
+
+
+PERIODS = np.array([0.1, 0.3, 0.5, 1.0, 2.5, 3.0])[:, None]
+DUCTILITIES = np.array([1.5, 3.0, 5.0])
+
+
+@pytest.fixture(scope="module")
+def values():
+    return evaluate(PERIODS, DUCTILITIES)
+
+
+@pytest.mark.comparison
+class ComparisonTest:
+    def test_evaluate(self, values):
+        assert values["xgb"].shape == (6, 3)
+
+        model = XGBPredict("sa", False)
+        for i, j in [(0, 0), (3, 1), (5, 2)]:
+            period, mu = PERIODS[i, 0], DUCTILITIES[j]
+            expected = {
+                "xgb": model.make_prediction(
+                    period, 0.05, 0.02, 8.0, mu)["median"],
+                "ec8": ec8.strength_ratio(mu, period, 0.5),
+                "vidic": vidic.strength_ratio(mu, period, 0.5),
+                "newmark_hall": newmark_hall.strength_ratio(
+                    mu, period, 0.5 * np.sqrt(2 * mu - 1) / mu, 0.5),
+                "miranda": miranda.strength_ratio(mu, period, "rock", 1.0),
+                "krawinkler_nassar": krawinkler_nassar.strength_ratio(
+                    mu, period, 2),
+            }
+            for name, value in expected.items():
+                assert values[name][i, j] == pytest.approx(value)
+
+    def test_parameters(self, values):
+        result = evaluate(
+            PERIODS, DUCTILITIES, relationships=("ec8", "miranda"),
+            parameters={"miranda": {"site": "alluvium"}})
+        assert "vidic" not in result
+        np.testing.assert_array_equal(result["ec8"], values["ec8"])
+        assert result["miranda"][2, 1] == pytest.approx(
+            miranda.strength_ratio(3.0, 0.5, "alluvium", 1.0))
+
+    def test_band_metrics(self, values):
+        metrics = band_metrics(values, bands=[0.0, 0.5, 3.0])
+        assert list(metrics["relationship"][:2]) == ["ec8", "ec8"]
+
+        # The last band includes its upper edge
+        error = np.log(values["vidic"] / values["xgb"])
+        for band, rows in enumerate([slice(0, 2), slice(2, 6)]):
+            row = 2 + band
+            assert metrics["relationship"][row] == "vidic"
+            assert metrics["n"][row] == error[rows].size
+            assert metrics["bias"][row] == pytest.approx(
+                error[rows].mean())
+            assert metrics["spread"][row] == pytest.approx(
+                error[rows].std())
+            assert metrics["rmse"][row] == pytest.approx(
+                np.sqrt(np.mean(error[rows] ** 2)))
+
+    def test_invalid_points(self, values):
+        values = dict(values, ec8=values["ec8"].copy())
+        values["ec8"][0, 0] = np.nan
+        metrics = band_metrics(values, bands=[0.0, 0.2])
+        assert metrics["n"][0] == 2
+
+    def test_compare(self):
+        frame = compare(PERIODS, DUCTILITIES, bands=[0.0, 1.0, 3.0])
+        assert list(frame.columns) == [
+            "relationship", "period_min", "period_max", "n", "bias",
+            "spread", "rmse"]
+        assert len(frame) == 10
+        assert frame["n"].sum() == 5 * 18
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            evaluate(PERIODS, DUCTILITIES, relationships=("guerrini",))
+        with pytest.raises(ValueError):
+            evaluate(PERIODS, DUCTILITIES, model=XGBPredict("sa_avg", False))
+        with pytest.raises(ValueError):
+            band_metrics({"period": PERIODS, "xgb": PERIODS}, bands=[1.0])
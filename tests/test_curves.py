@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.curves import CurveGrid, multilinear
+
+
+@pytest.fixture(scope="module")
+def curve_file(tmp_path_factory):
+    filename = tmp_path_factory.mktemp("curves") / "R_curves.npz"
+    CurveGrid.build(XGBPredict("sa", False)).save(filename)
+    return filename
+
+
+@pytest.mark.curves
+class CurvesTest:
+    def test_predict_curve(self):
+        model = XGBPredict("sa_avg", False)
+        curves = model.predict_curve([0.5, 1.0], 0.05, 0.02, 4)
+
+        assert curves["median"].shape == (2, model.ductility_range.size)
+        assert curves["dispersion"].shape == curves["median"].shape
+
+        prediction = model.make_prediction(1.0, 0.05, 0.02, 4, 3.05)
+        index = np.argmin(np.abs(curves["ductility"] - 3.05))
+        assert curves["median"][1, index] == pytest.approx(
+            prediction["median"])
+
+    def test_collapse_raises(self):
+        with pytest.raises(ValueError):
+            XGBPredict("sa", True).predict_curve(1.0, 0.05, 0.02, 4)
+
+    def test_multilinear(self):
+        axes = (np.array([0.0, 1.0]), np.array([0.0, 2.0, 4.0]))
+        values = axes[0][:, None] + 3 * axes[1][None, :]
+
+        result = multilinear(axes, values, (
+            np.array([0.25, 0.5, 2.0]), np.array([1.0, 3.0, -1.0])))
+
+        assert result == pytest.approx([3.25, 9.5, 1.0])
+
+    def test_grid_matches_model_on_knots(self, curve_file):
+        model = XGBPredict("sa", False)
+        grid = CurveGrid.load(curve_file)
+        inputs = (grid.periods[4], grid.dampings[1],
+                  grid.hardening_ratios[0], grid.ductilities[2])
+
+        expected = model.predict_curve(*inputs)
+        model.curve_grid = grid
+        interpolated = model.predict_curve(*inputs)
+
+        assert grid.parameter == "R"
+        assert interpolated["median"] == pytest.approx(expected["median"])
+        assert interpolated["dispersion"] == pytest.approx(
+            expected["dispersion"])
+
+    def test_grid_inverse(self, curve_file):
+        model = XGBPredict("sa", False)
+        model.curve_grid = CurveGrid.load(curve_file)
+
+        prediction = model.predict_batch(
+            [0.6, 1.2], 0.05, 0.03, 4, strength_ratio=2.0)
+
+        assert np.all(np.isfinite(prediction["median"]))
+        assert np.all(prediction["median"] > 1)
@@ -0,0 +1,131 @@
+import json
+
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.dispersions import DispersionSurrogate, DispersionTable, \
+    interp_rows, nearest_index
+from xgbrhomut.registry import path
+
+
+def load_table(name):
+    with open(path / f"models/{name}_dispersions.json") as f:
+        dispersions = json.load(f)
+    return dispersions, DispersionTable.from_dict(dispersions)
+
+
+@pytest.mark.dispersions
+class DispersionTableTest:
+    def test_grid(self):
+        _, table = load_table("R_xgb")
+        assert table.values.shape == (11, 6, 4, 7, 30)
+        assert not table.collapse
+
+        _, table = load_table("R_xgb_collapse")
+        assert table.values.shape == (11, 6, 4, 7)
+        assert table.collapse
+
+    def test_collapse_nearest(self):
+        dispersions, table = load_table("ro_3_xgb_collapse")
+        value = table.lookup(0.97, 0.06, 0.03, 4.4)
+        assert value == dispersions["1.0"]["0.05"]["0.02"]["4"]
+
+    def test_interpolation(self):
+        dispersions, table = load_table("ro_2_xgb")
+        row = dispersions["1.0"]["0.05"]["0.02"]["4"]
+        dynamic_ductility = np.array([1.0, 1.125, 2.3])
+        value = table.lookup(1.0, 0.05, 0.02, 4, dynamic_ductility)
+
+        expected = np.interp(dynamic_ductility, dispersions["ductility"], row)
+        assert value == pytest.approx(expected)
+
+    def test_broadcast(self):
+        _, table = load_table("R_xgb")
+        value = table.lookup(
+            np.array([[0.5], [1.0]]), 0.05, 0.02, 4, np.array([1.0, 2.0, 3.0]))
+        assert value.shape == (2, 3)
+
+    def test_unattainable(self):
+        dispersions, table = load_table("R_xgb")
+        row = dispersions["0.01"]["0.02"]["0.02"]["2"]
+
+        with pytest.warns(UserWarning):
+            value = table.lookup(0.01, 0.02, 0.02, 2, 7.0)
+        assert value == max(row)
+
+    def test_chunks(self):
+        _, table = load_table("R_xgb")
+        rng = np.random.default_rng(3)
+        inputs = (rng.uniform(0.01, 3.0, 1000), 0.05, 0.02, 4,
+                  rng.uniform(0.5, 8.0, 1000))
+
+        with pytest.warns(UserWarning):
+            expected = table.lookup(*inputs)
+        with pytest.warns(UserWarning):
+            value = table.lookup(*inputs, chunk_size=7)
+        np.testing.assert_array_equal(value, expected)
+
+    def test_nearest_index(self):
+        axis = np.array([0.0, 1.0, 2.0])
+        index = nearest_index(axis, [-1.0, 0.5, 0.6, 1.9, 5.0, np.nan])
+        assert list(index) == [0, 0, 1, 2, 2, 0]
+
+    def test_interp_rows(self):
+        xp = np.array([[0.0, 1.0, 1.0, 2.0], [2.0, 0.0, 1.0, 3.0]])
+        fp = np.array([[0.0, 1.0, 3.0, 4.0], [1.0, 2.0, np.nan, 5.0]])
+        x = np.array([1.0, 2.5])
+
+        expected = [np.interp(x[i], np.sort(xp[i]), fp[i][np.argsort(
+            xp[i], kind="mergesort")]) for i in range(2)]
+        assert interp_rows(x, xp, fp) == pytest.approx(
+            expected, nan_ok=True)
+
+
+@pytest.mark.dispersions
+class DispersionSurrogateTest:
+    def test_matches_table_on_grid(self):
+        _, table = load_table("ro_2_xgb")
+        surrogate = DispersionSurrogate.from_table(table)
+        axes = table.axes + (table.dynamic_ductilities,)
+
+        mesh = np.meshgrid(*axes, indexing="ij")
+        with pytest.warns(UserWarning):
+            expected = table.lookup(*mesh)
+
+        assert not np.isnan(surrogate.values).any()
+        np.testing.assert_allclose(surrogate.evaluate(*mesh), expected)
+
+    def test_continuous(self):
+        _, table = load_table("R_xgb")
+        surrogate = DispersionSurrogate.from_table(table)
+
+        period = np.linspace(0.5, 0.75, 101)
+        dispersion = surrogate.evaluate(period, 0.05, 0.02, 4, 2.0)
+
+        # Linear between neighbouring grid periods
+        assert dispersion[50] == pytest.approx(
+            (dispersion[0] + dispersion[-1]) / 2)
+        assert np.all(np.abs(np.diff(dispersion)) <= np.abs(
+            dispersion[-1] - dispersion[0]) / 100 + 1e-12)
+
+    def test_save_and_load(self, tmp_path):
+        _, table = load_table("R_xgb_collapse")
+        surrogate = DispersionSurrogate.from_table(table)
+        surrogate.save(tmp_path / "surrogate.npz")
+        loaded = DispersionSurrogate.load(tmp_path / "surrogate.npz")
+
+        assert loaded.collapse
+        assert loaded.evaluate(0.8, 0.06, 0.03, 4.4) == pytest.approx(
+            surrogate.evaluate(0.8, 0.06, 0.03, 4.4))
+
+    def test_continuous_mode(self):
+        model = XGBPredict("sa_avg", False, dispersion_mode="continuous")
+        nearest = XGBPredict("sa_avg", False)
+
+        on_grid = model.make_prediction(1.0, 0.05, 0.02, 4, 3.0)
+        assert on_grid == pytest.approx(
+            nearest.make_prediction(1.0, 0.05, 0.02, 4, 3.0))
+
+        with pytest.raises(ValueError):
+            XGBPredict("sa", False, dispersion_mode="linear")
@@ -0,0 +1,127 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.campaign import make_grid
+from xgbrhomut.distributed import (
+    create_queue, merge_results, requeue_stale, run_worker, status)
+
+
+MODELS = [("sa", False), ("sa_avg", True)]
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return make_grid(
+        [0.2, 1.0, 2.0], [0.05, 0.1], 0.02, [3, 6], [1.5, 3.0, 5.0])
+
+
+def _start_worker(queue_dir):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(__file__).parents[1]), env.get("PYTHONPATH", "")])
+    return subprocess.Popen(
+        [sys.executable, "-m", "xgbrhomut.distributed", "worker",
+         str(queue_dir)], env=env, stderr=subprocess.PIPE)
+
+
+def _assert_expected(results, grid):
+    for model in MODELS:
+        expected = XGBPredict(*model).predict_batch(**grid)
+        np.testing.assert_allclose(
+            results[model]["median"], expected["median"])
+        np.testing.assert_allclose(
+            results[model]["dispersion"], expected["dispersion"])
+
+
+@pytest.mark.distributed
+class DistributedTest:
+    def test_local_processes(self, grid, tmp_path):
+        create_queue(tmp_path, grid, models=MODELS, chunk_size=5)
+
+        workers = [_start_worker(tmp_path) for _ in range(3)]
+        for worker in workers:
+            assert worker.wait(timeout=120) == 0
+
+        assert status(tmp_path) == {"pending": 0, "claimed": 0, "done": 16}
+        _assert_expected(merge_results(tmp_path), grid)
+
+    def test_restart(self, grid, tmp_path):
+        create_queue(tmp_path, grid, models=MODELS, chunk_size=10,
+                     shard_format="parquet")
+        assert run_worker(tmp_path, max_tasks=3) == 3
+
+        with pytest.raises(RuntimeError):
+            merge_results(tmp_path)
+
+        # A worker stopping after claiming a chunk, and one stopping after
+        # writing its shard
+        (tmp_path / "pending" / "sa_000003.json").rename(
+            tmp_path / "claimed" / "sa_000003.json")
+        (tmp_path / "done" / "sa_000000.json").rename(
+            tmp_path / "claimed" / "sa_000000.json")
+
+        assert requeue_stale(tmp_path, timeout=3600) == 0
+        assert requeue_stale(tmp_path, timeout=0) == 2
+
+        # Only chunks without shards are predicted
+        assert run_worker(tmp_path) == 5
+        assert run_worker(tmp_path) == 0
+        _assert_expected(merge_results(tmp_path), grid)
+
+        # Restarting the coordinator keeps the queue
+        create_queue(tmp_path, grid, models=MODELS, chunk_size=10,
+                     shard_format="parquet")
+        assert status(tmp_path)["done"] == 8
+
+    def test_heartbeat(self, grid, tmp_path, monkeypatch):
+        create_queue(tmp_path, grid, models=[("sa", True)], chunk_size=40)
+        predict_batch = XGBPredict.predict_batch
+        requeued = []
+
+        def slow_predict_batch(self, *args, **kwargs):
+            time.sleep(0.5)
+            requeued.append(requeue_stale(tmp_path, timeout=0.3))
+            return predict_batch(self, *args, **kwargs)
+
+        monkeypatch.setattr(XGBPredict, "predict_batch", slow_predict_batch)
+
+        # A live claim is not requeued
+        assert run_worker(tmp_path, heartbeat=0.05) == 1
+        assert requeued == [0]
+        assert status(tmp_path)["done"] == 1
+
+    def test_claim_taken_over(self, grid, tmp_path, monkeypatch):
+        create_queue(tmp_path, grid, models=[("sa", True)], chunk_size=40)
+        predict_batch = XGBPredict.predict_batch
+
+        def taken_over(self, *args, **kwargs):
+            # Another worker completes the requeued chunk meanwhile
+            claimed = tmp_path / "claimed" / "sa_collapse_000000.json"
+            claimed.rename(tmp_path / "done" / claimed.name)
+            return predict_batch(self, *args, **kwargs)
+
+        monkeypatch.setattr(XGBPredict, "predict_batch", taken_over)
+
+        assert run_worker(tmp_path) == 1
+        assert status(tmp_path) == {"pending": 0, "claimed": 0, "done": 1}
+        expected = predict_batch(XGBPredict("sa", True), **grid)
+        np.testing.assert_allclose(
+            merge_results(tmp_path)[("sa", True)]["median"],
+            expected["median"])
+
+    def test_mismatch(self, grid, tmp_path):
+        create_queue(tmp_path, grid, models=MODELS, chunk_size=10)
+        with pytest.raises(ValueError):
+            create_queue(tmp_path, grid, models=MODELS, chunk_size=20)
+
+        # Same length, different values
+        other = dict(grid, period=grid["period"][::-1].copy())
+        with pytest.raises(ValueError):
+            create_queue(tmp_path, other, models=MODELS, chunk_size=10)
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.fragility import lognormal_cdf, mean_annual_frequency, \
+    portfolio_risk
+
+
+HAZARD_IM = np.logspace(-2, 1, 80)
+HAZARD_RATE = 1e-2 * (HAZARD_IM / 0.1) ** -2.5
+
+
+@pytest.mark.fragility
+class FragilityTest:
+    def test_lognormal_cdf(self):
+        assert lognormal_cdf(1.0, 1.0, 0.4) == pytest.approx(0.5)
+        assert lognormal_cdf([0.5, 2.0], 1.0, 0.0) == pytest.approx(
+            [0.0, 1.0])
+
+    def test_mean_annual_frequency(self):
+        # Closed form for a power law hazard, lambda = k0 * im^-k
+        k0, k = 1e-2 * 0.1 ** 2.5, 2.5
+        im = np.logspace(-4, 3, 2000)
+        median, dispersion = np.array([0.3, 0.8]), np.array([0.3, 0.5])
+
+        frequency = mean_annual_frequency(
+            im, k0 * im ** -k, median, dispersion)
+        expected = k0 * median ** -k * np.exp(0.5 * k ** 2 * dispersion ** 2)
+
+        assert frequency == pytest.approx(expected, rel=1e-3)
+
+    def test_portfolio(self):
+        period = np.array([0.3, 1.0, 2.0])
+        sa_yield = np.array([0.4, 0.2, 0.1])
+        levels = [1.0, 2.0, 4.0]
+
+        risk = portfolio_risk(
+            period, 0.05, 0.02, 4, sa_yield, HAZARD_IM, HAZARD_RATE,
+            ductility_levels=levels)
+
+        collapse = XGBPredict("sa", True).predict_batch(
+            period, 0.05, 0.02, 4)
+        expected = mean_annual_frequency(
+            HAZARD_IM, HAZARD_RATE, collapse["median"] * sa_yield,
+            collapse["dispersion"])
+
+        assert risk["collapse"] == pytest.approx(expected)
+        assert risk["exceedance"].shape == (3, 3)
+        # Exceedance decreases with the ductility level and includes
+        # collapse
+        assert np.all(np.diff(risk["exceedance"], axis=1) <= 0)
+        assert np.all(risk["exceedance"][:, -1] >= risk["collapse"])
+
+    def test_chunking(self):
+        period = np.linspace(0.1, 2.0, 20)
+        kwargs = dict(im_type="sa_avg", ductility_levels=[1.0, 3.0])
+
+        full = portfolio_risk(
+            period, 0.05, 0.02, 4, 0.2, HAZARD_IM, HAZARD_RATE, **kwargs)
+        chunked = portfolio_risk(
+            period, 0.05, 0.02, 4, 0.2, HAZARD_IM, HAZARD_RATE,
+            chunk_size=3, **kwargs)
+
+        assert chunked["collapse"] == pytest.approx(full["collapse"])
+        np.testing.assert_allclose(chunked["exceedance"], full["exceedance"])
+
+    def test_collapse_hazard(self):
+        collapse_hazard = (HAZARD_IM, 0.5 * HAZARD_RATE)
+        kwargs = dict(im_type="sa_avg", ductility_levels=[1.0, 3.0],
+                      collapse_hazard=collapse_hazard)
+
+        # Collapse on another IM is not mixed into the exceedances
+        with pytest.raises(ValueError):
+            portfolio_risk(
+                1.0, 0.05, 0.02, 4, 0.2, HAZARD_IM, HAZARD_RATE, **kwargs)
+
+        risk = portfolio_risk(
+            1.0, 0.05, 0.02, 4, 0.2, HAZARD_IM, HAZARD_RATE,
+            include_collapse=False, **kwargs)
+        collapse = XGBPredict("sa_avg", True).predict_batch(
+            1.0, 0.05, 0.02, 4)
+
+        assert risk["collapse"] == pytest.approx(mean_annual_frequency(
+            *collapse_hazard, collapse["median"] * 0.2,
+            collapse["dispersion"]))
+
+    def test_invalid_hazard(self):
+        with pytest.raises(ValueError):
+            mean_annual_frequency(HAZARD_IM[::-1], HAZARD_RATE, 1.0, 0.3)
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from xgbrhomut import XGBPredict, ModelRegistry
+from xgbrhomut.instrumentation import Instrumentation
+
+
+@pytest.mark.instrumentation
+class InstrumentationTest:
+    def test_stages(self):
+        instrumentation = Instrumentation()
+        model = XGBPredict(
+            "sa", False, registry=ModelRegistry(use_bundle=False),
+            instrumentation=instrumentation)
+
+        frame = pd.DataFrame({
+            "period": [0.5, 1.0, 1.5],
+            "damping": 0.05,
+            "hardening_ratio": 0.02,
+            "ductility": 4,
+            "dynamic_ductility": [0.5, 2.0, 3.0],
+        })
+        model.predict_batch(frame)
+        stages = instrumentation.as_dict()
+
+        for name in ("frame", "verify", "load_booster", "parse_dispersions",
+                     "scale", "dmatrix", "booster_predict",
+                     "dispersion_lookup"):
+            assert stages[name]["calls"] == 1
+            assert stages[name]["seconds"] >= 0
+
+        # The elastic system is not passed to the model
+        assert stages["booster_predict"]["rows"] == 2
+        assert stages["frame"]["rows"] == 3
+
+    def test_numpy_engine(self):
+        instrumentation = Instrumentation()
+        model = XGBPredict(
+            "sa_avg", True, engine="numpy", instrumentation=instrumentation)
+        model.make_prediction(1.0, 0.05, 0.02, 4)
+        model.make_prediction(1.0, 0.05, 0.02, 4)
+
+        stages = instrumentation.as_dict()
+        assert stages["trees_predict"]["calls"] == 2
+        assert "booster_predict" not in stages
+
+    def test_callback_and_reset(self):
+        events = []
+        instrumentation = Instrumentation(
+            callback=lambda *event: events.append(event))
+        model = XGBPredict("sa", True, instrumentation=instrumentation)
+        model.make_prediction(1.0, 0.05, 0.02, 4)
+
+        assert len(events) == sum(
+            stage["calls"] for stage in instrumentation.as_dict().values())
+        assert all(len(event) == 3 for event in events)
+
+        instrumentation.reset()
+        assert instrumentation.as_dict() == {}
@@ -0,0 +1,84 @@
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from xgbrhomut import XGBPredict, ModelRegistry
+from xgbrhomut.registry import feature_names
+
+
+@pytest.mark.registry
+class ModelRegistryTest:
+    def test_loads_once(self):
+        registry = ModelRegistry()
+        first = registry.get("R", False)
+        second = registry.get("R", False)
+
+        assert first is second
+        assert registry.stats() == {"hits": 1, "misses": 1, "loaded": 1}
+
+    def test_shared_across_instances(self):
+        registry = ModelRegistry()
+        a = XGBPredict("sa", False, registry=registry)
+        b = XGBPredict("sa", False, registry=registry)
+
+        a.make_prediction(1, 0.05, 0.05, 4, 3)
+        b.make_prediction(1, 0.05, 0.05, 4, 3)
+
+        assert registry.misses == 1
+        assert registry.hits == 1
+
+    def test_preload_and_evict(self):
+        registry = ModelRegistry()
+        registry.preload()
+        assert len(registry.loaded()) == 4
+
+        registry.evict("R")
+        assert sorted(registry.loaded()) == [("ro_2", False), ("ro_3", True)]
+
+        registry.evict(collapse=True)
+        assert registry.loaded() == [("ro_2", False)]
+
+        registry.evict()
+        assert registry.loaded() == []
+
+    def test_thread_safe(self):
+        registry = ModelRegistry()
+        entries = []
+
+        def worker():
+            entries.append(registry.get("ro_2", False))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert registry.misses == 1
+        assert registry.hits == 7
+        assert all(entry is entries[0] for entry in entries)
+
+    def test_scaler_folded(self):
+        registry = ModelRegistry(use_bundle=False)
+        scaler = joblib.load(
+            registry.models_dir / "ro_2_xgb_scaler.sav")
+        entry = registry.get("ro_2", False)
+
+        x = pd.DataFrame(
+            [[1.0, 0.05, 0.02, 4.0, 3.0]], columns=scaler.feature_names_in_)
+        np.testing.assert_array_equal(
+            entry.scaler.transform(x.to_numpy()), scaler.transform(x))
+
+        transformed = entry.scaler.transform(x.to_numpy(), dtype=np.float32)
+        assert transformed.dtype == np.float32
+        assert transformed.flags["C_CONTIGUOUS"]
+
+    def test_scaler_features_validated(self):
+        scaler = ModelRegistry().get("R", True).scaler
+        scaler.validate(feature_names(True))
+
+        with pytest.raises(ValueError):
+            scaler.validate(feature_names(False))
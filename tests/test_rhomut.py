@@ -81,3 +81,47 @@ class RhomutTest:
     ])
     def test_vidic(self, T, R):
         assert round(vidic.strength_ratio(5, T, 1.0), 0) == R
+
+    @pytest.mark.parametrize("function", [
+        lambda mu, T: ec8.strength_ratio(mu, T, 0.5),
+        lambda mu, T: vidic.strength_ratio(mu, T, 0.5),
+        lambda mu, T: krawinkler_nassar.strength_ratio(mu, T, 2),
+        lambda mu, T: miranda.strength_ratio(mu, T, "rock", 1),
+        lambda mu, T: newmark_hall.strength_ratio(mu, T, 0.5, 0.8),
+        lambda mu, T: guerrini.ductility(mu, 3.0, T, "fd", 0.5),
+    ])
+    def test_vectorized(self, function):
+        mu = np.array([1.5, 2.0, 4.0, 8.0])[:, None]
+        T = np.array([0.01, 0.1, 0.3, 0.6, 1.0, 2.0])[None, :]
+
+        result = function(mu, T)
+
+        assert isinstance(result, np.ndarray)
+        assert result.shape == (4, 6)
+        for i, j in np.ndindex(result.shape):
+            assert result[i, j] == pytest.approx(
+                function(mu[i, 0], T[0, j]), rel=1e-12)
+
+    def test_scalar_output(self):
+        assert isinstance(ec8.strength_ratio(3, 0.5, 1.0), float)
+        assert isinstance(newmark_hall.strength_ratio(5, 0.02, 0.5, 1), float)
+
+    def test_guerrini_inverse(self):
+        mu = np.array([0.8, 1.5, 3.0, 6.0])
+        T = np.array([0.05, 0.1, 0.3, 1.0])
+        case = np.array(["FD", "in", "SD", "fd"])
+
+        R, report = guerrini.strength_ratio(
+            mu, T, case, 0.8, full_output=True)
+
+        assert report.converged.all()
+        assert report.residual.max() <= 1e-10
+        assert R[0] == 0.8
+        assert guerrini.ductility_demand(R, T, case, 0.8) == pytest.approx(mu)
+        for i in range(1, 4):
+            assert guerrini.ductility(
+                R[i], mu[i], T[i], case[i], 0.8) == pytest.approx(0, abs=1e-9)
+
+    def test_guerrini_inverse_case(self):
+        with pytest.raises(ValueError):
+            guerrini.strength_ratio([2.0, 3.0], 0.5, ["fd", "aa"], 0.8)
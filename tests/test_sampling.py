@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.sampling import iter_samples, sample_lognormal, \
+    sample_predictions
+
+
+@pytest.mark.sampling
+class SamplingTest:
+    def test_reproducible_and_chunk_independent(self):
+        median = np.array([1.0, 2.0, 3.0, 4.0])
+        first = sample_lognormal(median, 0.4, 50, seed=1, chunk_size=1)
+        second = sample_lognormal(median, 0.4, 50, seed=1, chunk_size=3)
+
+        np.testing.assert_array_equal(first, second)
+
+    def test_statistics(self):
+        samples = sample_lognormal(
+            [2.0, 3.0], [0.3, 0.5], 200_000, correlation=0.5, seed=0)
+        logs = np.log(samples)
+
+        assert np.median(samples, axis=1) == pytest.approx(
+            [2.0, 3.0], rel=0.01)
+        assert logs.std(axis=1) == pytest.approx([0.3, 0.5], rel=0.01)
+        assert np.corrcoef(logs)[0, 1] == pytest.approx(0.5, abs=0.01)
+
+    def test_preallocated_output(self):
+        out = np.empty((2, 3, 10), dtype=np.float32)
+        samples = sample_lognormal(
+            np.ones((2, 3)), 0.0, 10, seed=0, out=out)
+
+        assert samples is out
+        np.testing.assert_array_equal(out, 1.0)
+
+        with pytest.raises(ValueError):
+            sample_lognormal(np.ones(3), 0.1, 10, out=out)
+
+    def test_iter_samples(self):
+        chunks = list(iter_samples(
+            np.ones(5), 0.2, 4, seed=3, chunk_size=2))
+
+        assert [rows.start for rows, _ in chunks] == [0, 2, 4]
+        np.testing.assert_array_equal(
+            np.vstack([block for _, block in chunks]),
+            sample_lognormal(np.ones(5), 0.2, 4, seed=3))
+
+    def test_sample_predictions(self):
+        model = XGBPredict("sa", False)
+        samples = sample_predictions(
+            model, 1.0, 0.05, 0.02, 4,
+            dynamic_ductility=np.array([0.5, 2.0, 4.0]), n_samples=20_000,
+            seed=0)
+
+        prediction = model.predict_batch(
+            1.0, 0.05, 0.02, 4, np.array([0.5, 2.0, 4.0]))
+
+        assert samples.shape == (3, 20_000)
+        # Elastic systems have no dispersion
+        np.testing.assert_array_equal(samples[0], 0.5)
+        assert np.median(samples, axis=1) == pytest.approx(
+            prediction["median"], rel=0.02)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.validation import RANGES
+
+
+@pytest.fixture(scope="module")
+def model():
+    return XGBPredict("sa", False)
+
+
+@pytest.mark.sensitivity
+class SensitivityTest:
+    def test_matches_finite_differences(self, model):
+        result = model.sensitivity([0.5, 1.0], 0.05, 0.03, 4, 3.0, step=0.1)
+
+        assert result["jacobian"].shape == (2, 4)
+        assert result["wrt"] == (
+            "period", "damping", "hardening_ratio", "ductility")
+
+        delta = 0.1 * (RANGES["ductility"][1] - RANGES["ductility"][0])
+        low = model.predict_batch([0.5, 1.0], 0.05, 0.03, 4 - delta, 3.0)
+        high = model.predict_batch([0.5, 1.0], 0.05, 0.03, 4 + delta, 3.0)
+
+        assert result["jacobian"][:, 3] == pytest.approx(
+            (high["median"] - low["median"]) / (2 * delta))
+        assert result["median"] == pytest.approx(model.predict_batch(
+            [0.5, 1.0], 0.05, 0.03, 4, 3.0)["median"])
+
+    def test_bounds(self, model):
+        periods = np.array([0.02, 0.05, 2.95])
+        result = model.sensitivity(
+            periods, 0.05, 0.03, 4, 3.0, wrt=("period",))
+
+        # One-sided at the bounds, over the step actually taken
+        delta = 0.05 * (RANGES["period"][1] - RANGES["period"][0])
+        low = np.maximum(periods - delta, RANGES["period"][0])
+        high = np.minimum(periods + delta, RANGES["period"][1])
+        expected = (
+            model.predict_batch(high, 0.05, 0.03, 4, 3.0)["median"]
+            - model.predict_batch(low, 0.05, 0.03, 4, 3.0)["median"]
+        ) / (high - low)
+
+        assert result["jacobian"][:, 0] == pytest.approx(expected)
+        assert result["jacobian"][0, 0] > result["jacobian"][2, 0]
+
+    def test_single_model_call(self, model, monkeypatch):
+        calls = []
+        predict = model._predict
+        monkeypatch.setattr(
+            model, "_predict",
+            lambda *args: calls.append(args) or predict(*args))
+
+        model.sensitivity(np.linspace(0.2, 2.0, 10), 0.05, 0.03, 4, 3.0,
+                          wrt=("period", "ductility"))
+
+        assert len(calls) == 1
+        assert calls[0][0].size == 10 * 5
+
+    def test_unknown_input(self, model):
+        with pytest.raises(ValueError):
+            model.sensitivity(1.0, 0.05, 0.03, 4, 3.0, wrt=("mass",))
+        with pytest.raises(ValueError):
+            model.tornado(1.0, 0.05, 0.03, 4, 3.0, wrt=("mass",))
+
+    def test_float32(self):
+        # float32 inputs at the bounds are within the ranges, as in
+        # predict_batch
+        model = XGBPredict("sa", False, validation="raise")
+        hardening_ratio = np.float32(RANGES["hardening_ratio"][0])
+        expected = model.predict_batch(
+            [0.5, 1.0], 0.05, hardening_ratio, 4, 3.0)
+
+        result = model.sensitivity(
+            [0.5, 1.0], 0.05, hardening_ratio, 4, 3.0)
+        sweeps = model.tornado(
+            [0.5, 1.0], 0.05, hardening_ratio, 4, 3.0, wrt=("period",))
+
+        assert result["median"] == pytest.approx(expected["median"])
+        assert sweeps["period"]["median"].shape == (2, 11)
+
+    def test_tornado(self, model):
+        sweeps = model.tornado(
+            [0.5, 1.0], 0.05, 0.03, 4, 3.0, wrt=("period", "ductility"),
+            n_points=5)
+
+        period = sweeps["period"]
+        np.testing.assert_allclose(
+            period["values"], np.linspace(*RANGES["period"], 5))
+        assert period["median"].shape == (2, 5)
+        assert period["median"][1] == pytest.approx(model.predict_batch(
+            period["values"], 0.05, 0.03, 4, 3.0)["median"])
+        assert sweeps["ductility"]["swing"] == pytest.approx(np.ptp(
+            sweeps["ductility"]["median"], axis=1))
@@ -0,0 +1,127 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.serving import LocalClient, PredictionService, \
+    ServiceOverloaded
+
+
+PERIODS = np.linspace(0.1, 2.0, 50)
+
+
+@pytest.mark.serving
+class ServingTest:
+    def test_batched_predictions(self):
+        async def run():
+            async with PredictionService(batch_window=0.01) as service:
+                predictions = await asyncio.gather(*(
+                    service.predict("sa", False, period, 0.05, 0.02, 4,
+                                    dynamic_ductility=3.0)
+                    for period in PERIODS))
+                return predictions, service.stats()
+
+        predictions, stats = asyncio.run(run())
+        model = XGBPredict("sa", False)
+
+        assert stats["requests"] == len(PERIODS)
+        assert stats["batches"] < len(PERIODS)
+        for period, prediction in zip(PERIODS, predictions):
+            assert prediction == pytest.approx(
+                model.make_prediction(period, 0.05, 0.02, 4, 3.0))
+
+    def test_max_batch_size(self):
+        async def run():
+            async with PredictionService(
+                    batch_window=0.01, max_batch_size=8) as service:
+                await asyncio.gather(*(
+                    service.predict("sa_avg", True, period, 0.05, 0.02, 4)
+                    for period in PERIODS))
+                return service.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["largest_batch"] == 8
+        assert stats["batches"] >= len(PERIODS) / 8
+
+    def test_mixed_requests(self):
+        async def run():
+            async with PredictionService() as service:
+                return await asyncio.gather(
+                    service.predict("sa_avg", False, 1.0, 0.05, 0.02, 4,
+                                    dynamic_ductility=3.0),
+                    service.predict("sa_avg", False, 1.0, 0.05, 0.02, 4,
+                                    strength_ratio=2.0),
+                    service.predict("sa", True, 1.0, 0.05, 0.02, 4))
+
+        forward, inverse, collapse = asyncio.run(run())
+
+        assert forward == pytest.approx(XGBPredict(
+            "sa_avg", False).make_prediction(1.0, 0.05, 0.02, 4, 3.0))
+        assert inverse == pytest.approx(XGBPredict(
+            "sa_avg", False).make_prediction(
+                1.0, 0.05, 0.02, 4, strength_ratio=2.0))
+        assert collapse == pytest.approx(XGBPredict(
+            "sa", True).make_prediction(1.0, 0.05, 0.02, 4))
+
+    def test_missing_dynamic_ductility(self):
+        async def run():
+            async with PredictionService() as service:
+                await service.predict("sa", False, 1.0, 0.05, 0.02, 4)
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+    def test_malformed_request(self):
+        async def run():
+            async with PredictionService(batch_window=0.01) as service:
+                return await asyncio.gather(
+                    service.predict("sa", True, 1.0, 0.05, 0.02, 4),
+                    service.predict("sa", True, "abc", 0.05, 0.02, 4),
+                    service.predict("sa", True, 2.0, 0.05, 0.02, 4),
+                    return_exceptions=True)
+
+        first, malformed, last = asyncio.run(run())
+
+        # Only the malformed request fails
+        assert isinstance(malformed, ValueError)
+        model = XGBPredict("sa", True)
+        assert first == pytest.approx(
+            model.make_prediction(1.0, 0.05, 0.02, 4))
+        assert last == pytest.approx(
+            model.make_prediction(2.0, 0.05, 0.02, 4))
+
+    def test_backpressure(self):
+        async def run():
+            async with PredictionService(
+                    batch_window=0.05, max_queue_size=4,
+                    reject_when_full=True) as service:
+                return await asyncio.gather(*(
+                    service.predict("sa", True, period, 0.05, 0.02, 4)
+                    for period in PERIODS), return_exceptions=True)
+
+        results = asyncio.run(run())
+        rejected = [
+            result for result in results
+            if isinstance(result, ServiceOverloaded)]
+
+        assert rejected
+        assert len(rejected) < len(PERIODS)
+
+    def test_local_client(self):
+        with LocalClient(batch_window=0.01) as client:
+            with ThreadPoolExecutor(8) as executor:
+                predictions = list(executor.map(
+                    lambda period: client.predict(
+                        "sa", False, period, 0.05, 0.02, 4,
+                        dynamic_ductility=3.0), PERIODS))
+            stats = client.service.stats()
+
+        expected = XGBPredict("sa", False).predict_batch(
+            PERIODS, 0.05, 0.02, 4, 3.0)
+
+        assert [p["median"] for p in predictions] == pytest.approx(
+            expected["median"])
+        assert stats["batches"] < len(PERIODS)
@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+HEAVY_MODULES = ("pandas", "xgboost", "scipy", "pydantic", "joblib",
+                 "sklearn")
+
+# Generous bound, importing xgboost alone takes about a second
+MAX_IMPORT_SECONDS = 0.75
+
+
+def run(code):
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        check=True)
+    return json.loads(result.stdout)
+
+
+@pytest.mark.startup
+class StartupTest:
+    def test_import_is_lazy(self):
+        loaded = run(
+            "import json, sys\n"
+            "import xgbrhomut\n"
+            f"print(json.dumps([name for name in {HEAVY_MODULES!r} "
+            "if name in sys.modules]))")
+
+        assert loaded == []
+
+    def test_import_time(self):
+        # Best of several runs, to be robust to a busy machine
+        seconds = min(run(
+            "import json, time\n"
+            "start = time.perf_counter()\n"
+            "import xgbrhomut\n"
+            "print(json.dumps(time.perf_counter() - start))")
+            for _ in range(3))
+
+        assert seconds < MAX_IMPORT_SECONDS
+
+    def test_r_mu_t_with_numpy_only(self):
+        # Heavy dependencies are made unimportable
+        ratio = run(
+            "import json, sys\n"
+            f"for name in {HEAVY_MODULES!r}:\n"
+            "    sys.modules[name] = None\n"
+            "from xgbrhomut.r_mu_t import ec8\n"
+            "print(json.dumps(float(ec8.strength_ratio(3, 1, 0.5))))")
+
+        assert ratio == pytest.approx(3.0)
+
+    def test_prediction_schema(self):
+        from xgbrhomut.XGBPredict import PredictionSchema
+
+        schema = PredictionSchema(strength_ratio=2.0, dispersion=0.3)
+        assert schema.strength_ratio == 2.0
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.registry import MODEL_KEYS, registry
+from xgbrhomut.trees import TreeEnsemble
+
+
+@pytest.mark.trees
+class TreeEnsembleTest:
+    @pytest.mark.parametrize("parameter, collapse", MODEL_KEYS)
+    def test_matches_booster(self, parameter, collapse):
+        entry = registry.get(parameter, collapse)
+        n_features = entry.scaler.n_features_in_
+
+        rng = np.random.default_rng(0)
+        x = rng.uniform(-0.1, 1.1, (10000, n_features))
+        x[:20, 0] = np.nan
+
+        expected = entry.model.predict(xgb.DMatrix(x))
+        prediction = entry.trees.predict(x, chunk_size=3000)
+
+        assert prediction.dtype == np.float32
+        np.testing.assert_allclose(prediction, expected, rtol=1e-6)
+
+    def test_save_load(self, tmp_path):
+        trees = registry.get("ro_2", False).trees
+        trees.save(tmp_path / "trees.npz")
+        loaded = TreeEnsemble.load(tmp_path / "trees.npz")
+
+        x = np.random.default_rng(1).uniform(0, 1, (100, 5))
+        np.testing.assert_array_equal(loaded.predict(x), trees.predict(x))
+
+    @pytest.mark.parametrize("im_type, collapse", [
+        ("sa", False),
+        ("sa_avg", True),
+    ])
+    def test_numpy_engine(self, im_type, collapse):
+        model = XGBPredict(im_type, collapse)
+        numpy_model = XGBPredict(im_type, collapse, engine="numpy")
+
+        inputs = ([0.3, 1.0, 2.2], 0.05, [0.02, 0.05, 0.07], 4, [1.5, 3, 6])
+        expected = model.predict_batch(*inputs)
+        prediction = numpy_model.predict_batch(*inputs)
+
+        assert prediction["median"] == pytest.approx(expected["median"])
+
+    def test_wrong_engine(self):
+        with pytest.raises(ValueError):
+            XGBPredict("sa", False, engine="sklearn")
@@ -0,0 +1,74 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from xgbrhomut import XGBPredict
+from xgbrhomut.validation import InputRangeError, check_ranges
+
+
+PERIODS = np.linspace(0.0, 5.0, 1001)
+
+
+@pytest.mark.validation
+class ValidationTest:
+    def test_mask_and_summary(self):
+        report = check_ranges(PERIODS, 0.05, 0.03, [[1.0], [4.0]])
+
+        assert report["valid"].shape == (2, 1001)
+        assert not report["valid"][0].any()
+        np.testing.assert_array_equal(
+            report["valid"][1], (PERIODS >= 0.01) & (PERIODS <= 3.0))
+        assert report["summary"]["period"] == {
+            "below": 4, "above": 800, "invalid": 804}
+        assert report["summary"]["ductility"]["below"] == 1001
+        assert "damping" not in report["summary"]
+
+    def test_single_call_warnings(self):
+        model = XGBPredict("sa", True)
+        with pytest.warns(UserWarning) as record:
+            model.make_prediction(1.0, 0.5, 0.03, 4)
+
+        messages = [
+            str(warning.message) for warning in record
+            if "recommended limits" in str(warning.message)]
+        assert messages == [
+            "Damping is not within recommended limits [0.02, 0.2]"]
+
+    def test_batch_warns_once_per_argument(self):
+        model = XGBPredict("sa", True)
+        with pytest.warns(UserWarning) as record:
+            model.predict_batch(PERIODS, 0.05, 0.01, 4)
+
+        messages = [
+            str(warning.message) for warning in record
+            if "recommended limits" in str(warning.message)]
+        assert len(messages) == 2
+        assert messages[0].startswith("Period")
+        assert "2 below and 400 above, of 1001 rows" in messages[0]
+        assert messages[1].startswith("Hardening ratio")
+
+    def test_raise(self):
+        model = XGBPredict("sa", True, validation="raise")
+        with pytest.raises(InputRangeError):
+            model.predict_batch(PERIODS, 0.05, 0.03, 4)
+
+    def test_clip(self):
+        model = XGBPredict("sa", True, validation="clip")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            prediction = model.predict_batch([0.001, 5.0], 0.05, 0.03, 4)
+
+        expected = XGBPredict("sa", True).predict_batch(
+            [0.01, 3.0], 0.05, 0.03, 4)
+        assert prediction["median"] == pytest.approx(expected["median"])
+
+    def test_ignore(self):
+        model = XGBPredict("sa", True, validation="ignore")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            model.predict_batch(PERIODS, 0.05, 0.03, 4)
+
+    def test_wrong_policy(self):
+        with pytest.raises(ValueError):
+            XGBPredict("sa", True, validation="skip")
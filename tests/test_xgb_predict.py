@@ -2,6 +2,9 @@ import pytest
 import sys
 import os
 
+import numpy as np
+import pandas as pd
+
 sys.path.append(os.path.abspath('xgbrhomut'))
 
 from schema import Schema, And, Use, SchemaError
@@ -87,3 +90,89 @@ class XGBPredictTest:
         assert valid
 
         assert prediction["median"] == pytest.approx(expected, abs=0.1)
+
+    @pytest.mark.parametrize("im_type, collapse", [
+        ("sa", False),
+        ("sa", True),
+        ("sa_avg", False),
+        ("sa_avg", True),
+    ])
+    def test_predict_batch(self, im_type, collapse):
+        model = XGBPredict(im_type, collapse)
+        period = np.array([0.2, 1.0, 2.5])
+        damping = np.array([0.05, 0.075, 0.1])
+        hardening_ratio = np.array([0.02, 0.05, 0.07])
+        ductility = np.array([3, 4, 6])
+        dynamic_ductility = np.array([1.5, 3.0, 5.0])
+
+        prediction = model.predict_batch(
+            period, damping, hardening_ratio, ductility, dynamic_ductility)
+
+        assert prediction["median"].shape == (3,)
+        for i in range(3):
+            expected = model.make_prediction(
+                period[i], damping[i], hardening_ratio[i], ductility[i],
+                dynamic_ductility[i])
+            assert prediction["median"][i] == pytest.approx(
+                expected["median"])
+            assert prediction["dispersion"][i] == pytest.approx(
+                expected["dispersion"])
+
+    def test_predict_batch_frame(self, non_collapse_model: XGBPredict):
+        frame = pd.DataFrame({
+            "period": [0.5, 1.0],
+            "damping": [0.05, 0.05],
+            "hardening_ratio": [0.02, 0.02],
+            "ductility": [4, 4],
+            "dynamic_ductility": [0.5, 3.0],
+        })
+        prediction = non_collapse_model.predict_batch(frame)
+
+        # Elastic systems are not passed to the model
+        assert prediction["median"][0] == 0.5
+        assert prediction["dispersion"][0] == 0.0
+        assert prediction["median"][1] == pytest.approx(
+            non_collapse_model.make_prediction(
+                1.0, 0.05, 0.02, 4, 3.0)["median"])
+
+    def test_predict_batch_requires_dynamic_ductility(
+            self, non_collapse_model: XGBPredict):
+        with pytest.raises(ValueError):
+            non_collapse_model.predict_batch([1.0], 0.05, 0.02, 4)
+
+    def test_ductility_batch(self, non_collapse_model: XGBPredict):
+        strength_ratio = np.array([0.2, 1.0, 3.0, 12.0])
+        prediction = non_collapse_model.predict_batch(
+            1, 0.075, 0.05, 3, strength_ratio=strength_ratio)
+
+        assert prediction["median"] == pytest.approx(
+            [0.2, 1.0, 2.7, 11.9], abs=0.1)
+        for i, ratio in enumerate(strength_ratio):
+            expected = non_collapse_model.make_prediction(
+                1, 0.075, 0.05, 3, strength_ratio=ratio)
+            assert prediction["median"][i] == pytest.approx(
+                expected["median"])
+            assert prediction["dispersion"][i] == pytest.approx(
+                expected["dispersion"])
+
+    def test_ductility_chunks(self):
+        rng = np.random.default_rng(1)
+        inputs = (rng.choice([0.5, 1.0, 2.0], 500), 0.05, 0.02,
+                  rng.choice([3, 4, 6], 500))
+        strength_ratio = rng.uniform(1.0, 4.0, 500)
+
+        model = XGBPredict("sa", False)
+        expected = model.predict_batch(*inputs, strength_ratio=strength_ratio)
+
+        # Two systems per model call and interpolated block
+        model.curve_chunk_size = 2
+        prediction = model.predict_batch(
+            *inputs, strength_ratio=strength_ratio)
+        np.testing.assert_array_equal(prediction["median"], expected["median"])
+        np.testing.assert_array_equal(
+            prediction["dispersion"], expected["dispersion"])
+
+    def test_ductility_collapse(self, collapse_model: XGBPredict):
+        with pytest.raises(ValueError):
+            collapse_model.make_prediction(
+                1, 0.075, 0.05, 3, strength_ratio=2.0)
@@ -1,27 +1,50 @@
-import json
-import warnings
-from pathlib import Path
-import joblib
+import sys
+from typing import TYPE_CHECKING
 
 import numpy as np
-import pandas as pd
-import xgboost as xgb
-from pydantic import BaseModel
-from scipy.interpolate import interp1d
 
+from .cache import PredictionCache
+from .dispersions import interp_rows
+from .instrumentation import Instrumentation, stage
+from .registry import ModelRegistry, registry as default_registry
+from .validation import POLICIES, RANGES, apply_policy, as_float
 
-path = Path(__file__).parent.resolve()
 
+# pandas, xgboost and pydantic are imported at first use, so that
+# importing the package, e.g. for the analytical relationships, stays fast
+if TYPE_CHECKING:
+    from .schema import PredictionSchema
 
-class PredictionSchema(BaseModel):
-    strength_ratio: float
-    dispersion: float
+
+def __getattr__(name):
+    if name == "PredictionSchema":
+        from .schema import PredictionSchema
+        return PredictionSchema
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class XGBPredict:
     ductility_range = np.arange(0.05, 12, 0.1)
 
-    def __init__(self, im_type: str, collapse: bool) -> None:
+    # Systems whose curves are evaluated per model call when estimating
+    # ductilities, bounding the peak memory to about 100 MB
+    curve_chunk_size = 4096
+
+    # Accepted im_type values, case-insensitive
+    im_types = ("sa", "sa_avg", "saavg")
+
+    engines = ("xgboost", "numpy")
+
+    dispersion_modes = ("nearest", "continuous")
+
+    def __init__(self, im_type: str, collapse: bool,
+                 registry: ModelRegistry = None,
+                 engine: str = "xgboost",
+                 cache: PredictionCache = None,
+                 instrumentation: Instrumentation = None,
+                 validation: str = "warn",
+                 dispersion_mode: str = "nearest") -> None:
         """
         Initialize XGB model
 
@@ -34,11 +57,35 @@ class XGBPredict:
             False for non-collapse scenarios
             Note: currently ro_2 is always for non-collapse, while ro_3 is
             for collapse
+        registry : ModelRegistry, optional
+            Registry the models are loaded from, by default the
+            process-wide registry shared by all instances
+        engine : str, optional
+            "xgboost" to predict with the booster, or "numpy" to evaluate
+            its trees with NumPy, which does not need xgboost when the
+            models are bundled, see xgbrhomut.bundle. The NumPy engine
+            only matches xgboost for single predictions and is about 3x
+            slower from 100 rows up, by default "xgboost"
+        cache : PredictionCache, optional
+            Cache of make_prediction results, inputs are then rounded to
+            the decimals of the cache before predicting, by default None
+        instrumentation : Instrumentation, optional
+            Collects per-stage timers and counters of the predictions, by
+            default None
+        validation : str, optional
+            Handling of inputs outside of the recommended ranges: "warn"
+            once per argument and call, "raise", "clip" to the ranges or
+            "ignore", see xgbrhomut.validation, by default "warn"
+        dispersion_mode : str, optional
+            "nearest" to take dispersions of the nearest grid system, or
+            "continuous" to interpolate them multilinearly over all inputs,
+            see dispersions.DispersionSurrogate, by default "nearest"
 
         Raises
         ------
         ValueError
-            When im_type is neither 'sa' nor 'sa_avg'
+            When im_type is neither 'sa' nor 'sa_avg', or the engine,
+            validation policy or dispersion mode is unknown
 
         """
         if im_type.lower() == "sa":
@@ -51,7 +98,30 @@ class XGBPredict:
         else:
             raise ValueError("Wrong im_type, must be 'sa' or 'sa_avg'")
 
+        if engine not in self.engines:
+            raise ValueError(
+                f"Wrong engine, must be one of {', '.join(self.engines)}")
+
+        if validation not in POLICIES:
+            raise ValueError(
+                "Wrong validation policy, must be one of "
+                f"{', '.join(POLICIES)}")
+
+        if dispersion_mode not in self.dispersion_modes:
+            raise ValueError(
+                "Wrong dispersion mode, must be one of "
+                f"{', '.join(self.dispersion_modes)}")
+
         self.collapse = collapse
+        self.validation = validation
+        self.dispersion_mode = dispersion_mode
+        self.registry = registry or default_registry
+        self.engine = engine
+        self.cache = cache
+        self.instrumentation = instrumentation
+
+        # Precomputed curves answering curve queries, see curves.CurveGrid
+        self.curve_grid = None
 
     def _verify_input(
         self,
@@ -59,99 +129,160 @@ class XGBPredict:
         damping,
         hardening_ratio,
         ductility
-    ) -> None:
-        if not (0.01 <= period <= 3.0):
-            warnings.warn(
-                "Period is not within recommended limits [0.01, 3.0]")
-
-        if not (0.02 <= damping <= 0.2):
-            warnings.warn(
-                "Period is not within recommended limits [0.02, 0.2]")
-
-        if not (0.02 <= hardening_ratio <= 0.07):
-            warnings.warn(
-                "Period is not within recommended limits [0.02, 0.07]")
-
-        if not (2.0 <= ductility <= 8.0):
-            warnings.warn("Period is not within recommended limits [2.0, 8.0]")
+    ) -> tuple:
+        with stage(self.instrumentation, "verify", np.size(period)):
+            return apply_policy(
+                period, damping, hardening_ratio, ductility, self.validation)
 
     def _estimate_ductility(
             self, period, damping, hardening_ratio, ductility, strength_ratio):
-        method, scaler, model, xgb_input = self._get_model(
-            period, damping, hardening_ratio, ductility, None)
-
-        disp_model = json.load(open(
-            path / f"models/{self.parameter}_xgb{method}_dispersions.json"))
+        if self.collapse:
+            raise ValueError(
+                "Ductility can only be estimated for non-collapse "
+                "predictions")
+
+        period, damping, hardening_ratio, ductility, strength_ratio = (
+            np.atleast_1d(np.asarray(value, dtype=float)) for value in (
+                period, damping, hardening_ratio, ductility, strength_ratio))
+
+        # Evaluate the strength ratio - ductility curve of each unique
+        # system only once
+        with stage(self.instrumentation, "unique_systems", period.size):
+            systems = np.column_stack(
+                (period, damping, hardening_ratio, ductility))
+            systems, inverse = np.unique(
+                systems, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+
+            # Rows grouped by system, the rows of a chunk of systems are
+            # contiguous
+            order = np.argsort(inverse, kind="stable")
+            chunk = self.curve_chunk_size
+            bounds = np.searchsorted(
+                inverse[order], np.arange(0, len(systems) + chunk, chunk))
+
+        median = np.empty(period.size)
+        disp = np.empty(period.size)
+
+        # Curves of at most curve_chunk_size systems, and their rows, at a
+        # time, bounding the memory to the chunk
+        for i, start in enumerate(range(0, len(systems), chunk)):
+            curves = self._curves(
+                *systems[start:start + chunk].T, self.ductility_range)
+            rows = order[bounds[i]:bounds[i + 1]]
+
+            for first in range(0, rows.size, chunk):
+                block = rows[first:first + chunk]
+                with stage(self.instrumentation, "interpolate", block.size):
+                    local = inverse[block] - start
+                    medians = curves["median"][local]
+                    dispersions = curves["dispersion"][local]
+
+                    ratio = np.clip(
+                        strength_ratio[block], medians.min(axis=1),
+                        medians.max(axis=1))
+
+                    median[block] = interp_rows(
+                        ratio, medians,
+                        np.broadcast_to(self.ductility_range, medians.shape))
+                    disp[block] = interp_rows(ratio, medians, dispersions)
 
-        medians = np.zeros(self.ductility_range.shape)
-        dispersions = np.zeros(self.ductility_range.shape)
-        for i, duct in enumerate(self.ductility_range):
-            xgb_input["actual_ductility_end"] = [duct]
+        return {
+            "median": median,
+            "dispersion": disp
+        }
 
-            if duct < 1.0 and self.parameter == "sa":
-                medians[i] = duct
-                dispersions[i] = 0.0
-                continue
+    def _curves(self, period, damping, hardening_ratio, ductility,
+                ductility_grid) -> dict:
+        # Curves of systems, shape (n, len(ductility_grid)), interpolated
+        # from the precomputed grid when it covers the ductility grid, or
+        # predicted in a single model call
+        grid = self.curve_grid
+        if grid is not None and grid.parameter in (None, self.parameter) \
+                and np.array_equal(grid.ductility_grid, ductility_grid):
+            with stage(self.instrumentation, "curve_grid", len(period)):
+                return grid.evaluate(
+                    period, damping, hardening_ratio, ductility)
+
+        n_points = len(ductility_grid)
+        systems = np.column_stack(
+            (period, damping, hardening_ratio, ductility))
+        curves = self._predict(
+            *np.repeat(systems, n_points, axis=0).T,
+            np.tile(ductility_grid, len(systems)))
 
-            xgb_input = pd.DataFrame.from_dict(xgb_input)
-            x = scaler.transform(xgb_input)
+        return {
+            "median": curves["median"].reshape(-1, n_points),
+            "dispersion": curves["dispersion"].reshape(-1, n_points),
+        }
 
-            matrix = xgb.DMatrix(x)
-            medians[i] = np.expm1(model.predict(matrix))[0]
-            dispersions[i] = self._get_dispersion(
-                disp_model, period, damping,
-                hardening_ratio, ductility, duct)
-            if not self.collapse and self.parameter != "sa" \
-                    and duct < 0.625:
-                medians[i] = duct
+    def predict_curve(
+        self,
+        period,
+        damping,
+        hardening_ratio,
+        ductility,
+        ductility_grid=None,
+    ) -> dict:
+        """
+        Predict strength ratio - dynamic ductility curves of systems
 
-        if strength_ratio > max(medians):
-            strength_ratio = max(medians)
+        The curves of all systems are evaluated in a single model call, or
+        interpolated from curve_grid when it was precomputed over the same
+        ductility grid
 
-        if strength_ratio < min(medians):
-            strength_ratio = min(medians)
+        Parameters
+        ----------
+        period : array_like
+            Periods
+        damping : array_like
+            Damping ratios
+        hardening_ratio : array_like
+            Hardening ratios
+        ductility : array_like
+            Hardening ductilities of systems
+        ductility_grid : array_like, optional
+            Dynamic ductilities where the curves are evaluated, by default
+            ductility_range
 
-        int_median = interp1d(medians, self.ductility_range)
-        int_disp = interp1d(medians, dispersions)
+        Returns
+        ----------
+        dict
+            {
+                ductility: np.ndarray, the ductility grid,
+                median: np.ndarray (R or ro_2), shape of the broadcast
+                    inputs followed by the size of the ductility grid,
+                dispersion: np.ndarray, same shape as median
+            }
 
-        median = int_median(strength_ratio)
-        disp = int_disp(strength_ratio)
+        Raises
+        ------
+        ValueError
+            For collapse predictions
+        """
+        if self.collapse:
+            raise ValueError(
+                "Curves can only be predicted for non-collapse predictions")
 
-        return {
-            "median": median,
-            "dispersion": disp
-        }
+        if ductility_grid is None:
+            ductility_grid = self.ductility_range
+        ductility_grid = np.asarray(ductility_grid, dtype=float)
 
-    def _get_model(
-            self, period, damping, hardening_ratio, ductility,
-            dynamic_ductility):
+        arrays = np.broadcast_arrays(*(
+            np.asarray(value, dtype=float) for value in (
+                period, damping, hardening_ratio, ductility)))
+        shape = arrays[0].shape + ductility_grid.shape
 
-        if self.collapse:
-            method = "_collapse"
-        else:
-            method = ""
-
-        # Read the XGB model
-        model = joblib.load(
-            path / f"models/{self.parameter}_xgb{method}.sav")
-
-        # Get the scaler
-        scaler = joblib.load(
-            path / f"models/{self.parameter}_xgb{method}_scaler.sav")
-
-        # Construct the input parameters
-        xgb_input = {
-            "period": [period],
-            "damping": [damping],
-            "hardening_ratio": [hardening_ratio],
-            "ductility": [ductility],
-        }
+        arrays = self._verify_input(*arrays)
 
-        # Add dynamic ductility for non-collapse predictions
-        if not self.collapse:
-            xgb_input["actual_ductility_end"] = [dynamic_ductility]
+        curves = self._curves(
+            *(array.ravel() for array in arrays), ductility_grid)
 
-        return method, scaler, model, xgb_input
+        return {
+            "ductility": ductility_grid,
+            "median": curves["median"].reshape(shape),
+            "dispersion": curves["dispersion"].reshape(shape),
+        }
 
     def make_prediction(
         self,
@@ -161,7 +292,7 @@ class XGBPredict:
         ductility: float,
         dynamic_ductility: float = None,
         strength_ratio: float = None,
-    ) -> PredictionSchema:
+    ) -> "PredictionSchema":
         """
         Make predictions using the XGB model
 
@@ -191,134 +322,461 @@ class XGBPredict:
                 dispersion
             }
         """
-        self._verify_input(period, damping, hardening_ratio, ductility)
+        period, damping, hardening_ratio, ductility = self._verify_input(
+            period, damping, hardening_ratio, ductility)
+
+        if self.cache is None:
+            return self._make_prediction(
+                period, damping, hardening_ratio, ductility,
+                dynamic_ductility, strength_ratio)
+
+        grid = self.curve_grid
+        key = self.cache.key(
+            self.parameter, self.collapse, period, damping, hardening_ratio,
+            ductility, dynamic_ductility, strength_ratio,
+            dispersion_mode=self.dispersion_mode, engine=self.engine,
+            curves=None if grid is None else grid.fingerprint,
+            source=self.registry.source_hash(self.parameter, self.collapse))
+
+        prediction = self.cache.get(key)
+        if prediction is None:
+            prediction = self._make_prediction(*key[:6])
+            self.cache.put(key, prediction)
 
+        return prediction
+
+    def _make_prediction(
+        self, period, damping, hardening_ratio, ductility, dynamic_ductility,
+        strength_ratio
+    ) -> dict:
         if strength_ratio:
-            return self._estimate_ductility(
+            prediction = self._estimate_ductility(
                 period, damping, hardening_ratio, ductility, strength_ratio)
 
+            return {
+                "median": float(prediction["median"][0]),
+                "dispersion": float(prediction["dispersion"][0]),
+            }
+
         if not dynamic_ductility and not self.collapse:
             raise ValueError(
                 "Dynamic ductility not provided for non-collapse predictions")
 
-        if not self.collapse and dynamic_ductility < 1.0 \
-                and self.parameter == "sa":
-            return {
-                "median": dynamic_ductility,
-                "dispersion": 0.0,
-            }
+        prediction = self._predict(
+            period, damping, hardening_ratio, ductility, dynamic_ductility)
+
+        return {
+            "median": float(prediction["median"][0]),
+            "dispersion": float(prediction["dispersion"][0]),
+        }
+
+    def predict_batch(
+        self,
+        period,
+        damping=None,
+        hardening_ratio=None,
+        ductility=None,
+        dynamic_ductility=None,
+        strength_ratio=None,
+        out_median: np.ndarray = None,
+        out_dispersion: np.ndarray = None,
+        dtype=np.float64,
+    ) -> dict:
+        """
+        Make predictions for many systems at once
+
+        All inputs are broadcast against each other, and the whole batch
+        is scaled and passed to the XGB model in a single call. When
+        strength ratios are provided, ductilities are estimated instead,
+        evaluating the curve of each unique system once
+
+        Floating inputs, float32 included, are used without conversion,
+        and results can be written into preallocated arrays, so that
+        large inputs processed in chunks allocate no per-chunk outputs
 
-        method, scaler, model, xgb_input = self._get_model(
+        Parameters
+        ----------
+        period : array_like or pd.DataFrame
+            Periods, or a DataFrame with columns 'period', 'damping',
+            'hardening_ratio', 'ductility' and, for non-collapse
+            predictions, 'dynamic_ductility'
+        damping : array_like, optional
+            Damping ratios
+        hardening_ratio : array_like, optional
+            Hardening ratios
+        ductility : array_like, optional
+            Hardening ductilities of systems
+        dynamic_ductility : array_like, optional
+            Ductilities where the strength ratios are being predicted,
+            required for non-collapse predictions, by default None
+        strength_ratio : array_like, optional
+            Strength ratios corresponding to which ductility values are
+            being estimated, by default None
+        out_median : np.ndarray, optional
+            Preallocated C-contiguous array of the broadcast input shape
+            for the medians, by default a new array
+        out_dispersion : np.ndarray, optional
+            Preallocated C-contiguous array of the broadcast input shape
+            for the dispersions, by default a new array
+        dtype : np.dtype, optional
+            np.float64 or np.float32, type of the arrays that are not
+            given, by default np.float64
+
+        Returns
+        ----------
+        dict
+            {
+                median: np.ndarray (R, ro_2 or ro_3, or ductility),
+                dispersion: np.ndarray
+            }, out_median and out_dispersion when given
+
+        Raises
+        ------
+        ValueError
+            When dynamic ductility is missing for non-collapse predictions,
+            strength ratios are provided for collapse predictions, or the
+            output arrays have the wrong shape or are not C-contiguous
+        """
+        # Inputs can only be DataFrames when pandas was imported already
+        pd = sys.modules.get("pandas")
+        if pd is not None and isinstance(period, pd.DataFrame):
+            frame = period
+            with stage(self.instrumentation, "frame", len(frame)):
+                period = frame["period"].to_numpy()
+                damping = frame["damping"].to_numpy()
+                hardening_ratio = frame["hardening_ratio"].to_numpy()
+                ductility = frame["ductility"].to_numpy()
+                if dynamic_ductility is None \
+                        and "dynamic_ductility" in frame.columns:
+                    dynamic_ductility = frame["dynamic_ductility"].to_numpy()
+                if strength_ratio is None \
+                        and "strength_ratio" in frame.columns:
+                    strength_ratio = frame["strength_ratio"].to_numpy()
+
+        if strength_ratio is not None:
+            arrays = np.broadcast_arrays(*(
+                as_float(value) for value in (
+                    period, damping, hardening_ratio, ductility,
+                    strength_ratio)))
+            shape = arrays[0].shape
+            median, dispersion = self._outputs(
+                shape, out_median, out_dispersion, dtype)
+
+            arrays = (*self._verify_input(*arrays[:4]), arrays[4])
+
+            prediction = self._estimate_ductility(
+                *(np.ravel(array) for array in arrays))
+            median[...] = prediction["median"].reshape(shape)
+            dispersion[...] = prediction["dispersion"].reshape(shape)
+
+            return {"median": median, "dispersion": dispersion}
+
+        arrays = self._inputs(
             period, damping, hardening_ratio, ductility, dynamic_ductility)
+        shape = arrays[0].shape
+        median, dispersion = self._outputs(
+            shape, out_median, out_dispersion, dtype)
+
+        self._predict(
+            *(np.ravel(array) for array in arrays),
+            out=(median.reshape(-1), dispersion.reshape(-1)))
+
+        return {"median": median, "dispersion": dispersion}
+
+    @staticmethod
+    def _outputs(shape, out_median, out_dispersion, dtype) -> tuple:
+        outputs = []
+        for out in (out_median, out_dispersion):
+            if out is None:
+                out = np.empty(shape, dtype=dtype)
+            elif out.shape != shape or not out.flags.c_contiguous:
+                raise ValueError(
+                    f"Output arrays must be C-contiguous arrays of shape "
+                    f"{shape}")
+            outputs.append(out)
+        return tuple(outputs)
+
+    def _inputs(self, period, damping, hardening_ratio, ductility,
+                dynamic_ductility) -> tuple:
+        # Broadcast float inputs, checked against the recommended ranges
+        if dynamic_ductility is None and not self.collapse:
+            raise ValueError(
+                "Dynamic ductility not provided for non-collapse predictions")
 
-        xgb_input = pd.DataFrame.from_dict(xgb_input)
-        x = scaler.transform(xgb_input)
+        if dynamic_ductility is None:
+            dynamic_ductility = np.nan
 
-        matrix = xgb.DMatrix(x)
-        median = np.expm1(model.predict(matrix))
+        arrays = np.broadcast_arrays(*(
+            as_float(value) for value in (
+                period, damping, hardening_ratio, ductility,
+                dynamic_ductility)))
 
-        # Retrieve dispersion
-        dispersions = json.load(open(
-            path / f"models/{self.parameter}_xgb{method}_dispersions.json"))
-        dispersion = self._get_dispersion(
-            dispersions, period, damping,
-            hardening_ratio, ductility, dynamic_ductility)
+        return (*self._verify_input(*arrays[:4]), arrays[4])
 
-        if not self.collapse and self.parameter != "sa" \
-                and dynamic_ductility < 0.625:
-            median[0] = dynamic_ductility
+    def _systems(self, period, damping, hardening_ratio, ductility,
+                 dynamic_ductility, wrt) -> tuple:
+        # Checked inputs of sensitivity and tornado, as wrt, the broadcast
+        # shape and a (rows, 5) matrix of the systems
+        wrt = tuple(wrt)
+        unknown = set(wrt) - set(RANGES)
+        if unknown:
+            raise ValueError(
+                f"Unknown inputs {sorted(unknown)}, must be among "
+                f"{', '.join(RANGES)}")
 
-        prediction = {
-            "median": median[0],
-            "dispersion": dispersion,
-        }
+        arrays = self._inputs(
+            period, damping, hardening_ratio, ductility, dynamic_ductility)
+        base = np.column_stack([np.ravel(array) for array in arrays])
 
-        return prediction
+        return wrt, arrays[0].shape, base
 
-    def _get_dispersion(
+    def sensitivity(
         self,
-        dispersions: dict,
-        period: float,
-        damping: float,
-        hardening_ratio: float,
-        ductility: float,
-        dynamic_ductility: float
-    ) -> float:
-        """Gets dispersion values
+        period,
+        damping,
+        hardening_ratio,
+        ductility,
+        dynamic_ductility=None,
+        wrt: tuple = ("period", "damping", "hardening_ratio", "ductility"),
+        step: float = 0.05,
+    ) -> dict:
+        """
+        Central finite-difference derivatives of the predicted medians
+
+        All perturbed inputs of the batch are evaluated in a single model
+        call. The boosters are piecewise constant, so the derivatives are
+        secant slopes over a step that should span several tree splits.
+        Perturbed inputs are clipped to the recommended ranges, so the
+        differences are one-sided at the bounds, divided by the step
+        actually taken
 
         Parameters
         ----------
-        dispersions : dict
-            Dispersions, {
-                "period": {
-                    "damping": {
-                        "hardening_ratio": {
-                            "ductility": float
-                        }
-                    }
-                }
+        period, damping, hardening_ratio, ductility : array_like
+            Systems, broadcast against each other
+        dynamic_ductility : array_like, optional
+            Ductilities where the strength ratios are predicted, required
+            for non-collapse predictions, by default None
+        wrt : tuple[str], optional
+            Inputs the medians are differentiated with respect to, among
+            'period', 'damping', 'hardening_ratio' and 'ductility', by
+            default all
+        step : float, optional
+            Half-width of the differences, as a fraction of the
+            recommended range of each input, see
+            xgbrhomut.validation.RANGES, by default 0.05
+
+        Returns
+        ----------
+        dict
+            {
+                median: np.ndarray, shape S of the broadcast inputs,
+                dispersion: np.ndarray, shape S,
+                jacobian: np.ndarray, shape S + (len(wrt),),
+                wrt: tuple[str]
             }
-        period : float
-            Period in [s]
-        damping : float
-            Damping
-        hardening_ratio : float
-            Hardening ratio
-        ductility : float
-            Ductility
-        dynamic_ductility : float
-            Dynamic ductility
+
+        Raises
+        ------
+        ValueError
+            When wrt contains unknown inputs, or dynamic ductility is
+            missing for non-collapse predictions
+        """
+        wrt, shape, base = self._systems(
+            period, damping, hardening_ratio, ductility, dynamic_ductility,
+            wrt)
+        n_rows = base.shape[0]
+
+        # Rows: base, then (minus, plus) for each input. Perturbed inputs
+        # stay within the recommended ranges (or at the input itself, when
+        # outside), giving one-sided differences at the bounds
+        stacked = np.tile(base, (1 + 2 * len(wrt), 1))
+        steps = []
+        for i, name in enumerate(wrt):
+            column = list(RANGES).index(name)
+            lower, upper = RANGES[name]
+            delta = step * (upper - lower)
+            value = base[:, column]
+
+            minus = np.maximum(value - delta, np.minimum(lower, value))
+            plus = np.minimum(value + delta, np.maximum(upper, value))
+            steps.append(plus - minus)
+
+            start = (1 + 2 * i) * n_rows
+            stacked[start:start + n_rows, column] = minus
+            stacked[start + n_rows:start + 2 * n_rows, column] = plus
+
+        prediction = self._predict(*stacked.T)
+        median = prediction["median"].reshape(1 + 2 * len(wrt), n_rows)
+
+        minus = median[1::2]
+        plus = median[2::2]
+        jacobian = (plus - minus) / np.asarray(steps)
+
+        return {
+            "median": median[0].reshape(shape),
+            "dispersion": prediction["dispersion"][:n_rows].reshape(shape),
+            "jacobian": jacobian.T.reshape(shape + (len(wrt),)),
+            "wrt": wrt,
+        }
+
+    def tornado(
+        self,
+        period,
+        damping,
+        hardening_ratio,
+        ductility,
+        dynamic_ductility=None,
+        wrt: tuple = ("period", "damping", "hardening_ratio", "ductility"),
+        n_points: int = 11,
+    ) -> dict:
+        """
+        One-at-a-time sweeps of inputs over their recommended ranges
+
+        Each input in wrt is varied over its range in xgbrhomut.validation
+        .RANGES while the others keep their values. All sweeps are
+        evaluated in a single model call
+
+        Parameters
+        ----------
+        period, damping, hardening_ratio, ductility : array_like
+            Systems, broadcast against each other
+        dynamic_ductility : array_like, optional
+            Ductilities where the strength ratios are predicted, required
+            for non-collapse predictions, by default None
+        wrt : tuple[str], optional
+            Inputs swept, by default all
+        n_points : int, optional
+            Values of each sweep, by default 11
 
         Returns
         ----------
-        float
-            Dispersion value
+        dict
+            {
+                input: {
+                    values: np.ndarray, shape (n_points,),
+                    median: np.ndarray, shape S + (n_points,),
+                    dispersion: np.ndarray, shape S + (n_points,),
+                    swing: np.ndarray, shape S, range of the medians
+                }
+            }
+
+        Raises
+        ------
+        ValueError
+            When wrt contains unknown inputs, or dynamic ductility is
+            missing for non-collapse predictions
         """
+        wrt, shape, base = self._systems(
+            period, damping, hardening_ratio, ductility, dynamic_ductility,
+            wrt)
+        n_rows = base.shape[0]
+
+        # Rows: system-major within each sweep value
+        blocks = []
+        sweeps = {}
+        for name in wrt:
+            column = list(RANGES).index(name)
+            values = np.linspace(*RANGES[name], n_points)
+            sweeps[name] = values
+
+            block = np.repeat(base, n_points, axis=0)
+            block[:, column] = np.tile(values, n_rows)
+            blocks.append(block)
+
+        prediction = self._predict(*np.vstack(blocks).T)
+        medians = prediction["median"].reshape(len(wrt), n_rows, n_points)
+        dispersions = prediction["dispersion"].reshape(
+            len(wrt), n_rows, n_points)
 
-        def is_valid_float(s):
-            try:
-                float(s)
-                return True
-            except ValueError:
-                return False
-
-        period_key = str(min((
-            key for key in dispersions if is_valid_float(key)),
-            key=lambda x: abs(float(x) - period), default=None
-        ))
-
-        damp_key = str(min((
-            key for key in dispersions[period_key] if is_valid_float(key)),
-            key=lambda x: abs(float(x) - damping), default=None
-        ))
-
-        hard_key = str(min((
-            key for key in dispersions[period_key][damp_key]
-            if is_valid_float(key)),
-            key=lambda x: abs(float(x) - hardening_ratio), default=None
-        ))
-
-        duct_key = str(min((
-            key for key in dispersions[period_key][damp_key][hard_key]
-            if is_valid_float(key)),
-            key=lambda x: abs(float(x) - ductility), default=None
-        ))
-
-        dispersion = dispersions[period_key][damp_key][hard_key][duct_key]
-        if self.collapse:
-            return dispersion
+        return {
+            name: {
+                "values": sweeps[name],
+                "median": medians[i].reshape(shape + (n_points,)),
+                "dispersion": dispersions[i].reshape(shape + (n_points,)),
+                "swing": np.ptp(medians[i], axis=1).reshape(shape),
+            } for i, name in enumerate(wrt)
+        }
+
+    def _predict(
+        self, period, damping, hardening_ratio, ductility, dynamic_ductility,
+        out: tuple = None,
+    ) -> dict:
+        period, damping, hardening_ratio, ductility, dynamic_ductility = (
+            np.atleast_1d(as_float(value)) for value in (
+                period, damping, hardening_ratio, ductility,
+                dynamic_ductility))
+
+        timer = self.instrumentation
+        entry = self.registry.get(self.parameter, self.collapse, timer)
+
+        # Flat (median, dispersion) buffers are filled in place
+        if out is None:
+            median = np.empty(period.shape)
+            dispersion = np.empty(period.shape)
+        else:
+            median, dispersion = out
+
+        # Elastic systems of R are not passed to the model
+        if not self.collapse and self.parameter == "R":
+            elastic = dynamic_ductility < 1.0
+        else:
+            elastic = np.zeros(period.shape, dtype=bool)
+
+        # Views instead of copies when every row is predicted
+        active = ~elastic if np.any(elastic) else slice(None)
+        n_rows = int(np.count_nonzero(~elastic))
+        if n_rows:
+            xgb_input = [period, damping, hardening_ratio, ductility]
+
+            # Add dynamic ductility for non-collapse predictions
+            if not self.collapse:
+                xgb_input.append(dynamic_ductility)
+
+            # Features in model order, validated by the registry
+            with stage(timer, "scale", n_rows):
+                features = np.empty((n_rows, len(xgb_input)))
+                for i, value in enumerate(xgb_input):
+                    features[:, i] = value[active]
+                x = entry.scaler.transform(
+                    features, dtype=np.float32, copy=False)
+                del features
+
+            if self.engine == "numpy":
+                with stage(timer, "trees_predict", n_rows):
+                    prediction = entry.trees.predict(x)
+            else:
+                import xgboost as xgb
+
+                with stage(timer, "dmatrix", n_rows):
+                    matrix = xgb.DMatrix(x)
+                with stage(timer, "booster_predict", n_rows):
+                    prediction = entry.model.predict(matrix)
+                del matrix
 
-        ductilities = dispersions["ductility"]
+            median[active] = np.expm1(prediction, out=prediction)
+            del x, prediction
+
+            # Retrieve dispersions
+            if self.dispersion_mode == "continuous":
+                dispersions = entry.surrogate.evaluate
+            else:
+                dispersions = entry.dispersions.lookup
 
-        interpolator = interp1d(ductilities, dispersion, fill_value=[
-                                dispersion[-1]], bounds_error=False)
+            with stage(timer, "dispersion_lookup", n_rows):
+                dispersion[active] = dispersions(
+                    period[active], damping[active],
+                    hardening_ratio[active], ductility[active],
+                    dynamic_ductility[active])
 
-        val = float(interpolator(dynamic_ductility))
+        median[elastic] = dynamic_ductility[elastic]
+        dispersion[elastic] = 0.0
 
-        if np.isnan(val) or val == 0:
-            warnings.warn(
-                "Dispersion is null, as dynamic ductility is unattainable for "
-                "given input... Try with smaller dynamic ductility value")
-            val = max(dispersion)
+        if not self.collapse and self.parameter != "R":
+            low = dynamic_ductility < 0.625
+            median[low] = dynamic_ductility[low]
 
-        return val
+        return {
+            "median": median,
+            "dispersion": dispersion,
+        }
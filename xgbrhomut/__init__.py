@@ -1,2 +1,4 @@
 from .XGBPredict import XGBPredict
+from .registry import ModelRegistry
+from .cache import PredictionCache
 from . import r_mu_t
@@ -0,0 +1,211 @@
+"""
+Compact binary bundles of the shipped models
+
+A bundle stores, for every model, the booster in the native XGBoost
+UBJSON format, the scaler as plain arrays and the dispersions as .npy
+arrays that are memory-mapped on load, so that worker processes on a
+node share the same page-cached tables:
+
+    <bundle_dir>/<parameter>_xgb[_collapse]/
+        booster.ubj
+        trees.npz
+        scaler.npz
+        dispersions.npy
+        dispersion_axes.npz
+        dispersion_surrogate.npz
+    <bundle_dir>/manifest.json
+
+The manifest records the package version and the SHA-256 of the source
+.sav and .json artifacts of every model. Bundles whose manifest does not
+match the models they would replace, e.g. left behind in the package
+directory by an upgrade, are ignored with a warning.
+
+Build the bundle next to the shipped models with
+
+    python -m xgbrhomut.bundle
+"""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from .dispersions import DispersionSurrogate, DispersionTable
+from .registry import MODEL_KEYS, ModelEntry, ModelRegistry, \
+    package_version, path, source_hash
+from .scaler import ArrayScaler
+from .trees import TreeEnsemble
+
+
+BUNDLE_DIR = path / "models" / "bundle"
+
+MANIFEST = "manifest.json"
+
+
+def model_name(parameter: str, collapse: bool) -> str:
+    method = "_collapse" if collapse else ""
+    return f"{parameter}_xgb{method}"
+
+
+def export_bundle(bundle_dir: Path = None,
+                  registry: ModelRegistry = None) -> Path:
+    """Writes the bundle of all shipped models
+
+    Parameters
+    ----------
+    bundle_dir : Path, optional
+        Output directory, by default models/bundle of the package
+    registry : ModelRegistry, optional
+        Registry reading the source .sav and .json models, by default
+        a registry of the shipped models
+
+    Returns
+    ----------
+    Path
+        Bundle directory
+    """
+    if bundle_dir is None:
+        bundle_dir = BUNDLE_DIR
+    if registry is None:
+        registry = ModelRegistry(use_bundle=False)
+
+    bundle_dir = Path(bundle_dir)
+
+    for parameter, collapse in MODEL_KEYS:
+        entry = registry.get(parameter, collapse)
+        model_dir = bundle_dir / model_name(parameter, collapse)
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        entry.model.save_model(model_dir / "booster.ubj")
+        entry.trees.save(model_dir / "trees.npz")
+
+        np.savez(
+            model_dir / "scaler.npz",
+            min=entry.scaler.min_,
+            scale=entry.scaler.scale_,
+            feature_names=np.asarray(entry.scaler.feature_names_in_, str),
+        )
+
+        table = entry.dispersions
+        np.save(model_dir / "dispersions.npy", table.values)
+
+        axes = dict(zip(
+            ("periods", "dampings", "hardening_ratios", "ductilities"),
+            table.axes))
+        if not table.collapse:
+            axes["dynamic_ductilities"] = table.dynamic_ductilities
+        np.savez(model_dir / "dispersion_axes.npz", **axes)
+
+        entry.surrogate.save(model_dir / "dispersion_surrogate.npz")
+
+    # Written last, a partially exported bundle has no manifest
+    manifest = {
+        "version": package_version(),
+        "models": {
+            model_name(parameter, collapse): registry.source_hash(
+                parameter, collapse)
+            for parameter, collapse in MODEL_KEYS
+        },
+    }
+    with open(bundle_dir / MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return bundle_dir
+
+
+def load_bundle(bundle_dir: Path, parameter: str,
+                collapse: bool) -> ModelEntry:
+    """Reads a single model from a bundle
+
+    Parameters
+    ----------
+    bundle_dir : Path
+        Bundle directory
+    parameter : str
+        R, ro_2 or ro_3
+    collapse : bool
+        True for collapse models
+
+    Returns
+    ----------
+    ModelEntry
+        Loaded model, scaler, memory-mapped dispersions and dispersion
+        surrogate, the booster itself is read on first use
+    """
+    model_dir = Path(bundle_dir) / model_name(parameter, collapse)
+
+    trees = None
+    if (model_dir / "trees.npz").is_file():
+        trees = TreeEnsemble.load(model_dir / "trees.npz")
+
+    with np.load(model_dir / "scaler.npz") as data:
+        scaler = ArrayScaler(
+            data["min"], data["scale"], list(data["feature_names"]))
+
+    values = np.load(model_dir / "dispersions.npy", mmap_mode="r")
+    with np.load(model_dir / "dispersion_axes.npz") as data:
+        dispersions = DispersionTable(
+            data["periods"],
+            data["dampings"],
+            data["hardening_ratios"],
+            data["ductilities"],
+            values,
+            data["dynamic_ductilities"]
+            if "dynamic_ductilities" in data else None,
+        )
+
+    surrogate = None
+    if (model_dir / "dispersion_surrogate.npz").is_file():
+        surrogate = DispersionSurrogate.load(
+            model_dir / "dispersion_surrogate.npz")
+
+    return ModelEntry(
+        parameter, collapse, scaler, dispersions,
+        model_file=model_dir / "booster.ubj", trees=trees,
+        surrogate=surrogate)
+
+
+def has_bundle(bundle_dir: Path, parameter: str, collapse: bool) -> bool:
+    """Whether a bundle holds the given model"""
+    model_dir = Path(bundle_dir) / model_name(parameter, collapse)
+    return (model_dir / "booster.ubj").is_file()
+
+
+def bundle_matches(bundle_dir: Path, models_dir: Path, parameter: str,
+                   collapse: bool) -> bool:
+    """Whether a bundle was exported from the given source models
+
+    Parameters
+    ----------
+    bundle_dir : Path
+        Bundle directory
+    models_dir : Path
+        Directory of the source .sav and .json models
+    parameter : str
+        R, ro_2 or ro_3
+    collapse : bool
+        True for collapse models
+
+    Returns
+    ----------
+    bool
+        True when the manifest of the bundle records the installed package
+        version and the hash of the source artifacts of the model
+    """
+    try:
+        with open(Path(bundle_dir) / MANIFEST) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    name = model_name(parameter, collapse)
+    return (
+        manifest.get("version") == package_version()
+        and manifest.get("models", {}).get(name) == source_hash(
+            models_dir, parameter, collapse)
+    )
+
+
+if __name__ == "__main__":
+    out = export_bundle(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Bundle written to {out}")
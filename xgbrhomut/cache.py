@@ -0,0 +1,180 @@
+"""
+Memoization of repeated predictions
+
+Iterative design loops call make_prediction many times with identical or
+nearly identical inputs. A PredictionCache stores the results keyed on the
+rounded inputs, in memory with least recently used eviction and,
+optionally, in an SQLite file shared between runs:
+
+    cache = PredictionCache(maxsize=4096, decimals=4,
+                            persist_path="predictions.sqlite")
+    model = XGBPredict("sa", False, cache=cache)
+"""
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 1024, decimals: int = 6,
+                 persist_path: Path = None) -> None:
+        """
+        Bounded LRU cache of predictions
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            Maximum number of predictions held in memory, by default 1024
+        decimals : int, optional
+            Inputs are rounded to this number of decimals, predictions of
+            inputs rounding to the same values are shared, by default 6
+        persist_path : Path, optional
+            SQLite file keeping every prediction between runs, by default
+            None (memory only)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.persist_path = persist_path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._connection = None
+        if persist_path is not None:
+            import sqlite3
+
+            self._connection = sqlite3.connect(
+                str(persist_path), timeout=30, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key TEXT PRIMARY KEY, median REAL, dispersion REAL)")
+            self._connection.commit()
+
+    def quantize(self, value):
+        """Rounds an input, None stays None"""
+        if value is None:
+            return None
+        return round(float(value), self.decimals)
+
+    def key(self, parameter: str, collapse: bool, *inputs,
+            dispersion_mode: str = "nearest",
+            engine: str = "xgboost",
+            curves: str = None,
+            source: str = None) -> tuple:
+        """Key of a prediction
+
+        Parameters
+        ----------
+        parameter : str
+            R, ro_2 or ro_3
+        collapse : bool
+            True for collapse models
+        *inputs : float or None
+            Period, damping, hardening ratio, ductility, dynamic ductility
+            and strength ratio
+        dispersion_mode : str, optional
+            Dispersion mode of the model, by default "nearest"
+        engine : str, optional
+            Prediction engine of the model, by default "xgboost"
+        curves : str, optional
+            Fingerprint of the precomputed curves of the model, see
+            curves.CurveGrid, by default None (curves of the booster)
+        source : str, optional
+            Hash of the model artifacts, so that entries persisted in the
+            SQLite file do not outlive a model update, see
+            ModelRegistry.source_hash, by default None
+
+        Returns
+        ----------
+        tuple
+            Rounded inputs, parameter, collapse flag, dispersion mode,
+            engine, curves and source
+        """
+        return tuple(self.quantize(value) for value in inputs) + (
+            parameter, bool(collapse), dispersion_mode, engine, curves,
+            source)
+
+    def get(self, key: tuple):
+        """Cached prediction of a key, None when missing"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(value)
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT median, dispersion FROM predictions "
+                    "WHERE key = ?", (json.dumps(key),)).fetchone()
+                if row is not None:
+                    value = {"median": row[0], "dispersion": row[1]}
+                    self._store(key, value)
+                    self.disk_hits += 1
+                    return dict(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, value: dict) -> None:
+        """Stores a prediction"""
+        value = {
+            "median": float(value["median"]),
+            "dispersion": float(value["dispersion"]),
+        }
+        with self._lock:
+            self._store(key, value)
+
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                    (json.dumps(key), value["median"], value["dispersion"]))
+                self._connection.commit()
+
+    def _store(self, key, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self, persistent: bool = False) -> None:
+        """Empties the memory tier and, optionally, the SQLite file"""
+        with self._lock:
+            self._entries.clear()
+            if persistent and self._connection is not None:
+                self._connection.execute("DELETE FROM predictions")
+                self._connection.commit()
+
+    def stats(self) -> dict:
+        """Hit and miss counters of the cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        """Closes the SQLite file"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
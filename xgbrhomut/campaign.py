@@ -0,0 +1,273 @@
+"""
+Parametric campaigns over large grids of systems
+
+The input grid is split into chunks that are predicted on a pool of
+worker processes, each loading its models once. Completed chunks can be
+written to a checkpoint directory, so that an interrupted campaign
+resumes where it stopped.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .XGBPredict import XGBPredict
+from .registry import registry
+
+
+INPUTS = (
+    "period",
+    "damping",
+    "hardening_ratio",
+    "ductility",
+    "dynamic_ductility",
+)
+
+# (im_type, collapse) of all shipped models
+MODELS = (
+    ("sa", False),
+    ("sa", True),
+    ("sa_avg", False),
+    ("sa_avg", True),
+)
+
+_predictors = {}
+
+
+def make_grid(period, damping, hardening_ratio, ductility,
+              dynamic_ductility=None) -> dict:
+    """Cartesian product of the input values
+
+    Parameters
+    ----------
+    period : array_like
+        Periods
+    damping : array_like
+        Damping ratios
+    hardening_ratio : array_like
+        Hardening ratios
+    ductility : array_like
+        Hardening ductilities
+    dynamic_ductility : array_like, optional
+        Dynamic ductilities, by default None
+
+    Returns
+    ----------
+    dict
+        Flat arrays of every combination, keyed by input name, the last
+        input varying fastest
+    """
+    values = [period, damping, hardening_ratio, ductility]
+    if dynamic_ductility is not None:
+        values.append(dynamic_ductility)
+
+    mesh = np.meshgrid(
+        *(np.atleast_1d(np.asarray(value, dtype=float)) for value in values),
+        indexing="ij")
+
+    return {name: array.ravel() for name, array in zip(INPUTS, mesh)}
+
+
+def input_hash(inputs: dict) -> str:
+    """SHA-256 of the input arrays, identifying the grid of a campaign
+
+    Parameters
+    ----------
+    inputs : dict
+        Input arrays keyed by name
+
+    Returns
+    ----------
+    str
+        Hexadecimal digest over the names and double precision values
+    """
+    digest = hashlib.sha256()
+    for name in sorted(inputs):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(inputs[name], dtype=float).data)
+    return digest.hexdigest()
+
+
+def _init_worker(models, nthread, engine) -> None:
+    for im_type, collapse in models:
+        predictor = XGBPredict(im_type, collapse, engine=engine)
+        entry = registry.get(predictor.parameter, predictor.collapse)
+        if engine == "xgboost" and nthread is not None:
+            entry.model.set_param({"nthread": nthread})
+        _predictors[(im_type, collapse)] = predictor
+
+
+def _run_chunk(model, index, inputs) -> tuple:
+    prediction = _predictors[model].predict_batch(**inputs)
+    return model, index, prediction["median"], prediction["dispersion"]
+
+
+def _checkpoint_file(checkpoint_dir: Path, model, index) -> Path:
+    im_type, collapse = model
+    method = "_collapse" if collapse else ""
+    return checkpoint_dir / f"{im_type}{method}_{index:06d}.npz"
+
+
+def _prepare_checkpoint(checkpoint_dir, inputs, chunk_size, models,
+                        engine) -> None:
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "n_rows": int(len(inputs["period"])),
+        "chunk_size": int(chunk_size),
+        "models": [list(model) for model in models],
+        "input_hash": input_hash(inputs),
+        "engine": engine,
+    }
+
+    manifest_file = checkpoint_dir / "campaign.json"
+    if manifest_file.is_file():
+        with open(manifest_file) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ValueError(
+                f"Checkpoint directory {checkpoint_dir} belongs to a "
+                "different campaign")
+    else:
+        with open(manifest_file, "w") as f:
+            json.dump(manifest, f)
+
+
+def run_campaign(
+    inputs: dict,
+    models=MODELS,
+    chunk_size: int = 100_000,
+    n_workers: int = None,
+    nthread: int = None,
+    engine: str = "xgboost",
+    checkpoint_dir: Path = None,
+    progress: Callable = None,
+) -> dict:
+    """Predicts a grid of systems on a pool of worker processes
+
+    Parameters
+    ----------
+    inputs : dict
+        Arrays of equal length keyed by 'period', 'damping',
+        'hardening_ratio', 'ductility' and, for non-collapse models,
+        'dynamic_ductility', see make_grid
+    models : list[tuple[str, bool]], optional
+        (im_type, collapse) of the models to run, by default all shipped
+        models
+    chunk_size : int, optional
+        Number of systems per task, by default 100000
+    n_workers : int, optional
+        Number of worker processes, 0 to run in the current process, by
+        default the number of CPUs
+    nthread : int, optional
+        Threads used by xgboost in each worker, by default the number of
+        CPUs divided by the number of workers
+    engine : str, optional
+        Prediction engine, see XGBPredict, by default "xgboost"
+    checkpoint_dir : Path, optional
+        Directory where completed chunks are stored and read back when
+        the campaign is resumed with the same inputs, chunk size, models
+        and engine, by default None
+    progress : Callable, optional
+        Called as progress(completed, total) after each chunk, by default
+        None
+
+    Returns
+    ----------
+    dict
+        {
+            (im_type, collapse): {
+                median: np.ndarray,
+                dispersion: np.ndarray
+            }
+        }, in input order
+
+    Raises
+    ------
+    ValueError
+        When the checkpoint directory holds a different campaign
+    """
+    models = [(im_type, bool(collapse)) for im_type, collapse in models]
+    inputs = {
+        name: np.asarray(value, dtype=float)
+        for name, value in inputs.items() if name in INPUTS}
+    n_rows = len(inputs["period"])
+
+    n_cpus = os.cpu_count() or 1
+    if n_workers is None:
+        n_workers = n_cpus
+    if nthread is None:
+        nthread = max(1, n_cpus // max(n_workers, 1))
+
+    if checkpoint_dir is not None:
+        checkpoint_dir = Path(checkpoint_dir)
+        _prepare_checkpoint(
+            checkpoint_dir, inputs, chunk_size, models, engine)
+
+    starts = range(0, n_rows, chunk_size)
+    results = {
+        model: {
+            "median": np.empty(n_rows),
+            "dispersion": np.empty(n_rows),
+        } for model in models
+    }
+
+    def store(model, index, median, dispersion):
+        start = index * chunk_size
+        results[model]["median"][start:start + chunk_size] = median
+        results[model]["dispersion"][start:start + chunk_size] = dispersion
+
+        if checkpoint_dir is not None:
+            filename = _checkpoint_file(checkpoint_dir, model, index)
+            temporary = filename.with_suffix(".tmp.npz")
+            np.savez(temporary, median=median, dispersion=dispersion)
+            os.replace(temporary, filename)
+
+    tasks = []
+    total = len(models) * len(starts)
+    completed = 0
+    for model in models:
+        for index, start in enumerate(starts):
+            filename = None
+            if checkpoint_dir is not None:
+                filename = _checkpoint_file(checkpoint_dir, model, index)
+
+            if filename is not None and filename.is_file():
+                with np.load(filename) as data:
+                    chunk = slice(start, start + chunk_size)
+                    results[model]["median"][chunk] = data["median"]
+                    results[model]["dispersion"][chunk] = data["dispersion"]
+                completed += 1
+                continue
+
+            chunk = {
+                name: value[start:start + chunk_size]
+                for name, value in inputs.items()}
+            tasks.append((model, index, chunk))
+
+    if progress is not None and completed:
+        progress(completed, total)
+
+    if n_workers == 0:
+        _init_worker(models, None, engine)
+        for task in tasks:
+            store(*_run_chunk(*task))
+            completed += 1
+            if progress is not None:
+                progress(completed, total)
+        return results
+
+    with ProcessPoolExecutor(
+            max_workers=n_workers, initializer=_init_worker,
+            initargs=(models, nthread, engine)) as executor:
+        futures = [executor.submit(_run_chunk, *task) for task in tasks]
+        for future in as_completed(futures):
+            store(*future.result())
+            completed += 1
+            if progress is not None:
+                progress(completed, total)
+
+    return results
@@ -0,0 +1,238 @@
+"""
+Comparison of the XGB strength ratios with analytical R-mu-T relationships
+
+The median R of the XGB non-collapse model and the strength ratios of the
+analytical relationships are evaluated on the same systems, the ductility
+demand of the relationships being the dynamic ductility of the model.
+Errors are measured per period band with the log-ratio
+
+    e = ln(R_relationship / R_xgb)
+
+through its mean (bias), standard deviation (spread) and root mean square.
+
+    values = evaluate(period=np.linspace(0.1, 3, 100)[:, None],
+                      ductility=np.linspace(1, 6, 50))
+    metrics = band_metrics(values)
+"""
+import numpy as np
+
+from .XGBPredict import XGBPredict
+from .r_mu_t import ec8, krawinkler_nassar, miranda, newmark_hall, vidic
+
+
+RELATIONSHIPS = {
+    "ec8": ec8.strength_ratio,
+    "vidic": vidic.strength_ratio,
+    "newmark_hall": newmark_hall.strength_ratio,
+    "miranda": miranda.strength_ratio,
+    "krawinkler_nassar": krawinkler_nassar.strength_ratio,
+}
+
+# Default parameters of the relationships, Newmark and Hall's period_cc
+# defaults to the period where R is continuous, period_c sqrt(2 mu - 1) / mu
+PARAMETERS = {
+    "ec8": {"period_c": 0.5},
+    "vidic": {"period_c": 0.5},
+    "newmark_hall": {"period_c": 0.5, "period_cc": None},
+    "miranda": {"site": "rock", "period_g": 1.0},
+    "krawinkler_nassar": {"ah": 2},
+}
+
+PERIOD_BANDS = (0.0, 0.2, 0.5, 1.0, 2.0, 3.0)
+
+
+def evaluate(
+    period,
+    ductility,
+    damping=0.05,
+    hardening_ratio=0.02,
+    hardening_ductility=8.0,
+    relationships=tuple(RELATIONSHIPS),
+    parameters: dict = None,
+    model: XGBPredict = None,
+) -> dict:
+    """Strength ratios of the XGB model and of the relationships
+
+    Parameters
+    ----------
+    period : array_like
+        Periods, broadcast against the other inputs, e.g. a column for a
+        period-ductility grid
+    ductility : array_like
+        Ductility demands, the dynamic ductilities of the XGB model
+    damping : array_like, optional
+        Damping ratios of the XGB model, by default 0.05
+    hardening_ratio : array_like, optional
+        Hardening ratios of the XGB model, by default 0.02, matching the
+        2% hardening of krawinkler_nassar
+    hardening_ductility : array_like, optional
+        Hardening ductilities of the XGB model, by default 8.0
+    relationships : tuple[str], optional
+        Relationships to evaluate, by default all of RELATIONSHIPS
+    parameters : dict, optional
+        Parameters overriding PARAMETERS, keyed by relationship, e.g.
+        {"miranda": {"site": "alluvium"}}, by default None
+    model : XGBPredict, optional
+        XGB model, by default the non-collapse R model
+
+    Returns
+    ----------
+    dict
+        {
+            period: np.ndarray,
+            ductility: np.ndarray,
+            xgb: np.ndarray,
+            <relationship>: np.ndarray
+        }, all of the broadcast input shape
+
+    Raises
+    ------
+    ValueError
+        For unknown relationships, or a model that does not predict
+        non-collapse R
+    """
+    unknown = set(relationships) - set(RELATIONSHIPS)
+    if unknown:
+        raise ValueError(
+            f"Unknown relationships {sorted(unknown)}, must be among "
+            f"{', '.join(RELATIONSHIPS)}")
+
+    if model is None:
+        model = XGBPredict("sa", False)
+    if model.parameter != "R" or model.collapse:
+        raise ValueError("Comparisons require the non-collapse R model")
+
+    period, ductility, damping, hardening_ratio, hardening_ductility = (
+        np.broadcast_arrays(*(
+            np.asarray(value, dtype=float) for value in (
+                period, ductility, damping, hardening_ratio,
+                hardening_ductility))))
+
+    # A single batch through the model
+    values = {
+        "period": period,
+        "ductility": ductility,
+        "xgb": model.predict_batch(
+            period, damping, hardening_ratio, hardening_ductility,
+            ductility)["median"],
+    }
+
+    parameters = parameters or {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name in relationships:
+            options = {**PARAMETERS[name], **parameters.get(name, {})}
+            if name == "newmark_hall" and options["period_cc"] is None:
+                options["period_cc"] = options["period_c"] * np.sqrt(
+                    2 * ductility - 1) / ductility
+
+            values[name] = np.broadcast_to(
+                RELATIONSHIPS[name](ductility, period, **options),
+                period.shape)
+
+    return values
+
+
+def band_metrics(values: dict, bands=PERIOD_BANDS,
+                 as_frame: bool = False):
+    """Log-ratio errors of the relationships per period band
+
+    Points where either strength ratio is not positive and finite are
+    left out of the metrics
+
+    Parameters
+    ----------
+    values : dict
+        Output of evaluate
+    bands : array_like, optional
+        Increasing edges of the period bands, the last band including its
+        upper edge, by default PERIOD_BANDS
+    as_frame : bool, optional
+        Return a pandas DataFrame instead of a dict of columns, by default
+        False
+
+    Returns
+    ----------
+    dict or pd.DataFrame
+        One row per relationship and band, with columns relationship,
+        period_min, period_max, n, bias (mean log-ratio), spread
+        (standard deviation of the log-ratio) and rmse (root mean square
+        log-ratio)
+    """
+    bands = np.asarray(bands, dtype=float)
+    if bands.ndim != 1 or bands.size < 2 or np.any(np.diff(bands) <= 0):
+        raise ValueError("Bands must be at least two increasing edges")
+    n_bands = bands.size - 1
+
+    period = np.ravel(values["period"])
+    band = np.searchsorted(bands, period, side="right") - 1
+    band[period == bands[-1]] = n_bands - 1
+    inside = (band >= 0) & (band < n_bands)
+
+    relationships = [name for name in RELATIONSHIPS if name in values]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_xgb = np.log(np.ravel(values["xgb"]))
+
+    columns = {
+        "relationship": np.repeat(relationships, n_bands),
+        "period_min": np.tile(bands[:-1], len(relationships)),
+        "period_max": np.tile(bands[1:], len(relationships)),
+    }
+
+    n, bias, spread, rmse = [], [], [], []
+    for name in relationships:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            error = np.log(np.ravel(values[name])) - log_xgb
+
+        valid = inside & np.isfinite(error)
+        index = band[valid]
+        error = error[valid]
+
+        # Band sums in one pass each, as np.bincount
+        count = np.bincount(index, minlength=n_bands)
+        total = np.bincount(index, error, minlength=n_bands)
+        squares = np.bincount(index, error * error, minlength=n_bands)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            mean_square = squares / count
+
+        n.append(count)
+        bias.append(mean)
+        spread.append(np.sqrt(np.maximum(mean_square - mean * mean, 0)))
+        rmse.append(np.sqrt(mean_square))
+
+    columns["n"] = np.concatenate(n) if n else np.empty(0, dtype=int)
+    for key, column in (("bias", bias), ("spread", spread), ("rmse", rmse)):
+        columns[key] = np.concatenate(column) if column else np.empty(0)
+
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame(columns)
+
+    return columns
+
+
+def compare(period, ductility, bands=PERIOD_BANDS, as_frame: bool = True,
+            **kwargs):
+    """Evaluates the XGB model and the relationships on a grid and
+    tabulates their errors per period band
+
+    Parameters
+    ----------
+    period, ductility : array_like
+        Periods and ductility demands, see evaluate
+    bands : array_like, optional
+        Edges of the period bands, by default PERIOD_BANDS
+    as_frame : bool, optional
+        Return a pandas DataFrame, by default True
+    **kwargs
+        damping, hardening_ratio, hardening_ductility, relationships,
+        parameters and model, see evaluate
+
+    Returns
+    ----------
+    pd.DataFrame or dict
+        Metrics per relationship and band, see band_metrics
+    """
+    return band_metrics(
+        evaluate(period, ductility, **kwargs), bands, as_frame)
@@ -0,0 +1,246 @@
+"""
+Precomputed strength ratio - dynamic ductility curves
+
+The curves of a non-collapse model are evaluated once on the grid of its
+training systems (period, damping, hardening ratio, ductility) and saved.
+Curves of other systems are then obtained by multilinear interpolation
+between the grid systems, without evaluating the booster:
+
+    grid = CurveGrid.build(XGBPredict("sa", False))
+    grid.save("R_curves.npz")
+
+    model = XGBPredict("sa", False)
+    model.curve_grid = CurveGrid.load("R_curves.npz")
+    model.predict_curve(1.0, 0.05, 0.03, 4)
+"""
+import hashlib
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+
+def multilinear(axes: tuple, values: np.ndarray, points: tuple) -> np.ndarray:
+    """Multilinear interpolation on a rectilinear grid
+
+    Points outside of the grid are clamped to its boundaries
+
+    Parameters
+    ----------
+    axes : tuple[np.ndarray]
+        Sorted grid points of each of the first len(axes) dimensions of
+        values
+    values : np.ndarray
+        Values on the grid, trailing dimensions are interpolated as a
+        whole
+    points : tuple[np.ndarray]
+        Coordinates of the points along each axis, shape (n,)
+
+    Returns
+    ----------
+    np.ndarray
+        Interpolated values, shape (n,) + values.shape[len(axes):]
+    """
+    lead = values.shape[:len(axes)]
+    trailing = values.shape[len(axes):]
+    flat = values.reshape((-1,) + trailing)
+
+    # Row-major strides of the grid axes, in elements
+    strides = np.cumprod((lead[1:] + (1,))[::-1])[::-1]
+
+    base = 0
+    steps = []
+    weights = []
+    for axis, point, stride in zip(axes, points, strides):
+        point = np.asarray(point, dtype=float)
+        if axis.size == 1:
+            steps.append(0)
+            weights.append(np.zeros(point.shape))
+            continue
+
+        index = np.clip(
+            np.searchsorted(axis, point, side="right") - 1, 0, axis.size - 2)
+        weight = (point - axis[index]) / (axis[index + 1] - axis[index])
+        base = base + index * stride
+        steps.append(stride)
+        weights.append(np.clip(weight, 0.0, 1.0))
+
+    base = np.asarray(base)
+    result = np.zeros(base.shape + trailing)
+    expand = (...,) + (None,) * len(trailing)
+
+    for corner in product((0, 1), repeat=len(axes)):
+        weight = np.ones(base.shape)
+        offset = 0
+        for upper, step, w in zip(corner, steps, weights):
+            if upper:
+                if step == 0:
+                    break
+                weight = weight * w
+                offset += step
+            else:
+                weight = weight * (1 - w)
+        else:
+            result += weight[expand] * flat[base + offset]
+
+    return result
+
+
+class CurveGrid:
+    def __init__(
+        self,
+        periods: np.ndarray,
+        dampings: np.ndarray,
+        hardening_ratios: np.ndarray,
+        ductilities: np.ndarray,
+        ductility_grid: np.ndarray,
+        medians: np.ndarray,
+        dispersions: np.ndarray,
+        parameter: str = None,
+    ) -> None:
+        """
+        Strength ratio - dynamic ductility curves on a grid of systems
+
+        Parameters
+        ----------
+        periods : np.ndarray
+            Sorted periods of the grid
+        dampings : np.ndarray
+            Sorted damping ratios of the grid
+        hardening_ratios : np.ndarray
+            Sorted hardening ratios of the grid
+        ductilities : np.ndarray
+            Sorted hardening ductilities of the grid
+        ductility_grid : np.ndarray
+            Dynamic ductilities where the curves are evaluated
+        medians : np.ndarray
+            Median strength ratios, shape (period, damping,
+            hardening_ratio, ductility, dynamic_ductility)
+        dispersions : np.ndarray
+            Dispersions, same shape as medians
+        parameter : str, optional
+            R or ro_2, by default None
+        """
+        self.periods = np.asarray(periods, dtype=float)
+        self.dampings = np.asarray(dampings, dtype=float)
+        self.hardening_ratios = np.asarray(hardening_ratios, dtype=float)
+        self.ductilities = np.asarray(ductilities, dtype=float)
+        self.ductility_grid = np.asarray(ductility_grid, dtype=float)
+        self.medians = medians
+        self.dispersions = dispersions
+        self.parameter = parameter
+        self._fingerprint = None
+
+    @property
+    def axes(self) -> tuple:
+        return (self.periods, self.dampings, self.hardening_ratios,
+                self.ductilities)
+
+    @property
+    def fingerprint(self) -> str:
+        """SHA-256 of the parameter, grid and curves, identifying the grid
+        in prediction cache keys. Computed once, grids are not meant to be
+        modified in place"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256(str(self.parameter).encode())
+            for array in self.axes + (self.ductility_grid, self.medians,
+                                      self.dispersions):
+                array = np.ascontiguousarray(array, dtype=float)
+                digest.update(str(array.shape).encode())
+                digest.update(array.tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def build(cls, model, axes: tuple = None,
+              ductility_grid: np.ndarray = None) -> "CurveGrid":
+        """Evaluates the curves of a model on a grid of systems
+
+        Parameters
+        ----------
+        model : XGBPredict
+            Non-collapse model
+        axes : tuple[np.ndarray], optional
+            Periods, damping ratios, hardening ratios and ductilities of
+            the grid, by default the training grid of the model
+        ductility_grid : np.ndarray, optional
+            Dynamic ductilities of the curves, by default
+            XGBPredict.ductility_range
+
+        Returns
+        ----------
+        CurveGrid
+            Precomputed curves
+        """
+        if axes is None:
+            entry = model.registry.get(model.parameter, model.collapse)
+            axes = entry.dispersions.axes
+        if ductility_grid is None:
+            ductility_grid = model.ductility_range
+
+        axes = tuple(np.sort(np.asarray(axis, dtype=float)) for axis in axes)
+        mesh = np.meshgrid(*axes, indexing="ij")
+
+        curves = model._curves(
+            *(array.ravel() for array in mesh), ductility_grid)
+        shape = mesh[0].shape + (len(ductility_grid),)
+
+        return cls(
+            *axes,
+            ductility_grid,
+            curves["median"].reshape(shape),
+            curves["dispersion"].reshape(shape),
+            model.parameter,
+        )
+
+    def save(self, filename: Path) -> None:
+        """Writes the curves to a .npz file"""
+        np.savez(
+            filename,
+            periods=self.periods,
+            dampings=self.dampings,
+            hardening_ratios=self.hardening_ratios,
+            ductilities=self.ductilities,
+            ductility_grid=self.ductility_grid,
+            medians=self.medians,
+            dispersions=self.dispersions,
+            parameter=np.asarray(self.parameter or ""),
+        )
+
+    @classmethod
+    def load(cls, filename: Path) -> "CurveGrid":
+        """Reads curves written by save"""
+        with np.load(filename) as data:
+            arrays = {key: data[key] for key in data.files}
+
+        arrays["parameter"] = str(arrays["parameter"]) or None
+        return cls(**arrays)
+
+    def evaluate(self, period, damping, hardening_ratio,
+                 ductility) -> dict:
+        """Interpolates the curves of systems
+
+        Parameters
+        ----------
+        period : np.ndarray
+            Periods, shape (n,)
+        damping : np.ndarray
+            Damping ratios, shape (n,)
+        hardening_ratio : np.ndarray
+            Hardening ratios, shape (n,)
+        ductility : np.ndarray
+            Hardening ductilities, shape (n,)
+
+        Returns
+        ----------
+        dict
+            {
+                median: np.ndarray, shape (n, len(ductility_grid)),
+                dispersion: np.ndarray, shape (n, len(ductility_grid))
+            }
+        """
+        points = (period, damping, hardening_ratio, ductility)
+        return {
+            "median": multilinear(self.axes, self.medians, points),
+            "dispersion": multilinear(self.axes, self.dispersions, points),
+        }
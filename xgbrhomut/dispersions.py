@@ -0,0 +1,383 @@
+import warnings
+
+import numpy as np
+
+from .curves import multilinear
+
+
+def interp_rows(x, xp, fp, fill_value=None):
+    """Row-wise linear interpolation
+
+    Equivalent to evaluating interp1d(xp[i], fp[i])(x[i]) for every row i,
+    i.e. np.interp on the sorted points, including its handling of
+    repeated and NaN points
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Points to evaluate, shape (n,)
+    xp : np.ndarray
+        x-coordinates of each row, shape (n, m)
+    fp : np.ndarray
+        y-coordinates of each row, shape (n, m)
+    fill_value : np.ndarray, optional
+        Values returned for points outside of the range of each row,
+        shape (n,), by default the first and last values of the row
+
+    Returns
+    ----------
+    np.ndarray
+        Interpolated values, shape (n,)
+    """
+    order = np.argsort(xp, axis=1, kind="mergesort")
+    xp = np.take_along_axis(xp, order, axis=1)
+    fp = np.take_along_axis(fp, order, axis=1)
+
+    n_points = xp.shape[1]
+    rows = np.arange(xp.shape[0])
+
+    # Last point at or below x
+    index = (xp <= x[:, None]).sum(axis=1) - 1
+    lo = np.clip(index, 0, n_points - 2)
+    x_lo, x_hi = xp[rows, lo], xp[rows, lo + 1]
+    y_lo, y_hi = fp[rows, lo], fp[rows, lo + 1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (y_hi - y_lo) / (x_hi - x_lo)
+        y = slope * (x - x_lo) + y_lo
+        retry = np.isnan(y)
+        y[retry] = slope[retry] * (x - x_hi)[retry] + y_hi[retry]
+
+    flat = np.isnan(y) & (y_lo == y_hi)
+    y[flat] = y_lo[flat]
+
+    exact = x == x_lo
+    y[exact] = y_lo[exact]
+    y[index < 0] = fp[index < 0, 0]
+    y[index >= n_points - 1] = fp[index >= n_points - 1, -1]
+    y[np.isnan(x)] = np.nan
+
+    if fill_value is not None:
+        outside = (x < xp[:, 0]) | (x > xp[:, -1])
+        y[outside] = fill_value[outside]
+
+    return y
+
+
+def nearest_index(axis: np.ndarray, values) -> np.ndarray:
+    """Index of the nearest point of a sorted axis to each value, ties
+    resolved to the smaller point
+
+    Parameters
+    ----------
+    axis : np.ndarray
+        Sorted grid points
+    values : array_like
+        Values to locate
+
+    Returns
+    ----------
+    np.ndarray
+        Indices into axis
+    """
+    values = np.asarray(values, dtype=float)
+    right = np.clip(np.searchsorted(axis, values), 0, axis.size - 1)
+    left = np.clip(right - 1, 0, axis.size - 1)
+
+    closer = np.abs(axis[right] - values) < np.abs(axis[left] - values)
+    index = np.where(closer, right, left)
+
+    # NaN inputs fall back to the first key, as a min() scan would
+    return np.where(np.isnan(values), 0, index)
+
+
+class DispersionTable:
+    def __init__(
+        self,
+        periods: np.ndarray,
+        dampings: np.ndarray,
+        hardening_ratios: np.ndarray,
+        ductilities: np.ndarray,
+        values: np.ndarray,
+        dynamic_ductilities: np.ndarray = None,
+    ) -> None:
+        """
+        Dispersions of a model on the grid of its training systems
+
+        Parameters
+        ----------
+        periods : np.ndarray
+            Sorted periods of the grid
+        dampings : np.ndarray
+            Sorted damping ratios of the grid
+        hardening_ratios : np.ndarray
+            Sorted hardening ratios of the grid
+        ductilities : np.ndarray
+            Sorted hardening ductilities of the grid
+        values : np.ndarray
+            Dispersions, shape (period, damping, hardening_ratio,
+            ductility) for collapse models and (period, damping,
+            hardening_ratio, ductility, dynamic_ductility) otherwise
+        dynamic_ductilities : np.ndarray, optional
+            Dynamic ductilities of the last axis of non-collapse models,
+            by default None
+        """
+        self.periods = periods
+        self.dampings = dampings
+        self.hardening_ratios = hardening_ratios
+        self.ductilities = ductilities
+        self.values = values
+        self.dynamic_ductilities = dynamic_ductilities
+
+    @property
+    def collapse(self) -> bool:
+        return self.dynamic_ductilities is None
+
+    @property
+    def axes(self) -> tuple:
+        return (self.periods, self.dampings, self.hardening_ratios,
+                self.ductilities)
+
+    @classmethod
+    def from_dict(cls, dispersions: dict) -> "DispersionTable":
+        """Compiles the nested dispersions dictionary into a dense table
+
+        Parameters
+        ----------
+        dispersions : dict
+            Dispersions, {
+                "period": {
+                    "damping": {
+                        "hardening_ratio": {
+                            "ductility": float or list[float]
+                        }
+                    }
+                },
+                "ductility": list[float], for non-collapse models only
+            }
+
+        Returns
+        ----------
+        DispersionTable
+            Compiled table
+        """
+        def is_valid_float(s):
+            try:
+                float(s)
+                return True
+            except ValueError:
+                return False
+
+        def keys(level):
+            return sorted(
+                (key for key in level if is_valid_float(key)), key=float)
+
+        period_keys = keys(dispersions)
+        first = dispersions[period_keys[0]]
+        damp_keys = keys(first)
+        hard_keys = keys(first[damp_keys[0]])
+        duct_keys = keys(first[damp_keys[0]][hard_keys[0]])
+
+        values = np.array([[[[
+            dispersions[period][damping][hardening][ductility]
+            for ductility in duct_keys]
+            for hardening in hard_keys]
+            for damping in damp_keys]
+            for period in period_keys], dtype=float)
+
+        dynamic_ductilities = dispersions.get("ductility")
+        if dynamic_ductilities is not None:
+            dynamic_ductilities = np.asarray(dynamic_ductilities, dtype=float)
+
+        return cls(
+            np.array(period_keys, dtype=float),
+            np.array(damp_keys, dtype=float),
+            np.array(hard_keys, dtype=float),
+            np.array(duct_keys, dtype=float),
+            values,
+            dynamic_ductilities,
+        )
+
+    def lookup(
+        self,
+        period,
+        damping,
+        hardening_ratio,
+        ductility,
+        dynamic_ductility=None,
+        chunk_size: int = 4096,
+    ) -> np.ndarray:
+        """Gets dispersion values
+
+        The nearest grid system is selected for each input, and for
+        non-collapse models the dispersion is interpolated along the
+        dynamic ductility. Unattainable dynamic ductilities (null
+        dispersions) fall back to the largest dispersion of the system.
+
+        Parameters
+        ----------
+        period : array_like
+            Period in [s]
+        damping : array_like
+            Damping
+        hardening_ratio : array_like
+            Hardening ratio
+        ductility : array_like
+            Ductility
+        dynamic_ductility : array_like, optional
+            Dynamic ductility, required for non-collapse models
+        chunk_size : int, optional
+            Number of rows interpolated at once, bounding the memory of
+            the gathered dispersion rows, by default 4096
+
+        Returns
+        ----------
+        np.ndarray
+            Dispersion values
+        """
+        inputs = (period, damping, hardening_ratio, ductility)
+        if not self.collapse:
+            inputs += (dynamic_ductility,)
+
+        inputs = np.broadcast_arrays(*(
+            np.asarray(value, dtype=float) for value in inputs))
+        shape = inputs[0].shape
+        inputs = [value.ravel() for value in inputs]
+
+        index = tuple(
+            nearest_index(axis, value)
+            for axis, value in zip(self.axes, inputs))
+
+        if self.collapse:
+            return self.values[index].reshape(shape)
+
+        val = np.empty(inputs[0].size)
+        any_null = False
+        for start in range(0, val.size, chunk_size):
+            rows = slice(start, start + chunk_size)
+            dispersion = self.values[tuple(i[rows] for i in index)]
+
+            xp = np.broadcast_to(self.dynamic_ductilities, dispersion.shape)
+            chunk = val[rows]
+            chunk[:] = interp_rows(
+                inputs[4][rows], xp, dispersion,
+                fill_value=dispersion[:, -1])
+
+            null = np.isnan(chunk) | (chunk == 0)
+            if np.any(null):
+                any_null = True
+
+                # Largest dispersion of the system, as max() over the list
+                largest = np.fmax.reduce(dispersion[null], axis=1)
+                largest[np.isnan(dispersion[null, 0])] = np.nan
+                chunk[null] = largest
+
+        if any_null:
+            warnings.warn(
+                "Dispersion is null, as dynamic ductility is unattainable for "
+                "given input... Try with smaller dynamic ductility value")
+
+        return val.reshape(shape)
+
+
+class DispersionSurrogate:
+    def __init__(self, axes: tuple, values: np.ndarray) -> None:
+        """
+        Continuous dispersions, interpolated multilinearly between the
+        grid systems and, for non-collapse models, the dynamic
+        ductilities
+
+        Parameters
+        ----------
+        axes : tuple[np.ndarray]
+            Sorted periods, damping ratios, hardening ratios, ductilities
+            and, for non-collapse models, dynamic ductilities
+        values : np.ndarray
+            Dispersions on the grid without null values, one dimension per
+            axis
+        """
+        self.axes = tuple(np.asarray(axis, dtype=float) for axis in axes)
+        self.values = values
+
+    @property
+    def collapse(self) -> bool:
+        return len(self.axes) == 4
+
+    @classmethod
+    def from_table(cls, table: DispersionTable) -> "DispersionSurrogate":
+        """Precomputes the surrogate of a dispersion table
+
+        Null dispersions (NaN or 0) of unattainable dynamic ductilities are
+        replaced by the largest dispersion of their system, as in
+        DispersionTable.lookup
+
+        Parameters
+        ----------
+        table : DispersionTable
+            Dispersions on the grid
+
+        Returns
+        ----------
+        DispersionSurrogate
+            Surrogate of the table
+        """
+        values = np.array(table.values, dtype=float)
+        axes = table.axes
+
+        if not table.collapse:
+            axes += (table.dynamic_ductilities,)
+
+            null = np.isnan(values) | (values == 0)
+            largest = np.fmax.reduce(values, axis=-1, keepdims=True)
+            values = np.where(null, largest, values)
+
+        return cls(axes, values)
+
+    def evaluate(
+        self,
+        period,
+        damping,
+        hardening_ratio,
+        ductility,
+        dynamic_ductility=None,
+    ) -> np.ndarray:
+        """Interpolates dispersions, inputs outside of the grid are clamped
+        to its boundaries
+
+        Parameters
+        ----------
+        period, damping, hardening_ratio, ductility : array_like
+            Systems
+        dynamic_ductility : array_like, optional
+            Dynamic ductility, required for non-collapse models
+
+        Returns
+        ----------
+        np.ndarray
+            Dispersion values, broadcast shape of the inputs
+        """
+        inputs = (period, damping, hardening_ratio, ductility)
+        if not self.collapse:
+            inputs += (dynamic_ductility,)
+
+        inputs = np.broadcast_arrays(*(
+            np.asarray(value, dtype=float) for value in inputs))
+        shape = inputs[0].shape
+
+        dispersion = multilinear(
+            self.axes, self.values, [value.ravel() for value in inputs])
+
+        return dispersion.reshape(shape)
+
+    def save(self, filename) -> None:
+        """Writes the surrogate to a .npz file"""
+        np.savez(filename, values=self.values,
+                 **{f"axis_{i}": axis for i, axis in enumerate(self.axes)})
+
+    @classmethod
+    def load(cls, filename) -> "DispersionSurrogate":
+        """Reads a surrogate written by save"""
+        with np.load(filename) as data:
+            axes = tuple(
+                data[f"axis_{i}"] for i in range(len(data.files) - 1))
+            return cls(axes, data["values"])
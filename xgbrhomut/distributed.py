@@ -0,0 +1,447 @@
+"""
+Multi-node batch runs through a file-based work queue
+
+A coordinator splits the input grid into chunk manifests in a directory
+shared by all nodes. Worker processes, started on any node, claim chunks
+by atomically renaming their manifests, predict them and write one shard
+per chunk. Once all chunks are done, the shards are merged in order:
+
+    <queue_dir>/
+        queue.json                  campaign description
+        inputs/<input>.npy          input arrays, memory-mapped by workers
+        pending/<task>.json         chunks waiting for a worker
+        claimed/<task>.json         chunks being predicted
+        done/<task>.json            completed chunks
+        shards/<task>.npz|.parquet  predictions of completed chunks
+
+Workers are idempotent: a chunk whose shard exists is only marked as
+done, so crashed workers can simply be restarted, and chunks claimed by
+crashed workers are returned to the queue with requeue_stale. Live
+workers refresh the modification time of their claims (heartbeat), so
+only abandoned claims are requeued.
+
+    create_queue("/shared/run", make_grid(...), chunk_size=100_000)
+    python -m xgbrhomut.distributed worker /shared/run     # on each node
+    results = merge_results("/shared/run")
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .XGBPredict import XGBPredict
+from .campaign import INPUTS, MODELS, input_hash
+
+
+SHARD_FORMATS = ("npz", "parquet")
+
+STATES = ("pending", "claimed", "done")
+
+
+def _task_name(model, index) -> str:
+    im_type, collapse = model
+    method = "_collapse" if collapse else ""
+    return f"{im_type}{method}_{index:06d}"
+
+
+def _write_json(filename: Path, content) -> None:
+    temporary = filename.with_name(f".{filename.name}.tmp")
+    with open(temporary, "w") as f:
+        json.dump(content, f)
+    os.replace(temporary, filename)
+
+
+def _read_manifest(queue_dir: Path) -> dict:
+    with open(queue_dir / "queue.json") as f:
+        return json.load(f)
+
+
+def create_queue(
+    queue_dir: Path,
+    inputs: dict,
+    models=MODELS,
+    chunk_size: int = 100_000,
+    shard_format: str = "npz",
+) -> Path:
+    """Writes the inputs and chunk manifests of a campaign
+
+    Creating an existing queue again with the same inputs and options is a
+    no-op, so that coordinators can be restarted as well
+
+    Parameters
+    ----------
+    queue_dir : Path
+        Directory shared by the coordinator and all workers
+    inputs : dict
+        Arrays of equal length keyed by 'period', 'damping',
+        'hardening_ratio', 'ductility' and, for non-collapse models,
+        'dynamic_ductility', see campaign.make_grid
+    models : list[tuple[str, bool]], optional
+        (im_type, collapse) of the models to run, by default all shipped
+        models
+    chunk_size : int, optional
+        Number of systems per chunk, by default 100000
+    shard_format : str, optional
+        "npz" or "parquet" (requires pyarrow), by default "npz"
+
+    Returns
+    ----------
+    Path
+        Queue directory
+
+    Raises
+    ------
+    ValueError
+        When the directory holds a different campaign, or the shard format
+        is unknown
+    """
+    if shard_format not in SHARD_FORMATS:
+        raise ValueError(
+            f"Wrong shard format, must be one of {', '.join(SHARD_FORMATS)}")
+
+    queue_dir = Path(queue_dir)
+    models = [(im_type, bool(collapse)) for im_type, collapse in models]
+    inputs = {
+        name: np.asarray(value, dtype=float)
+        for name, value in inputs.items() if name in INPUTS}
+    n_rows = len(inputs["period"])
+
+    manifest = {
+        "n_rows": int(n_rows),
+        "chunk_size": int(chunk_size),
+        "models": [list(model) for model in models],
+        "inputs": sorted(inputs),
+        "input_hash": input_hash(inputs),
+        "shard_format": shard_format,
+    }
+
+    if (queue_dir / "queue.json").is_file():
+        if _read_manifest(queue_dir) != manifest:
+            raise ValueError(
+                f"Queue directory {queue_dir} belongs to a different "
+                "campaign")
+        return queue_dir
+
+    for name in ("inputs", "shards") + STATES:
+        (queue_dir / name).mkdir(parents=True, exist_ok=True)
+
+    for name, value in inputs.items():
+        np.save(queue_dir / "inputs" / f"{name}.npy", value)
+
+    for model in models:
+        for index, start in enumerate(range(0, n_rows, chunk_size)):
+            task = {
+                "model": list(model),
+                "index": index,
+                "start": start,
+                "stop": min(start + chunk_size, n_rows),
+            }
+            _write_json(
+                queue_dir / "pending" / f"{_task_name(model, index)}.json",
+                task)
+
+    # Written last, workers wait for a complete queue
+    _write_json(queue_dir / "queue.json", manifest)
+
+    return queue_dir
+
+
+def _claim(queue_dir: Path):
+    for filename in sorted((queue_dir / "pending").glob("*.json")):
+        claimed = queue_dir / "claimed" / filename.name
+        try:
+            # Refresh the modification time first, it marks the claim age
+            os.utime(filename)
+            os.rename(filename, claimed)
+        except FileNotFoundError:
+            # Claimed by another worker in the meantime
+            continue
+
+        with open(claimed) as f:
+            return claimed, json.load(f)
+
+    return None, None
+
+
+class _Heartbeat:
+    def __init__(self, filename: Path, interval: float) -> None:
+        """Refreshes the modification time of a claim while its chunk is
+        predicted, in a background thread"""
+        self.filename = filename
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                os.utime(self.filename)
+            except FileNotFoundError:
+                # Requeued or completed by another worker
+                return
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _shard_file(queue_dir: Path, name: str, shard_format: str) -> Path:
+    return queue_dir / "shards" / f"{name}.{shard_format}"
+
+
+def _write_shard(filename: Path, prediction: dict, shard_format: str):
+    # Per-worker temporary file, a requeued chunk may be written twice
+    temporary = filename.with_name(
+        f".{filename.name}.{socket.gethostname()}-{os.getpid()}.tmp")
+    if shard_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.table({
+            "median": prediction["median"],
+            "dispersion": prediction["dispersion"],
+        }), temporary)
+    else:
+        with open(temporary, "wb") as f:
+            np.savez(f, median=prediction["median"],
+                     dispersion=prediction["dispersion"])
+    os.replace(temporary, filename)
+
+
+def _read_shard(filename: Path, shard_format: str) -> dict:
+    if shard_format == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(filename)
+        return {
+            "median": table.column("median").to_numpy(),
+            "dispersion": table.column("dispersion").to_numpy(),
+        }
+
+    with np.load(filename) as data:
+        return {"median": data["median"], "dispersion": data["dispersion"]}
+
+
+def run_worker(
+    queue_dir: Path,
+    engine: str = "xgboost",
+    max_tasks: int = None,
+    wait: float = 30.0,
+    heartbeat: float = 30.0,
+) -> int:
+    """Claims and predicts chunks until the queue is empty
+
+    Parameters
+    ----------
+    queue_dir : Path
+        Queue directory
+    engine : str, optional
+        Prediction engine, see XGBPredict, by default "xgboost"
+    max_tasks : int, optional
+        Stop after this number of chunks, by default None (no limit)
+    wait : float, optional
+        Seconds to wait for the coordinator to create the queue, by
+        default 30
+    heartbeat : float, optional
+        Seconds between refreshes of the claim of the chunk being
+        predicted, to be well below the timeout of requeue_stale, by
+        default 30
+
+    Returns
+    ----------
+    int
+        Number of chunks predicted by this worker
+    """
+    queue_dir = Path(queue_dir)
+
+    deadline = time.monotonic() + wait
+    while not (queue_dir / "queue.json").is_file():
+        if time.monotonic() > deadline:
+            raise FileNotFoundError(f"No queue found in {queue_dir}")
+        time.sleep(0.1)
+
+    manifest = _read_manifest(queue_dir)
+    shard_format = manifest["shard_format"]
+    inputs = {
+        name: np.load(queue_dir / "inputs" / f"{name}.npy", mmap_mode="r")
+        for name in manifest["inputs"]}
+
+    predictors = {}
+    predicted = 0
+    while max_tasks is None or predicted < max_tasks:
+        claimed, task = _claim(queue_dir)
+        if claimed is None:
+            break
+
+        name = claimed.stem
+        shard = _shard_file(queue_dir, name, shard_format)
+
+        # A previous worker may have written the shard before stopping
+        if not shard.is_file():
+            model = tuple(task["model"])
+            if model not in predictors:
+                predictors[model] = XGBPredict(*model, engine=engine)
+
+            rows = slice(task["start"], task["stop"])
+            with _Heartbeat(claimed, heartbeat):
+                prediction = predictors[model].predict_batch(**{
+                    key: np.asarray(value[rows])
+                    for key, value in inputs.items()})
+
+                _write_shard(shard, prediction, shard_format)
+            predicted += 1
+
+        try:
+            os.replace(claimed, queue_dir / "done" / claimed.name)
+        except FileNotFoundError:
+            # Requeued meanwhile and completed by another worker, whose
+            # shard is identical
+            pass
+
+    return predicted
+
+
+def requeue_stale(queue_dir: Path, timeout: float = 600.0) -> int:
+    """Returns chunks claimed longer ago than timeout to the queue
+
+    Parameters
+    ----------
+    queue_dir : Path
+        Queue directory
+    timeout : float, optional
+        Seconds after which a claim that was not refreshed is considered
+        abandoned, well above the heartbeat of the workers, by default 600
+
+    Returns
+    ----------
+    int
+        Number of requeued chunks
+    """
+    queue_dir = Path(queue_dir)
+    now = time.time()
+
+    requeued = 0
+    for filename in (queue_dir / "claimed").glob("*.json"):
+        try:
+            if now - filename.stat().st_mtime < timeout:
+                continue
+            os.rename(filename, queue_dir / "pending" / filename.name)
+        except FileNotFoundError:
+            continue
+        requeued += 1
+
+    return requeued
+
+
+def status(queue_dir: Path) -> dict:
+    """Number of pending, claimed and done chunks"""
+    queue_dir = Path(queue_dir)
+    return {
+        state: len(list((queue_dir / state).glob("*.json")))
+        for state in STATES}
+
+
+def merge_results(queue_dir: Path) -> dict:
+    """Reassembles the shards in input order
+
+    Parameters
+    ----------
+    queue_dir : Path
+        Queue directory
+
+    Returns
+    ----------
+    dict
+        {
+            (im_type, collapse): {
+                median: np.ndarray,
+                dispersion: np.ndarray
+            }
+        }, as campaign.run_campaign
+
+    Raises
+    ------
+    RuntimeError
+        When chunks are not done yet
+    """
+    queue_dir = Path(queue_dir)
+    manifest = _read_manifest(queue_dir)
+    n_rows = manifest["n_rows"]
+    chunk_size = manifest["chunk_size"]
+
+    results = {}
+    missing = []
+    for im_type, collapse in manifest["models"]:
+        model = (im_type, bool(collapse))
+        result = results[model] = {
+            "median": np.empty(n_rows),
+            "dispersion": np.empty(n_rows),
+        }
+
+        for index, start in enumerate(range(0, n_rows, chunk_size)):
+            shard = _shard_file(
+                queue_dir, _task_name(model, index),
+                manifest["shard_format"])
+            if not shard.is_file():
+                missing.append(shard.stem)
+                continue
+
+            prediction = _read_shard(shard, manifest["shard_format"])
+            rows = slice(start, start + chunk_size)
+            result["median"][rows] = prediction["median"]
+            result["dispersion"][rows] = prediction["dispersion"]
+
+    if missing:
+        raise RuntimeError(
+            f"{len(missing)} chunks are not done yet, e.g. {missing[0]}")
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m xgbrhomut.distributed",
+        description="Workers and maintenance of file-based work queues")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    worker = subparsers.add_parser("worker", help="predict queued chunks")
+    worker.add_argument("queue_dir", type=Path)
+    worker.add_argument(
+        "--engine", choices=XGBPredict.engines, default="xgboost")
+    worker.add_argument("--max-tasks", type=int, default=None)
+
+    requeue = subparsers.add_parser(
+        "requeue", help="return abandoned chunks to the queue")
+    requeue.add_argument("queue_dir", type=Path)
+    requeue.add_argument("--timeout", type=float, default=600.0)
+
+    state = subparsers.add_parser("status", help="count chunks per state")
+    state.add_argument("queue_dir", type=Path)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        n_tasks = run_worker(args.queue_dir, args.engine, args.max_tasks)
+        print(f"{socket.gethostname()}:{os.getpid()} predicted {n_tasks} "
+              "chunks", file=sys.stderr)
+    elif args.command == "requeue":
+        print(f"Requeued {requeue_stale(args.queue_dir, args.timeout)} "
+              "chunks", file=sys.stderr)
+    else:
+        print(json.dumps(status(args.queue_dir)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Fragility functions and mean annual frequencies of portfolios of systems
+
+Strength ratios are converted to intensity measures through the yield
+spectral acceleration of each system, IM = strength_ratio * Sa_y, giving
+lognormal fragility functions
+
+    P(D >= d | im) = Phi(ln(im / theta_d) / beta_d)
+
+for collapse (R or rho_3 collapse models) and for the exceedance of
+dynamic ductility levels (R or rho_2 non-collapse models). These are
+integrated with a tabulated hazard curve, lambda(IM > im):
+
+    lambda_d = sum_i P(D >= d | im_i) * (lambda_i - lambda_i+1)
+
+with the fragility evaluated at the geometric mid-points of the hazard
+intervals, plus the probability at the last point times its rate.
+
+Note that rho_2 and rho_3 use average spectral accelerations over
+different period ranges, so, for im_type "sa_avg", a separate hazard curve
+can be passed for collapse. Collapse can then not be folded into the
+ductility exceedances, which condition on a single intensity measure.
+"""
+import numpy as np
+
+from .XGBPredict import XGBPredict
+
+
+def _normal_cdf(x):
+    from scipy.special import ndtr
+    return ndtr(x)
+
+
+def lognormal_cdf(im, median, dispersion) -> np.ndarray:
+    """Lognormal fragility function
+
+    Parameters
+    ----------
+    im : array_like
+        Intensity measure levels
+    median : array_like
+        Medians of the fragility functions, broadcast against im
+    dispersion : array_like
+        Lognormal dispersions, a step function at the median when 0
+
+    Returns
+    ----------
+    np.ndarray
+        Probabilities of exceedance
+    """
+    im, median, dispersion = np.broadcast_arrays(*(
+        np.asarray(value, dtype=float) for value in (im, median, dispersion)))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.log(im / median) / dispersion
+
+    step = dispersion <= 0
+    z = np.where(step, np.where(im >= median, np.inf, -np.inf), z)
+
+    return _normal_cdf(z)
+
+
+def _hazard_intervals(im, rate):
+    im = np.asarray(im, dtype=float)
+    rate = np.asarray(rate, dtype=float)
+    if im.ndim != 1 or im.shape != rate.shape or im.size < 2:
+        raise ValueError(
+            "Hazard curve must be two 1-D arrays of equal length >= 2")
+    if np.any(np.diff(im) <= 0) or np.any(np.diff(rate) > 0):
+        raise ValueError(
+            "Hazard intensities must increase and rates must not increase")
+
+    # Geometric mid-points of the intervals and the last point
+    points = np.append(np.sqrt(im[:-1] * im[1:]), im[-1])
+    weights = np.append(rate[:-1] - rate[1:], rate[-1])
+    return points, weights
+
+
+def mean_annual_frequency(im, rate, median, dispersion,
+                          chunk_size: int = 4096) -> np.ndarray:
+    """Mean annual frequencies of exceedance of lognormal fragilities
+
+    Parameters
+    ----------
+    im : array_like
+        Intensity measure levels of the hazard curve, increasing
+    rate : array_like
+        Annual rates of exceedance of the levels
+    median : array_like
+        Medians of the fragility functions, any shape
+    dispersion : array_like
+        Lognormal dispersions, broadcast against median
+    chunk_size : int, optional
+        Fragilities integrated at once, by default 4096
+
+    Returns
+    ----------
+    np.ndarray
+        Mean annual frequencies, broadcast shape of median and dispersion
+    """
+    points, weights = _hazard_intervals(im, rate)
+
+    median, dispersion = np.broadcast_arrays(
+        np.asarray(median, dtype=float), np.asarray(dispersion, dtype=float))
+    shape = median.shape
+    median = median.reshape(-1, 1)
+    dispersion = dispersion.reshape(-1, 1)
+
+    frequency = np.empty(median.shape[0])
+    for start in range(0, median.shape[0], chunk_size):
+        rows = slice(start, start + chunk_size)
+        frequency[rows] = lognormal_cdf(
+            points, median[rows], dispersion[rows]) @ weights
+
+    return frequency.reshape(shape)
+
+
+def portfolio_risk(
+    period,
+    damping,
+    hardening_ratio,
+    ductility,
+    sa_yield,
+    hazard_im,
+    hazard_rate,
+    im_type: str = "sa",
+    ductility_levels=None,
+    collapse_hazard: tuple = None,
+    include_collapse: bool = True,
+    chunk_size: int = 4096,
+) -> dict:
+    """Mean annual frequencies of collapse and of exceeding dynamic
+    ductility levels for a portfolio of systems
+
+    Parameters
+    ----------
+    period, damping, hardening_ratio, ductility : array_like
+        Systems, broadcast against each other, shape S
+    sa_yield : array_like
+        Yield spectral acceleration of each system, broadcast to S, in the
+        units of the hazard curve
+    hazard_im : array_like
+        Intensity measure levels of the hazard curve, Sa(T) for im_type
+        "sa" or Sa_avg for "sa_avg", increasing
+    hazard_rate : array_like
+        Annual rates of exceedance of hazard_im
+    im_type : str, optional
+        "sa" for R, "sa_avg" for rho2 and rho3, by default "sa"
+    ductility_levels : array_like, optional
+        Dynamic ductility levels, by default None (collapse only)
+    collapse_hazard : tuple, optional
+        (im, rate) of the hazard curve used for collapse, by default the
+        hazard curve above
+    include_collapse : bool, optional
+        Count collapse as exceeding every ductility level (total
+        probability theorem), the collapse fragility being evaluated at
+        the intensities of hazard_im, so it requires collapse_hazard to
+        be the hazard curve above, by default True
+    chunk_size : int, optional
+        Systems integrated at once, by default 4096
+
+    Returns
+    ----------
+    dict
+        {
+            collapse: np.ndarray, shape S, mean annual frequency of
+                collapse,
+            exceedance: np.ndarray, shape S + (n_levels,), mean annual
+                frequencies of exceeding the ductility levels,
+            ductility_levels: np.ndarray,
+            collapse_median: np.ndarray, shape S, median collapse
+                intensity,
+            collapse_dispersion: np.ndarray, shape S
+        }
+
+    Raises
+    ------
+    ValueError
+        When collapse is included in the ductility exceedances while
+        collapse_hazard differs from the hazard curve
+    """
+    arrays = np.broadcast_arrays(*(
+        np.asarray(value, dtype=float) for value in (
+            period, damping, hardening_ratio, ductility, sa_yield)))
+    shape = arrays[0].shape
+    period, damping, hardening_ratio, ductility, sa_yield = (
+        array.reshape(-1) for array in arrays)
+
+    if ductility_levels is None:
+        ductility_levels = np.empty(0)
+    ductility_levels = np.asarray(ductility_levels, dtype=float).reshape(-1)
+    n_levels = ductility_levels.size
+
+    if collapse_hazard is None:
+        collapse_hazard = (hazard_im, hazard_rate)
+    elif include_collapse and n_levels and not (
+            np.array_equal(collapse_hazard[0], hazard_im)
+            and np.array_equal(collapse_hazard[1], hazard_rate)):
+        # P(C | im) and P(D >= d | NC, im) must condition on the same IM
+        raise ValueError(
+            "Collapse cannot be included in the ductility exceedances when "
+            "collapse_hazard differs from the hazard curve, e.g. for the "
+            "different Sa_avg of rho_2 and rho_3, pass "
+            "include_collapse=False and combine the frequencies instead")
+
+    collapse = XGBPredict(im_type, True).predict_batch(
+        period, damping, hardening_ratio, ductility)
+    collapse_median = collapse["median"] * sa_yield
+    collapse_dispersion = collapse["dispersion"]
+
+    collapse_frequency = mean_annual_frequency(
+        *collapse_hazard, collapse_median, collapse_dispersion, chunk_size)
+
+    exceedance = np.zeros((period.size, n_levels))
+    if n_levels:
+        points, weights = _hazard_intervals(hazard_im, hazard_rate)
+        model = XGBPredict(im_type, False)
+
+        for start in range(0, period.size, max(1, chunk_size // n_levels)):
+            rows = slice(start, start + max(1, chunk_size // n_levels))
+            prediction = model.predict_batch(
+                period[rows, None], damping[rows, None],
+                hardening_ratio[rows, None], ductility[rows, None],
+                ductility_levels)
+
+            # Shape (systems, levels, hazard points)
+            probability = lognormal_cdf(
+                points, (prediction["median"] * sa_yield[rows, None])[
+                    ..., None], prediction["dispersion"][..., None])
+
+            if include_collapse:
+                probability_collapse = lognormal_cdf(
+                    points, collapse_median[rows, None],
+                    collapse_dispersion[rows, None])[:, None, :]
+                probability = probability_collapse + (
+                    1 - probability_collapse) * probability
+
+            exceedance[rows] = probability @ weights
+
+    return {
+        "collapse": collapse_frequency.reshape(shape),
+        "exceedance": exceedance.reshape(shape + (n_levels,)),
+        "ductility_levels": ductility_levels,
+        "collapse_median": collapse_median.reshape(shape),
+        "collapse_dispersion": collapse_dispersion.reshape(shape),
+    }
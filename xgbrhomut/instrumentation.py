@@ -0,0 +1,113 @@
+"""
+Per-stage timers of the prediction path
+
+An Instrumentation passed to XGBPredict accumulates, for every stage of a
+prediction (model loading, input checks, scaling, DMatrix construction,
+booster predict, dispersion lookup, ...), the number of calls, the number
+of rows and the cumulative wall time:
+
+    instrumentation = Instrumentation()
+    model = XGBPredict("sa", False, instrumentation=instrumentation)
+    model.predict_batch(...)
+    instrumentation.as_dict()
+
+Without instrumentation, the stages cost a single attribute check.
+"""
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable
+
+
+# Reusable context of disabled stages
+NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("instrumentation", "name", "rows", "start")
+
+    def __init__(self, instrumentation, name, rows) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.instrumentation.record(
+            self.name, time.perf_counter() - self.start, self.rows)
+
+
+class Instrumentation:
+    def __init__(self, callback: Callable = None) -> None:
+        """
+        Counters and timers of prediction stages
+
+        Parameters
+        ----------
+        callback : Callable, optional
+            Called as callback(stage, seconds, rows) after each stage, by
+            default None
+        """
+        self.callback = callback
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str, rows: int = 0) -> _Stage:
+        """Context manager timing a stage
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage
+        rows : int, optional
+            Number of rows processed by the stage, by default 0
+        """
+        return _Stage(self, name, rows)
+
+    def record(self, name: str, seconds: float, rows: int = 0) -> None:
+        """Adds a call of a stage"""
+        with self._lock:
+            counters = self._stages.get(name)
+            if counters is None:
+                counters = self._stages[name] = [0, 0, 0.0]
+            counters[0] += 1
+            counters[1] += int(rows)
+            counters[2] += seconds
+
+        if self.callback is not None:
+            self.callback(name, seconds, rows)
+
+    def reset(self) -> None:
+        """Clears all counters"""
+        with self._lock:
+            self._stages.clear()
+
+    def as_dict(self) -> dict:
+        """Counters of every stage
+
+        Returns
+        ----------
+        dict
+            {
+                stage: {
+                    calls: int,
+                    rows: int,
+                    seconds: float
+                }
+            }
+        """
+        with self._lock:
+            return {
+                name: {"calls": calls, "rows": rows, "seconds": seconds}
+                for name, (calls, rows, seconds) in self._stages.items()
+            }
+
+
+def stage(instrumentation: Instrumentation, name: str, rows: int = 0):
+    """Stage of an optional instrumentation, a no-op when it is None"""
+    if instrumentation is None:
+        return NULL_STAGE
+    return instrumentation.stage(name, rows)
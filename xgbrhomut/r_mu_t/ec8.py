@@ -1,3 +1,8 @@
+import numpy as np
+
+from .utils import as_output
+
+
 def strength_ratio(mu: float, period: float, period_c: float) -> float:
     """This implements the R-mu-T relationship provided in Annex B of
     Eurocode 8 Part 1
@@ -10,21 +15,22 @@ def strength_ratio(mu: float, period: float, period_c: float) -> float:
 
     Parameters
     -------
-    mu : float
+    mu : float or array_like
         Ductility
-    period : float
+    period : float or array_like
         Period
     period_c : float
         Corner period
 
     Returns
     -------
-    float
-        Strength ratio
+    float or np.ndarray
+        Strength ratio, an array when mu or period are arrays
     """
-    if period < period_c:
-        strength_ratio = (mu - 1) * (period / period_c) + 1
-    else:
-        strength_ratio = mu
+    mu = np.asarray(mu, dtype=float)
+    period = np.asarray(period, dtype=float)
+
+    strength_ratio = np.where(
+        period < period_c, (mu - 1) * (period / period_c) + 1, mu)
 
-    return strength_ratio
+    return as_output(strength_ratio)
@@ -1,3 +1,52 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .utils import as_output
+
+
+# Hysteretic parameters (ahyst, period_hyst) of Table II in article
+CASES = {
+    "fd": (0.7, 0.055),
+    "in": (0.2, 0.030),
+    "sd": (0.0, 0.022),
+}
+
+b = 2.3
+c = 2.1
+
+
+class SolverReport(NamedTuple):
+    """Convergence of the strength ratio solver"""
+    converged: np.ndarray
+    iterations: int
+    residual: np.ndarray
+
+
+def _hysteresis(case):
+    case = np.char.lower(np.asarray(case, dtype=str))
+    if not np.all(np.isin(case, list(CASES))):
+        raise ValueError(
+            "Case must be 'fd', 'in', 'sd', for details refer"
+            "to https://doi.org/10.1002/eqe.2862")
+
+    ahyst = np.select(
+        [case == key for key in CASES],
+        [value[0] for value in CASES.values()])
+    period_hyst = np.select(
+        [case == key for key in CASES],
+        [value[1] for value in CASES.values()])
+
+    return ahyst, period_hyst
+
+
+def _coefficient(period, case, period_c):
+    # Ductility demand is R + (R - 1)^c / coefficient
+    ahyst, period_hyst = _hysteresis(case)
+    period = np.asarray(period, dtype=float)
+    return (period / period_hyst + ahyst) * np.power(period / period_c, b)
+
+
 def ductility(strength_ratio: float, mu: float, period: float,
               case: str, period_c: float) -> float:
     """This implements the R-mu-T relationship proposed by Guerrini et al 2017
@@ -12,9 +61,11 @@ def ductility(strength_ratio: float, mu: float, period: float,
 
     Parameters
     -------
-    strength_ratio : float
+    strength_ratio : float or array_like
         Strength ratio
-    period : float
+    mu : float or array_like
+        Ductility
+    period : float or array_like
         Period
     case : str
         See Table II in article, (options: FD, IN, SD)
@@ -23,30 +74,140 @@ def ductility(strength_ratio: float, mu: float, period: float,
 
     Returns
     -------
-    float
-        Ductility demand
+    float or np.ndarray
+        Absolute difference between mu and the ductility demand of the
+        strength ratio, an array when any input is an array
 
     Raises
     ------
         ValueError if case is not 'fd', 'in', 'sd'
     """
-    if case.lower() == "fd":
-        ahyst = 0.7
-        period_hyst = 0.055
-    elif case.lower() == "in":
-        ahyst = 0.2
-        period_hyst = 0.030
-    elif case.lower() == "sd":
-        ahyst = 0.0
-        period_hyst = 0.022
-    else:
-        raise ValueError(
-            "Case must be 'fd', 'in', 'sd', for details refer"
-            "to https://doi.org/10.1002/eqe.2862")
+    coefficient = _coefficient(period, case, period_c)
+
+    strength_ratio = np.asarray(strength_ratio, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+
+    base = strength_ratio - 1
+    if np.any(base < 0):
+        # Keep the complex result of pow for strength ratios below 1
+        base = base.astype(complex)
+
+    return as_output(np.abs(
+        mu - (strength_ratio + np.power(base, c) / coefficient)))
+
+
+def ductility_demand(strength_ratio, period, case, period_c: float):
+    """Ductility demand of a strength ratio, Guerrini et al 2017
+
+    Parameters
+    -------
+    strength_ratio : float or array_like
+        Strength ratio, systems with strength ratios below 1 remain
+        elastic
+    period : float or array_like
+        Period
+    case : str or array_like
+        See Table II in article, (options: FD, IN, SD)
+    period_c : float
+        Corner period
+
+    Returns
+    -------
+    float or np.ndarray
+        Ductility demand, an array when any input is an array
+
+    Raises
+    ------
+        ValueError if case is not 'fd', 'in', 'sd'
+    """
+    coefficient = _coefficient(period, case, period_c)
+    strength_ratio = np.asarray(strength_ratio, dtype=float)
+
+    inelastic = np.power(np.maximum(strength_ratio - 1, 0), c) / coefficient
+    mu = np.where(strength_ratio > 1, strength_ratio + inelastic,
+                  strength_ratio)
+
+    return as_output(mu)
+
+
+def strength_ratio(mu, period, case, period_c: float, tol: float = 1e-10,
+                   max_iter: int = 50, full_output: bool = False):
+    """Strength ratio of a ductility demand, inverting the relationship of
+    Guerrini et al 2017 for all inputs at once
+
+    The demand grows monotonically and convexly with the strength ratio,
+    so Newton iterations started from the upper bound (R = mu) converge
+    from above. Steps leaving the bracket [1, mu] fall back to bisection.
+
+    Parameters
+    -------
+    mu : float or array_like
+        Ductility demand, systems with ductilities below 1 are elastic
+    period : float or array_like
+        Period
+    case : str or array_like
+        See Table II in article, (options: FD, IN, SD)
+    period_c : float
+        Corner period
+    tol : float, optional
+        Tolerance on the ductility residual, by default 1e-10
+    max_iter : int, optional
+        Maximum number of iterations, by default 50
+    full_output : bool, optional
+        Also return the convergence report, by default False
+
+    Returns
+    -------
+    float or np.ndarray
+        Strength ratio, an array when any input is an array
+    SolverReport
+        Convergence flags, number of iterations and ductility residuals,
+        only if full_output is True
+
+    Raises
+    ------
+        ValueError if case is not 'fd', 'in', 'sd'
+    """
+    coefficient = _coefficient(period, case, period_c)
+    mu, coefficient = np.broadcast_arrays(
+        np.asarray(mu, dtype=float), coefficient)
+
+    lower = np.ones(mu.shape)
+    upper = np.maximum(mu, 1.0)
+    ratio = upper.copy()
+
+    def residual(ratio):
+        base = np.maximum(ratio - 1, 0)
+        return ratio + np.power(base, c) / coefficient - mu
+
+    elastic = mu <= 1
+    error = residual(ratio)
+    converged = (np.abs(error) <= tol) | elastic
+    iterations = 0
+    while iterations < max_iter and not np.all(converged | np.isnan(error)):
+        iterations += 1
+
+        # Keep the root bracketed
+        above = error > 0
+        upper = np.where(above, ratio, upper)
+        lower = np.where(above, lower, ratio)
+
+        base = np.maximum(ratio - 1, 0)
+        slope = 1 + c * np.power(base, c - 1) / coefficient
+        step = ratio - error / slope
+
+        outside = ~((step > lower) & (step < upper))
+        step = np.where(outside, (lower + upper) / 2, step)
+
+        ratio = np.where(converged, ratio, step)
+        error = residual(ratio)
+        converged = (np.abs(error) <= tol) | elastic
+
+    ratio = np.where(elastic, mu, ratio)
+    error = np.where(elastic, 0.0, error)
 
-    b = 2.3
-    c = 2.1
+    if full_output:
+        return as_output(ratio), SolverReport(
+            converged, iterations, np.abs(error))
 
-    return abs(mu - (strength_ratio + pow(strength_ratio - 1, c) /
-                     ((period / period_hyst + ahyst) *
-                      pow(period / period_c, b))))
+    return as_output(ratio)
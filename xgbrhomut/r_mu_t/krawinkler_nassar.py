@@ -1,3 +1,8 @@
+import numpy as np
+
+from .utils import as_output
+
+
 def strength_ratio(mu: float, period: float, ah: float):
     """This implements the R-mu-T relationship proposed by
     Krawinkler and Nassar (1992)
@@ -12,17 +17,17 @@ def strength_ratio(mu: float, period: float, ah: float):
 
     Parameters
     -------
-    mu : float
+    mu : float or array_like
         Ductility demand
-    period : float
+    period : float or array_like
         Period
     ah : float
         Hardening ratio (options: 0, 2, 10 in %)
 
     Returns
     -------
-    float
-        Strength ratio
+    float or np.ndarray
+        Strength ratio, an array when mu or period are arrays
 
     Raises
     ------
@@ -42,8 +47,11 @@ def strength_ratio(mu: float, period: float, ah: float):
     else:
         raise ValueError("Wrong hardening ratio")
 
-    c = pow(period, a) / (1 + pow(period, a)) + b / period
+    mu = np.asarray(mu, dtype=float)
+    period = np.asarray(period, dtype=float)
+
+    c = np.power(period, a) / (1 + np.power(period, a)) + b / period
 
-    strength_ratio = pow(c * (mu - 1) + 1, 1 / c)
+    strength_ratio = np.power(c * (mu - 1) + 1, 1 / c)
 
-    return strength_ratio
+    return as_output(strength_ratio)
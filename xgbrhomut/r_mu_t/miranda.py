@@ -1,5 +1,7 @@
 import numpy as np
 
+from .utils import as_output
+
 
 def strength_ratio(mu: float, period: float, site: str,
                    period_g: float) -> float:
@@ -12,9 +14,9 @@ def strength_ratio(mu: float, period: float, site: str,
 
     Parameters
     ------
-    mu : float
+    mu : float or array_like
         Ductility demand
-    period : float
+    period : float or array_like
         Period
     site : str
         Site type (options: "rock", "soft-soil" or "alluvium")
@@ -23,9 +25,11 @@ def strength_ratio(mu: float, period: float, site: str,
 
     Returns
     ------
-    float
-        Strength ratio
+    float or np.ndarray
+        Strength ratio, an array when mu or period are arrays
     """
+    mu = np.asarray(mu, dtype=float)
+    period = np.asarray(period, dtype=float)
 
     if site.lower() == "rock":
         phi = 1 + 1 / (10 * period - mu * period) - 1 / (2 * period) * \
@@ -41,7 +45,6 @@ def strength_ratio(mu: float, period: float, site: str,
 
     strength_ratio = (mu - 1) / phi + 1
 
-    if strength_ratio < 1:
-        strength_ratio = 1
+    strength_ratio = np.where(strength_ratio < 1, 1, strength_ratio)
 
-    return strength_ratio
+    return as_output(strength_ratio)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from .utils import as_output
+
 
 def strength_ratio(mu: float, period: float,
                    period_cc: float, period_c: float) -> float:
@@ -14,9 +16,9 @@ def strength_ratio(mu: float, period: float,
 
     Parameters
     ------
-    mu : float
+    mu : float or array_like
         Ductility demand
-    period : float
+    period : float or array_like
         Period
     period_cc : float
         Corner period (called Tc' in article)
@@ -25,25 +27,35 @@ def strength_ratio(mu: float, period: float,
 
     Returns
     ------
-    float
-        Strength ratio
+    float or np.ndarray
+        Strength ratio, an array when mu or period are arrays
     """
+    mu = np.asarray(mu, dtype=float)
+    period = np.asarray(period, dtype=float)
 
     # Set the period values based on Newmark and Hall's spectrum
     period_a = 1. / 33
     period_b = 0.125
 
-    beta = np.log(period / period_a) / np.log(period_b / period_a)
-
-    if period < period_a:
-        strength_ratio = 1
-    elif period <= period_b:
-        strength_ratio = pow(2 * mu - 1, 0.5 * beta)
-    elif period <= period_cc:
-        strength_ratio = pow(2 * mu - 1, 0.5)
-    elif period <= period_c:
-        strength_ratio = (period / period_c) * mu
-    elif period >= period_c:
-        strength_ratio = mu
-
-    return strength_ratio
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.log(period / period_a) / np.log(period_b / period_a)
+
+        strength_ratio = np.select(
+            [
+                period < period_a,
+                period <= period_b,
+                period <= period_cc,
+                period <= period_c,
+                period >= period_c,
+            ],
+            [
+                1,
+                np.power(2 * mu - 1, 0.5 * beta),
+                np.power(2 * mu - 1, 0.5),
+                (period / period_c) * mu,
+                mu,
+            ],
+            default=np.nan,
+        )
+
+    return as_output(strength_ratio)
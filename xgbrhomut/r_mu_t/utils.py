@@ -0,0 +1,9 @@
+import numpy as np
+
+
+def as_output(value):
+    """Returns a float for scalar results, and the array otherwise"""
+    value = np.asarray(value)
+    if value.ndim == 0:
+        return float(value)
+    return value
@@ -1,3 +1,8 @@
+import numpy as np
+
+from .utils import as_output
+
+
 def strength_ratio(mu: float, period: float, period_c: float) -> float:
     """This implements the R-mu-T relationship proposed by Vidic et al. (1994)
 
@@ -9,18 +14,20 @@ def strength_ratio(mu: float, period: float, period_c: float) -> float:
 
     Parameters
     ------
-    mu : float
+    mu : float or array_like
         Ductility demand
-    period : float
+    period : float or array_like
             Period
     period_c : float
         Corner period (called T1 in article)
 
     Returns
     ------
-    float
-        Strength ratio
+    float or np.ndarray
+        Strength ratio, an array when mu or period are arrays
     """
+    mu = np.asarray(mu, dtype=float)
+    period = np.asarray(period, dtype=float)
 
     # Set the empirical coeffienets
     # Choose values for "bilinear, instantaneous stiffness" (4th row)
@@ -30,11 +37,12 @@ def strength_ratio(mu: float, period: float, period_c: float) -> float:
     c2 = 0.75
     ct = 0.2
 
-    period_0 = c2 * pow(mu, ct) * period_c
+    period_0 = c2 * np.power(mu, ct) * period_c
 
-    if period < period_0:
-        strength_ratio = c1 * pow(mu - 1, cr) * (period / period_0) + 1
-    else:
-        strength_ratio = c1 * pow(mu - 1, cr) + 1
+    with np.errstate(invalid="ignore"):
+        strength_ratio = np.where(
+            period < period_0,
+            c1 * np.power(mu - 1, cr) * (period / period_0) + 1,
+            c1 * np.power(mu - 1, cr) + 1)
 
-    return strength_ratio
+    return as_output(strength_ratio)
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import threading
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from .dispersions import DispersionSurrogate, DispersionTable
+from .instrumentation import Instrumentation, stage
+from .scaler import ArrayScaler
+from .trees import TreeEnsemble
+
+
+path = Path(__file__).parent.resolve()
+
+# (parameter, collapse) combinations with a shipped model
+MODEL_KEYS = (
+    ("R", False),
+    ("R", True),
+    ("ro_2", False),
+    ("ro_3", True),
+)
+
+# Model features, in the order expected by the scalers and boosters
+FEATURES = (
+    "period",
+    "damping",
+    "hardening_ratio",
+    "ductility",
+    "actual_ductility_end",
+)
+
+
+def feature_names(collapse: bool) -> tuple:
+    """Features of collapse or non-collapse models, dynamic ductility is
+    only used for non-collapse predictions"""
+    return FEATURES[:4] if collapse else FEATURES
+
+
+def package_version() -> str:
+    """Installed version of the package, None when it is not installed"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("xgb-rhomut")
+    except PackageNotFoundError:
+        return None
+
+
+def source_files(models_dir: Path, parameter: str, collapse: bool) -> tuple:
+    """Booster, scaler and dispersion files of a shipped model"""
+    method = "_collapse" if collapse else ""
+    name = f"{parameter}_xgb{method}"
+    models_dir = Path(models_dir)
+    return (
+        models_dir / f"{name}.sav",
+        models_dir / f"{name}_scaler.sav",
+        models_dir / f"{name}_dispersions.json",
+    )
+
+
+def source_hash(models_dir: Path, parameter: str, collapse: bool) -> str:
+    """SHA-256 of the source artifacts of a model, identifying the model
+    independently of where and how it is loaded"""
+    digest = hashlib.sha256()
+    for filename in source_files(models_dir, parameter, collapse):
+        digest.update(filename.name.encode())
+        digest.update(filename.read_bytes())
+    return digest.hexdigest()
+
+
+class ModelEntry:
+    def __init__(
+        self,
+        parameter: str,
+        collapse: bool,
+        scaler: ArrayScaler,
+        dispersions: DispersionTable,
+        model: Any = None,
+        model_file: Path = None,
+        trees: TreeEnsemble = None,
+        surrogate: DispersionSurrogate = None,
+    ) -> None:
+        """
+        Loaded artifacts of a single XGB model
+
+        The booster and its NumPy tree ensemble are materialized on first
+        access, so that only the artifacts of the selected engine are
+        loaded
+
+        Parameters
+        ----------
+        parameter : str
+            R, ro_2 or ro_3
+        collapse : bool
+            True for collapse models
+        scaler : ArrayScaler
+            Scaler of the model features
+        dispersions : DispersionTable
+            Dispersions of the model
+        model : xgb.Booster, optional
+            Loaded booster, by default None
+        model_file : Path, optional
+            Booster file in native XGBoost format, read when the booster
+            is first needed, by default None
+        trees : TreeEnsemble, optional
+            Trees of the booster, by default extracted from the booster
+        surrogate : DispersionSurrogate, optional
+            Continuous dispersions, by default built from the dispersion
+            table
+        """
+        self.parameter = parameter
+        self.collapse = collapse
+        self.scaler = scaler
+        self.dispersions = dispersions
+        self.model_file = model_file
+        self._model = model
+        self._trees = trees
+        self._surrogate = surrogate
+
+    @property
+    def model(self):
+        """XGBoost booster"""
+        if self._model is None:
+            import xgboost as xgb
+            self._model = xgb.Booster(model_file=str(self.model_file))
+        return self._model
+
+    @property
+    def trees(self) -> TreeEnsemble:
+        """Trees of the booster for the NumPy engine"""
+        if self._trees is None:
+            self._trees = TreeEnsemble.from_booster(self.model)
+        return self._trees
+
+    @property
+    def surrogate(self) -> DispersionSurrogate:
+        """Continuous dispersions of the model"""
+        if self._surrogate is None:
+            self._surrogate = DispersionSurrogate.from_table(
+                self.dispersions)
+        return self._surrogate
+
+
+class ModelRegistry:
+    def __init__(self, models_dir: Path = None, bundle_dir: Path = None,
+                 use_bundle: bool = True) -> None:
+        """
+        Process-wide cache of the XGB models, scalers and dispersions
+
+        Each model is read from disk once and then shared by every
+        XGBPredict instance. Access is thread-safe.
+
+        Parameters
+        ----------
+        models_dir : Path, optional
+            Directory containing the model artifacts, by default the
+            models shipped with the package
+        bundle_dir : Path, optional
+            Directory of the binary model bundle, see xgbrhomut.bundle,
+            by default models/bundle of the package
+        use_bundle : bool, optional
+            Load models from the bundle when present, by default True
+        """
+        if models_dir is None:
+            models_dir = path / "models"
+        if bundle_dir is None:
+            bundle_dir = path / "models" / "bundle"
+
+        self.models_dir = Path(models_dir)
+        self.bundle_dir = Path(bundle_dir)
+        self.use_bundle = use_bundle
+        self._entries: Dict[Tuple[str, bool], ModelEntry] = {}
+        self._hashes: Dict[Tuple[str, bool], str] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, parameter: str, collapse: bool,
+              instrumentation: Instrumentation = None) -> ModelEntry:
+        from .bundle import bundle_matches, has_bundle, load_bundle
+
+        bundled = self.use_bundle and has_bundle(
+            self.bundle_dir, parameter, collapse)
+        if bundled and not bundle_matches(
+                self.bundle_dir, self.models_dir, parameter, collapse):
+            # A bundle left behind by an upgrade must not shadow the new
+            # models
+            warnings.warn(
+                f"Bundle {self.bundle_dir} was exported from other models "
+                f"than {self.models_dir}, loading {parameter} from the "
+                "source models instead, rebuild it with "
+                "python -m xgbrhomut.bundle")
+            bundled = False
+
+        if bundled:
+            with stage(instrumentation, "load_bundle"):
+                entry = load_bundle(self.bundle_dir, parameter, collapse)
+        else:
+            import joblib
+
+            booster, scaler, dispersions = source_files(
+                self.models_dir, parameter, collapse)
+
+            with stage(instrumentation, "load_booster"):
+                model = joblib.load(booster)
+            with stage(instrumentation, "load_scaler"):
+                scaler = ArrayScaler.from_sklearn(joblib.load(scaler))
+            with stage(instrumentation, "parse_dispersions"):
+                with open(dispersions) as f:
+                    dispersions = DispersionTable.from_dict(json.load(f))
+
+            entry = ModelEntry(
+                parameter, collapse, scaler, dispersions, model)
+
+        # Feature order is checked once here instead of on every call
+        entry.scaler.validate(feature_names(collapse))
+
+        return entry
+
+    def get(self, parameter: str, collapse: bool,
+            instrumentation: Instrumentation = None) -> ModelEntry:
+        """Gets a model, loading it on first access
+
+        Parameters
+        ----------
+        parameter : str
+            R, ro_2 or ro_3
+        collapse : bool
+            True for collapse models
+        instrumentation : Instrumentation, optional
+            Receives the timings of the loading stages, by default None
+
+        Returns
+        ----------
+        ModelEntry
+            Loaded model, scaler and dispersions
+        """
+        key = (parameter, bool(collapse))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            entry = self._load(*key, instrumentation)
+            self._entries[key] = entry
+            return entry
+
+    def source_hash(self, parameter: str, collapse: bool) -> str:
+        """SHA-256 of the source artifacts of a model, computed once
+
+        Parameters
+        ----------
+        parameter : str
+            R, ro_2 or ro_3
+        collapse : bool
+            True for collapse models
+
+        Returns
+        ----------
+        str
+            Hash of the .sav and .json files of the model in models_dir
+        """
+        key = (parameter, bool(collapse))
+        with self._lock:
+            if key not in self._hashes:
+                self._hashes[key] = source_hash(self.models_dir, *key)
+            return self._hashes[key]
+
+    def preload(self, keys=None) -> None:
+        """Loads models ahead of the first prediction
+
+        Parameters
+        ----------
+        keys : list[tuple[str, bool]], optional
+            (parameter, collapse) pairs to load, by default all shipped
+            models
+        """
+        if keys is None:
+            keys = MODEL_KEYS
+
+        for parameter, collapse in keys:
+            key = (parameter, bool(collapse))
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = self._load(*key)
+
+    def evict(self, parameter: str = None, collapse: bool = None) -> None:
+        """Removes models from the registry
+
+        Parameters
+        ----------
+        parameter : str, optional
+            Parameter to evict, by default all parameters
+        collapse : bool, optional
+            Collapse flag to evict, by default both
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if parameter is not None and key[0] != parameter:
+                    continue
+                if collapse is not None and key[1] != bool(collapse):
+                    continue
+                del self._entries[key]
+
+    def loaded(self) -> list:
+        """(parameter, collapse) pairs currently held in memory"""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> dict:
+        """Hit and miss counters of the registry"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "loaded": len(self._entries),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+registry = ModelRegistry()
@@ -0,0 +1,203 @@
+"""
+Monte Carlo sampling of the predicted lognormal distributions
+
+Realizations of R, rho or ductility are drawn as
+
+    x = median * exp(dispersion * epsilon)
+
+with standard normal epsilon. For a correlation coefficient rho, all
+systems share a common component of each realization,
+
+    epsilon = sqrt(rho) * z + sqrt(1 - rho) * e
+
+Samples are generated in chunks of systems directly into the output
+array. The random stream is consumed in system order, so results for a
+given seed do not depend on the chunk size.
+"""
+from typing import Iterator
+
+import numpy as np
+
+
+def _generator(seed) -> np.random.Generator:
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def iter_samples(
+    median,
+    dispersion,
+    n_samples: int,
+    correlation: float = 0.0,
+    seed=None,
+    chunk_size: int = 1024,
+    dtype=np.float64,
+) -> Iterator[tuple]:
+    """Yields lognormal samples of chunks of systems
+
+    Parameters
+    ----------
+    median : array_like
+        Medians, flattened
+    dispersion : array_like
+        Lognormal dispersions, broadcast against median
+    n_samples : int
+        Number of realizations per system
+    correlation : float, optional
+        Correlation coefficient between the realizations of different
+        systems, in [0, 1], by default 0.0 (independent)
+    seed : int or np.random.Generator, optional
+        Seed of the random generator, by default None
+    chunk_size : int, optional
+        Number of systems per chunk, by default 1024
+    dtype : np.dtype, optional
+        np.float64 or np.float32, by default np.float64
+
+    Yields
+    ----------
+    slice
+        Systems of the chunk, in flattened order
+    np.ndarray
+        Samples of the chunk, shape (systems, n_samples)
+    """
+    yield from _fill(median, dispersion, n_samples, correlation, seed,
+                     chunk_size, dtype)
+
+
+def _fill(median, dispersion, n_samples, correlation, seed, chunk_size,
+          dtype, out=None):
+    if not 0.0 <= correlation <= 1.0:
+        raise ValueError("Correlation must be within [0, 1]")
+
+    median, dispersion = np.broadcast_arrays(
+        np.asarray(median, dtype=float), np.asarray(dispersion, dtype=float))
+    median = median.reshape(-1)
+    dispersion = dispersion.reshape(-1)
+
+    rng = _generator(seed)
+
+    # Component shared by all systems, drawn first
+    common = None
+    if correlation > 0:
+        common = rng.standard_normal(n_samples, dtype=dtype)
+        common *= np.sqrt(correlation)
+
+    individual = np.sqrt(1.0 - correlation)
+    for start in range(0, median.size, chunk_size):
+        rows = slice(start, min(start + chunk_size, median.size))
+        if out is None:
+            block = np.empty((rows.stop - start, n_samples), dtype=dtype)
+        else:
+            block = out[rows]
+
+        rng.standard_normal(out=block, dtype=dtype)
+        if correlation > 0:
+            block *= individual
+            block += common
+        block *= dispersion[rows, None]
+        np.exp(block, out=block)
+        block *= median[rows, None]
+
+        yield rows, block
+
+
+def sample_lognormal(
+    median,
+    dispersion,
+    n_samples: int,
+    correlation: float = 0.0,
+    seed=None,
+    out: np.ndarray = None,
+    chunk_size: int = 1024,
+    dtype=np.float64,
+) -> np.ndarray:
+    """Draws lognormal realizations of every system
+
+    Parameters
+    ----------
+    median : array_like
+        Medians
+    dispersion : array_like
+        Lognormal dispersions, broadcast against median
+    n_samples : int
+        Number of realizations per system
+    correlation : float, optional
+        Correlation coefficient between the realizations of different
+        systems, in [0, 1], by default 0.0 (independent)
+    seed : int or np.random.Generator, optional
+        Seed of the random generator, by default None
+    out : np.ndarray, optional
+        Preallocated C-contiguous array of shape S + (n_samples,), with S
+        the broadcast shape of median and dispersion, by default a new
+        array
+    chunk_size : int, optional
+        Number of systems generated at once, by default 1024
+    dtype : np.dtype, optional
+        np.float64 or np.float32, ignored when out is given, by default
+        np.float64
+
+    Returns
+    ----------
+    np.ndarray
+        Samples, shape S + (n_samples,)
+
+    Raises
+    ------
+    ValueError
+        When out has the wrong shape or is not C-contiguous, or the
+        correlation is outside [0, 1]
+    """
+    shape = np.broadcast_shapes(np.shape(median), np.shape(dispersion)) + (
+        n_samples,)
+
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError(
+            f"out must be a C-contiguous array of shape {shape}")
+
+    flat = out.reshape(-1, n_samples)
+    for _ in _fill(median, dispersion, n_samples, correlation, seed,
+                   chunk_size, out.dtype, flat):
+        pass
+
+    return out
+
+
+def sample_predictions(
+    model,
+    period,
+    damping,
+    hardening_ratio,
+    ductility,
+    dynamic_ductility=None,
+    n_samples: int = 1000,
+    **kwargs,
+) -> np.ndarray:
+    """Predicts systems and draws realizations of the predictions
+
+    Parameters
+    ----------
+    model : XGBPredict
+        Model to predict with
+    period, damping, hardening_ratio, ductility : array_like
+        Systems, see XGBPredict.predict_batch
+    dynamic_ductility : array_like, optional
+        Ductility levels of non-collapse predictions, by default None
+    n_samples : int, optional
+        Number of realizations per system, by default 1000
+    **kwargs
+        correlation, seed, out, chunk_size and dtype, see
+        sample_lognormal
+
+    Returns
+    ----------
+    np.ndarray
+        Samples, shape of the broadcast inputs followed by n_samples
+    """
+    prediction = model.predict_batch(
+        period, damping, hardening_ratio, ductility, dynamic_ductility)
+
+    return sample_lognormal(
+        prediction["median"], prediction["dispersion"], n_samples, **kwargs)
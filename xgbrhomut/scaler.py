@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class ArrayScaler:
+    def __init__(self, min_: np.ndarray, scale: np.ndarray,
+                 feature_names: list) -> None:
+        """
+        Min-max scaling of model features stored as plain arrays
+
+        Parameters
+        ----------
+        min_ : np.ndarray
+            Offset of each feature (MinMaxScaler.min_)
+        scale : np.ndarray
+            Scale of each feature (MinMaxScaler.scale_)
+        feature_names : list[str]
+            Names of the features, in model order
+        """
+        self.min_ = np.asarray(min_, dtype=float)
+        self.scale_ = np.asarray(scale, dtype=float)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    @classmethod
+    def from_sklearn(cls, scaler) -> "ArrayScaler":
+        """Extracts the arrays of a fitted MinMaxScaler"""
+        return cls(scaler.min_, scaler.scale_,
+                   list(scaler.feature_names_in_))
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.scale_.size
+
+    def validate(self, feature_names: list) -> None:
+        """Checks that the scaler expects the given features, in order
+
+        Raises
+        ------
+        ValueError
+            When the features of the scaler differ
+        """
+        if list(self.feature_names_in_) != list(feature_names):
+            raise ValueError(
+                f"Scaler features {list(self.feature_names_in_)} do not "
+                f"match the model features {list(feature_names)}")
+
+    def transform(self, x, dtype=np.float64, copy: bool = True) -> np.ndarray:
+        """Scales features, as MinMaxScaler.transform
+
+        Parameters
+        ----------
+        x : array_like
+            Features, shape (n, n_features), in model order
+        dtype : np.dtype, optional
+            Type of the returned array, scaling itself is always done in
+            double precision, by default np.float64
+        copy : bool, optional
+            Copy x, otherwise a C-contiguous double precision x is scaled
+            in place, by default True
+
+        Returns
+        ----------
+        np.ndarray
+            C-contiguous scaled features
+        """
+        if copy:
+            x = np.array(x, dtype=np.float64)
+        else:
+            x = np.asarray(x, dtype=np.float64, order="C")
+        x *= self.scale_
+        x += self.min_
+        return np.ascontiguousarray(x, dtype=dtype)
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class PredictionSchema(BaseModel):
+    strength_ratio: float
+    dispersion: float
@@ -0,0 +1,321 @@
+"""
+Asynchronous prediction service with request micro-batching
+
+Concurrent single-system requests are queued per (parameter, collapse)
+model, collected for a short batch window or until a batch is full, and
+predicted with a single predict_batch call. Each caller awaits its own
+result:
+
+    async with PredictionService(batch_window=0.005) as service:
+        prediction = await service.predict(
+            "sa", False, 1.0, 0.05, 0.02, 4, dynamic_ductility=3.0)
+
+Synchronous code, e.g. a threaded HTTP server, can use a LocalClient,
+which runs the service on an event loop in a background thread.
+"""
+import asyncio
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .XGBPredict import XGBPredict
+from .registry import ModelRegistry
+
+
+class ServiceOverloaded(RuntimeError):
+    """Raised when a request is rejected because its queue is full"""
+
+
+class _Request:
+    __slots__ = ("inputs", "inverse", "future")
+
+    def __init__(self, inputs, inverse, future) -> None:
+        self.inputs = inputs
+        self.inverse = inverse
+        self.future = future
+
+
+class PredictionService:
+    def __init__(
+        self,
+        batch_window: float = 0.002,
+        max_batch_size: int = 1024,
+        max_queue_size: int = 10_000,
+        reject_when_full: bool = False,
+        engine: str = "xgboost",
+        registry: ModelRegistry = None,
+    ) -> None:
+        """
+        Micro-batching front end of the XGB models
+
+        Parameters
+        ----------
+        batch_window : float, optional
+            Seconds a batch waits for further requests after its first
+            one, by default 0.002
+        max_batch_size : int, optional
+            Maximum number of requests predicted at once, by default 1024
+        max_queue_size : int, optional
+            Maximum number of requests waiting per model, by default 10000
+        reject_when_full : bool, optional
+            Raise ServiceOverloaded for requests arriving at a full queue
+            instead of waiting for room, by default False
+        engine : str, optional
+            Prediction engine, see XGBPredict, by default "xgboost"
+        registry : ModelRegistry, optional
+            Registry the models are loaded from, by default the
+            process-wide registry
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self.reject_when_full = reject_when_full
+        self.engine = engine
+        self.registry = registry
+
+        self._keys = {}
+        self._models: Dict[Tuple[str, bool], XGBPredict] = {}
+        self._queues: Dict[Tuple[str, bool], asyncio.Queue] = {}
+        self._workers: Dict[Tuple[str, bool], asyncio.Task] = {}
+        self._running = False
+
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    async def start(self) -> None:
+        self._running = True
+
+    async def stop(self) -> None:
+        """Predicts the queued requests and stops the workers"""
+        self._running = False
+        for queue in self._queues.values():
+            await queue.join()
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    async def __aenter__(self) -> "PredictionService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    def _queue(self, im_type: str, collapse: bool):
+        key = self._keys.get((im_type, collapse))
+        if key is None:
+            model = XGBPredict(im_type, collapse, registry=self.registry,
+                               engine=self.engine)
+            key = (model.parameter, bool(collapse))
+            self._keys[(im_type, collapse)] = key
+            self._models.setdefault(key, model)
+
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue(self.max_queue_size)
+            self._workers[key] = asyncio.create_task(self._worker(key))
+
+        return self._models[key], self._queues[key]
+
+    async def predict(
+        self,
+        im_type: str,
+        collapse: bool,
+        period: float,
+        damping: float,
+        hardening_ratio: float,
+        ductility: float,
+        dynamic_ductility: float = None,
+        strength_ratio: float = None,
+    ) -> dict:
+        """
+        Predicts a single system as part of the next batch of its model
+
+        Parameters are those of XGBPredict.make_prediction
+
+        Returns
+        ----------
+        dict
+            {
+                median: float (R, ro_2 or ro_3, or ductility),
+                dispersion: float
+            }
+
+        Raises
+        ------
+        ValueError
+            When dynamic ductility is missing for non-collapse predictions,
+            strength ratios are provided for collapse predictions, or an
+            input is not a number
+        ServiceOverloaded
+            When the queue is full and reject_when_full is set
+        RuntimeError
+            When the service is not running
+        """
+        if not self._running:
+            raise RuntimeError("Prediction service is not running")
+
+        inverse = strength_ratio is not None
+        if inverse and collapse:
+            raise ValueError(
+                "Ductility can only be estimated for non-collapse "
+                "predictions")
+        if not inverse and dynamic_ductility is None and not collapse:
+            raise ValueError(
+                "Dynamic ductility not provided for non-collapse predictions")
+
+        # Converted here, so that a malformed request fails alone instead
+        # of failing its whole batch
+        last = strength_ratio if inverse else dynamic_ductility
+        try:
+            inputs = tuple(
+                float(value) for value in (
+                    period, damping, hardening_ratio, ductility,
+                    np.nan if last is None else last))
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"Inputs must be numbers, {error}") from None
+
+        model, queue = self._queue(im_type, collapse)
+        request = _Request(
+            inputs, inverse, asyncio.get_running_loop().create_future())
+
+        if self.reject_when_full:
+            try:
+                queue.put_nowait(request)
+            except asyncio.QueueFull:
+                raise ServiceOverloaded(
+                    f"Queue of {model.parameter} is full") from None
+        else:
+            await queue.put(request)
+
+        return await request.future
+
+    async def _collect(self, queue: asyncio.Queue) -> list:
+        # First request, then all requests arriving within the window
+        batch = [await queue.get()]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _worker(self, key) -> None:
+        model = self._models[key]
+        queue = self._queues[key]
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect(queue)
+            try:
+                for inverse in (False, True):
+                    requests = [
+                        request for request in batch
+                        if request.inverse is inverse
+                        and not request.future.done()]
+                    if not requests:
+                        continue
+
+                    # The model runs off the event loop
+                    try:
+                        prediction = await loop.run_in_executor(
+                            None, self._predict, model, requests, inverse)
+                    except Exception as error:
+                        for request in requests:
+                            if not request.future.done():
+                                request.future.set_exception(error)
+                        continue
+
+                    for i, request in enumerate(requests):
+                        if not request.future.done():
+                            request.future.set_result({
+                                "median": float(prediction["median"][i]),
+                                "dispersion": float(
+                                    prediction["dispersion"][i]),
+                            })
+
+                self.requests += len(batch)
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(batch))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    @staticmethod
+    def _predict(model: XGBPredict, requests: list, inverse: bool) -> dict:
+        inputs = np.array([request.inputs for request in requests],
+                          dtype=float).T
+        if inverse:
+            return model.predict_batch(*inputs[:4], strength_ratio=inputs[4])
+        return model.predict_batch(*inputs)
+
+    def stats(self) -> dict:
+        """Request and batch counters of the service"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "queued": sum(queue.qsize() for queue in self._queues.values()),
+        }
+
+
+class LocalClient:
+    def __init__(self, **kwargs) -> None:
+        """
+        Blocking client of a PredictionService running on an event loop
+        in a background thread
+
+        Parameters
+        ----------
+        **kwargs
+            Options of PredictionService
+        """
+        self.service = PredictionService(**kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._call(self.service.start())
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(
+            coroutine, self._loop).result()
+
+    def predict(self, *args, **kwargs) -> dict:
+        """Blocking PredictionService.predict, safe to call from many
+        threads at once"""
+        return self._call(self.service.predict(*args, **kwargs))
+
+    def close(self) -> None:
+        """Stops the service and its event loop"""
+        if self._loop.is_closed():
+            return
+        self._call(self.service.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "LocalClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,213 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+class TreeEnsemble:
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        base_score: float,
+        max_depth: int,
+    ) -> None:
+        """
+        Regression tree ensemble of an XGB booster evaluated with NumPy
+
+        The nodes of all trees are stored in flat arrays, with child
+        indices pointing into the same arrays (-1 for leaves)
+
+        Parameters
+        ----------
+        feature : np.ndarray
+            Split feature index of each node
+        threshold : np.ndarray
+            Split condition of each node, samples with feature values
+            below the threshold go to the left child
+        left : np.ndarray
+            Left child of each node
+        right : np.ndarray
+            Right child of each node
+        default_left : np.ndarray
+            Whether missing values go to the left child
+        value : np.ndarray
+            Leaf value of each node
+        roots : np.ndarray
+            Root node of each tree
+        base_score : float
+            Global bias of the model
+        max_depth : int
+            Depth of the deepest tree
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.base_score = np.float32(base_score)
+        self.max_depth = int(max_depth)
+        self._child = None
+        self._feature = None
+
+    @property
+    def is_leaf(self) -> np.ndarray:
+        return self.left < 0
+
+    @classmethod
+    def from_json(cls, model: dict) -> "TreeEnsemble":
+        """Reads the trees of an XGBoost model in JSON format
+
+        Parameters
+        ----------
+        model : dict
+            Model as produced by Booster.save_raw("json")
+
+        Returns
+        ----------
+        TreeEnsemble
+            Flattened trees
+
+        Raises
+        ------
+        ValueError
+            When the model is not a gbtree squared error regressor
+        """
+        learner = model["learner"]
+        booster = learner["gradient_booster"]
+        if booster["name"] != "gbtree" \
+                or learner["objective"]["name"] != "reg:squarederror":
+            raise ValueError(
+                "Only gbtree models with a reg:squarederror objective are "
+                "supported")
+
+        trees = booster["model"]["trees"]
+        sizes = [len(tree["left_children"]) for tree in trees]
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+        def stack(key, dtype):
+            return np.concatenate([
+                np.asarray(tree[key], dtype=dtype) for tree in trees])
+
+        left = stack("left_children", np.int32)
+        right = stack("right_children", np.int32)
+        offset = np.repeat(offsets, sizes).astype(np.int32)
+        leaf = left < 0
+        left = np.where(leaf, -1, left + offset)
+        right = np.where(leaf, -1, right + offset)
+
+        # Leaf values are stored as the split conditions of leaves
+        conditions = stack("split_conditions", np.float32)
+
+        depth = np.zeros(left.size, dtype=np.int32)
+        for node in range(left.size):
+            if not leaf[node]:
+                depth[left[node]] = depth[node] + 1
+                depth[right[node]] = depth[node] + 1
+
+        return cls(
+            feature=stack("split_indices", np.int32),
+            threshold=conditions,
+            left=left.astype(np.int32),
+            right=right.astype(np.int32),
+            default_left=stack("default_left", bool),
+            value=np.where(leaf, conditions, 0).astype(np.float32),
+            roots=offsets.astype(np.int32),
+            base_score=float(learner["learner_model_param"]["base_score"]),
+            max_depth=depth.max(),
+        )
+
+    @classmethod
+    def from_booster(cls, booster) -> "TreeEnsemble":
+        """Reads the trees of an xgboost.Booster"""
+        return cls.from_json(json.loads(booster.save_raw("json")))
+
+    def save(self, filename: Path) -> None:
+        """Writes the ensemble to a .npz file"""
+        np.savez(
+            filename,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            default_left=self.default_left,
+            value=self.value,
+            roots=self.roots,
+            base_score=self.base_score,
+            max_depth=self.max_depth,
+        )
+
+    @classmethod
+    def load(cls, filename: Path) -> "TreeEnsemble":
+        """Reads an ensemble written by save"""
+        with np.load(filename) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+    def _traversal(self) -> tuple:
+        # Interleaved (right, left) children with leaves pointing to
+        # themselves, so that every sample can take max_depth steps
+        if self._child is None:
+            nodes = np.arange(self.left.size, dtype=np.int32)
+            child = np.empty(2 * nodes.size, dtype=np.int32)
+            child[0::2] = np.where(self.is_leaf, nodes, self.right)
+            child[1::2] = np.where(self.is_leaf, nodes, self.left)
+            self._child = child
+            self._feature = np.where(self.is_leaf, 0, self.feature)
+        return self._child, self._feature
+
+    def predict(self, x, chunk_size: int = 4096) -> np.ndarray:
+        """Predicts, as Booster.predict on a DMatrix of x
+
+        Parameters
+        ----------
+        x : array_like
+            Features, shape (n, n_features)
+        chunk_size : int, optional
+            Number of rows traversed at once, by default 4096
+
+        Returns
+        ----------
+        np.ndarray
+            Predictions, float32, shape (n,)
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        prediction = np.empty(x.shape[0], dtype=np.float32)
+
+        for start in range(0, x.shape[0], chunk_size):
+            stop = min(start + chunk_size, x.shape[0])
+            prediction[start:stop] = self._predict_chunk(x[start:stop])
+
+        return prediction
+
+    def _predict_chunk(self, x: np.ndarray) -> np.ndarray:
+        n_rows, n_features = x.shape
+        child, feature = self._traversal()
+        missing = np.isnan(x).any()
+
+        flat = x.ravel()
+        offset = np.tile(
+            np.arange(n_rows, dtype=np.int32) * n_features, self.roots.size)
+
+        # Node of each (tree, row) pair, tree major
+        node = np.repeat(self.roots, n_rows)
+        for _ in range(self.max_depth):
+            fvalue = flat[offset + feature[node]]
+            go_left = fvalue < self.threshold[node]
+            if missing:
+                go_left |= np.isnan(fvalue) & self.default_left[node]
+            node = child[2 * node + go_left]
+
+        # Trees are accumulated in order in single precision
+        leaves = self.value[node].reshape(self.roots.size, n_rows)
+        prediction = np.full(n_rows, self.base_score, dtype=np.float32)
+        for tree in leaves:
+            prediction += tree
+
+        return prediction
@@ -0,0 +1,154 @@
+"""
+Range checks of the model inputs
+
+The models were trained on the ranges in RANGES. Inputs outside of them
+are handled according to a policy:
+
+    "warn"      a single warning per out-of-range argument and call
+    "raise"     InputRangeError
+    "clip"      inputs are clipped to the ranges
+    "ignore"    nothing is done
+"""
+import warnings
+
+import numpy as np
+
+
+# Recommended (training) ranges of the inputs
+RANGES = {
+    "period": (0.01, 3.0),
+    "damping": (0.02, 0.2),
+    "hardening_ratio": (0.02, 0.07),
+    "ductility": (2.0, 8.0),
+}
+
+POLICIES = ("warn", "raise", "clip", "ignore")
+
+
+class InputRangeError(ValueError):
+    """Raised for inputs outside of the recommended ranges"""
+
+
+def as_float(value) -> np.ndarray:
+    """Floating array of value, float32 arrays are used without a copy"""
+    value = np.asarray(value)
+    if value.dtype.kind != "f":
+        value = value.astype(float)
+    return value
+
+
+def _bounds(name, value) -> tuple:
+    # Limits in the precision of the inputs, float32(0.02) < 0.02
+    lower, upper = RANGES[name]
+    return value.dtype.type(lower), value.dtype.type(upper)
+
+
+def _message(name, summary, size) -> str:
+    lower, upper = RANGES[name]
+    message = (f"{name.capitalize().replace('_', ' ')} is not within "
+               f"recommended limits [{lower}, {upper}]")
+    if size > 1:
+        message += (f" ({summary['below']} below and {summary['above']} "
+                    f"above, of {size} rows)")
+    return message
+
+
+def check_ranges(period, damping, hardening_ratio, ductility) -> dict:
+    """Checks inputs against the recommended ranges
+
+    Parameters
+    ----------
+    period, damping, hardening_ratio, ductility : array_like
+        Inputs, broadcast against each other
+
+    Returns
+    ----------
+    dict
+        {
+            valid: np.ndarray, per-row mask of rows with all inputs
+                within the ranges (NaN is invalid),
+            summary: {
+                argument: {below: int, above: int, invalid: int}
+            }, for the out-of-range arguments only
+        }
+    """
+    arrays = np.broadcast_arrays(*(
+        as_float(value) for value in (
+            period, damping, hardening_ratio, ductility)))
+
+    valid = np.ones(arrays[0].shape, dtype=bool)
+    summary = {}
+    for name, array in zip(RANGES, arrays):
+        lower, upper = _bounds(name, array)
+        inside = (lower <= array) & (array <= upper)
+        valid &= inside
+
+        if not np.all(inside):
+            summary[name] = {
+                "below": int(np.count_nonzero(array < lower)),
+                "above": int(np.count_nonzero(array > upper)),
+                "invalid": int(np.count_nonzero(~inside)),
+            }
+
+    return {"valid": valid, "summary": summary}
+
+
+def apply_policy(period, damping, hardening_ratio, ductility,
+                 policy: str = "warn") -> tuple:
+    """Applies a range policy to the inputs
+
+    Parameters
+    ----------
+    period, damping, hardening_ratio, ductility : array_like
+        Inputs, broadcast against each other
+    policy : str, optional
+        "warn", "raise", "clip" or "ignore", by default "warn"
+
+    Returns
+    ----------
+    tuple
+        Inputs, clipped to the ranges for the "clip" policy, unchanged
+        otherwise
+
+    Raises
+    ------
+    InputRangeError
+        For out-of-range inputs with the "raise" policy
+    ValueError
+        For an unknown policy
+    """
+    inputs = (period, damping, hardening_ratio, ductility)
+    if policy == "ignore":
+        return inputs
+
+    if policy == "clip":
+        return tuple(
+            np.clip(value, *RANGES[name])
+            for name, value in zip(RANGES, inputs))
+
+    if policy not in POLICIES:
+        raise ValueError(
+            f"Wrong validation policy, must be one of {', '.join(POLICIES)}")
+
+    # Counts only, without building the row mask
+    messages = []
+    for name, value in zip(RANGES, inputs):
+        value = as_float(value)
+        lower, upper = _bounds(name, value)
+        inside = (lower <= value) & (value <= upper)
+        if np.all(inside):
+            continue
+
+        summary = {
+            "below": int(np.count_nonzero(value < lower)),
+            "above": int(np.count_nonzero(value > upper)),
+        }
+        messages.append(_message(name, summary, value.size))
+
+    if messages and policy == "raise":
+        raise InputRangeError("; ".join(messages))
+
+    for message in messages:
+        warnings.warn(message)
+
+    return inputs